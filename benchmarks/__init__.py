@@ -0,0 +1,7 @@
+"""
+Offline, reproducible benchmarks for the engine's hot paths (agents, backtest
+replay, candle parsing, DB bulk writes, websocket dispatch).
+
+    python -m benchmarks --save benchmarks/baselines/local.json
+    python -m benchmarks --compare benchmarks/baselines/local.json
+"""
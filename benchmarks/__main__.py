@@ -0,0 +1,53 @@
+import argparse
+import logging
+import sys
+
+from benchmarks import baseline, suite
+
+logger = logging.getLogger("benchmarks")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Offline performance benchmarks")
+    parser.add_argument("--only", nargs="+", choices=sorted(suite.BENCHMARKS), help="Run just these benchmarks")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--quick", action="store_true", help="Tiny sizes (smoke test, numbers not comparable)")
+    parser.add_argument("--dsn", help="Postgres for the db benchmark (default: BENCH_DATABASE_URL)")
+    parser.add_argument("--save", metavar="PATH", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative change counted as a regression")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO, format="%(message)s")
+    # The engine logs every loaded agent and opened position; keep the report readable
+    logging.getLogger("src").setLevel(logging.WARNING)
+
+    cfg = (suite.Config.quick if args.quick else suite.Config)(seed=args.seed, dsn=args.dsn)
+    results = suite.run(cfg, args.only)
+
+    if args.save:
+        baseline.save(results, args.save, args.seed)
+        logger.info(f"💾 Baseline written to {args.save}")
+
+    if args.compare:
+        saved = baseline.load(args.compare)
+        if saved.get("seed") != args.seed:
+            logger.warning(f"⚠️ Baseline used seed {saved.get('seed')}, this run {args.seed}")
+        reference = saved["results"]
+        if args.only:
+            # Only compare what was run
+            reference = {k: v for k, v in reference.items() if k.split(".", 1)[0] in args.only}
+        rows = baseline.compare(reference, results, args.threshold)
+        print(baseline.format_table(rows))
+        regressions = [r for r in rows if r.status == "regressed"]
+        if regressions:
+            logger.error(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            return 1
+    else:
+        for name, r in sorted(results.items()):
+            print(f"{name:<60} {r['value']:>12.4g} {r['unit']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
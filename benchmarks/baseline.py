@@ -0,0 +1,70 @@
+import json
+import os
+import platform
+import sys
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+class Comparison(NamedTuple):
+    name: str
+    baseline: Optional[float]
+    current: Optional[float]
+    change: Optional[float]  # Relative, signed so that positive = better
+    status: str              # ok | improved | regressed | new | missing
+
+def result(value: float, unit: str, higher_is_better: bool = False) -> Dict[str, Any]:
+    return {"value": float(value), "unit": unit, "higher_is_better": higher_is_better}
+
+def environment() -> Dict[str, Any]:
+    import numpy as np
+    import pandas as pd
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "argv": sys.argv[1:],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+def save(results: Dict[str, Dict[str, Any]], path: str, seed: int):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"seed": seed, "environment": environment(), "results": results}, f, indent=2, sort_keys=True)
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+def compare(baseline: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]],
+            threshold: float = 0.15) -> List[Comparison]:
+    """
+    Metric-by-metric comparison. A metric regresses when it is worse than the
+    baseline by more than `threshold` (relative), in its own direction.
+    """
+    rows = []
+    for name in sorted(set(baseline) | set(current)):
+        base, cur = baseline.get(name), current.get(name)
+        if base is None or cur is None:
+            rows.append(Comparison(name, base and base["value"], cur and cur["value"], None,
+                                   "new" if base is None else "missing"))
+            continue
+        b, c = base["value"], cur["value"]
+        if b == 0:
+            change = 0.0
+        else:
+            change = (c - b) / abs(b) if cur.get("higher_is_better") else (b - c) / abs(b)
+        status = "regressed" if change < -threshold else "improved" if change > threshold else "ok"
+        rows.append(Comparison(name, b, c, change, status))
+    return rows
+
+def format_table(rows: List[Comparison]) -> str:
+    width = max((len(r.name) for r in rows), default=10)
+    lines = [f"{'metric':<{width}}  {'baseline':>12}  {'current':>12}  {'change':>8}  status"]
+    for r in rows:
+        num = lambda v: f"{v:12.4g}" if v is not None else f"{'-':>12}"
+        change = f"{r.change * 100:+7.1f}%" if r.change is not None else f"{'-':>8}"
+        lines.append(f"{r.name:<{width}}  {num(r.baseline)}  {num(r.current)}  {change}  {r.status}")
+    return "\n".join(lines)
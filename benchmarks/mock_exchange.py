@@ -0,0 +1,501 @@
+"""
+Local stand-in for Delta Exchange (REST + websocket) for load and soak tests.
+
+    python -m benchmarks.mock_exchange --symbols 200 --latency 0.05 --error-rate 0.01
+    DELTA_BASE_URL=http://127.0.0.1:8010 DELTA_WS_URL=ws://127.0.0.1:8011 python src/main.py
+
+Serves /v2/products, /v2/tickers, /v2/history/candles, /v2/orders and
+/v2/wallet/balances from synthetic (seeded) or recorded candles, and pushes
+v2/ticker messages to websocket subscribers at a configurable rate. Latency,
+errors and rate limits can be injected at start-up or changed while running
+with POST /_mock/faults; GET /_mock/stats reports what was served.
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import logging
+import random
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs
+
+import numpy as np
+import websockets
+
+from benchmarks import synthetic
+
+logger = logging.getLogger(__name__)
+
+RESOLUTIONS = {
+    '1m': 60, '3m': 180, '5m': 300, '15m': 900, '30m': 1800,
+    '1h': 3600, '2h': 7200, '4h': 14400, '6h': 21600, '1d': 86400
+}
+PRIVATE = ("/v2/orders", "/v2/wallet/balances")
+
+class Faults:
+    """
+    What goes wrong, and how often. Applies to every REST route under /v2
+    (or only to `endpoints`, when given).
+    latency/jitter: seconds added before answering (jitter is uniform +/-)
+    error_rate:     share of requests answered with HTTP 500
+    rate_limit:     requests per second across all clients (token bucket, 0 = off);
+                    over the limit the answer is 429 with X-RATE-LIMIT-RESET (ms)
+    """
+    FIELDS = ("latency", "jitter", "error_rate", "rate_limit", "burst", "endpoints")
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_limit: float = 0.0, burst: Optional[int] = None, endpoints: Optional[Sequence[str]] = None,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.endpoints = list(endpoints) if endpoints else None
+        self._random = random.Random(seed)
+        self._tokens = None
+        self._refilled = time.monotonic()
+
+    def update(self, **fields):
+        for name, value in fields.items():
+            if name not in self.FIELDS:
+                raise ValueError(f"Unknown fault: {name}")
+            setattr(self, name, value)
+        self._tokens = None  # Restart the bucket with the new limit
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def applies(self, path: str) -> bool:
+        return path.startswith("/v2/") and (self.endpoints is None or path in self.endpoints)
+
+    def delay(self) -> float:
+        if not self.latency and not self.jitter:
+            return 0.0
+        return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def fail(self) -> bool:
+        return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def throttle(self) -> Optional[float]:
+        """None when the request may go ahead, else seconds until a token is free."""
+        if not self.rate_limit:
+            return None
+        capacity = self.burst or max(1.0, self.rate_limit)
+        now = time.monotonic()
+        if self._tokens is None:
+            self._tokens = capacity
+        else:
+            self._tokens = min(capacity, self._tokens + (now - self._refilled) * self.rate_limit)
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return None
+        return (1 - self._tokens) / self.rate_limit
+
+class MockMarket:
+    """
+    Candles and live prices for every product. History is kept at `resolution`
+    and re-stamped onto whatever resolution a request asks for; the newest
+    candle always ends at the current period, so the engine sees fresh data.
+    """
+    def __init__(self, candles: Dict[str, Dict[str, np.ndarray]], resolution: int = 3600,
+                 products: Optional[List[Dict[str, Any]]] = None, seed: int = 0):
+        self.candles = candles
+        self.resolution = resolution
+        self.symbols = list(candles)
+        self.prices = {s: float(c["close"][-1]) for s, c in candles.items()}
+        self.volumes = {s: float(np.sum(c["volume"][-24:])) for s, c in candles.items()}
+        self._products = products
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def synthetic(cls, n_symbols: int = 50, length: int = 1000, seed: int = 0, resolution: int = 3600) -> "MockMarket":
+        frames = synthetic.universe(n_symbols, length, seed)
+        return cls({s: {f: df[f].to_numpy(float) for f in ("open", "high", "low", "close", "volume")}
+                    for s, df in frames.items()}, resolution, seed=seed)
+
+    @classmethod
+    def load(cls, path: str, seed: int = 0) -> "MockMarket":
+        """A recording: {"resolution", "products"?, "candles": {symbol: [{time, open, high, low, close, volume}]}}."""
+        with open(path) as f:
+            data = json.load(f)
+        candles = {}
+        for symbol, rows in data["candles"].items():
+            rows = sorted(rows, key=lambda r: r["time"])
+            candles[symbol] = {k: np.array([float(r[k]) for r in rows]) for k in ("open", "high", "low", "close", "volume")}
+        return cls(candles, int(data.get("resolution", 3600)), data.get("products"), seed)
+
+    def dump(self, path: str):
+        now = self._anchor(self.resolution)
+        rows = {
+            s: [{"time": now - (len(c["close"]) - 1 - i) * self.resolution, **{k: float(c[k][i]) for k in c}}
+                for i in range(len(c["close"]))]
+            for s, c in self.candles.items()
+        }
+        with open(path, "w") as f:
+            json.dump({"resolution": self.resolution, "products": self._products, "candles": rows}, f)
+
+    @staticmethod
+    def _anchor(resolution: int) -> int:
+        return int(time.time()) // resolution * resolution
+
+    def products(self) -> List[Dict[str, Any]]:
+        if self._products:
+            return self._products
+        return [
+            {"id": i + 1, "symbol": s, "contract_type": "perpetual_futures", "state": "live",
+             "tick_size": "0.01", "contract_value": "1", "underlying_asset": {"symbol": s[:-3]},
+             "settling_asset": {"symbol": "USD"}}
+            for i, s in enumerate(self.symbols)
+        ]
+
+    def step(self, symbol: str, vol: float = 0.0005) -> float:
+        """Move the live price one tick."""
+        price = self.prices[symbol] * float(np.exp(self._rng.normal(0.0, vol)))
+        self.prices[symbol] = price
+        return price
+
+    def ticker(self, symbol: str) -> Dict[str, Any]:
+        price = self.prices[symbol]
+        return {
+            "symbol": symbol,
+            "mark_price": f"{price:.6f}",
+            "close": price,
+            "volume": self.volumes[symbol],
+            "turnover_usd": self.volumes[symbol] * price,
+            "funding_rate": "0.0001",
+            "open_interest": "1000",
+            "timestamp": int(time.time() * 1e6),
+        }
+
+    def history(self, symbol: str, resolution: str, start: Optional[int], end: Optional[int],
+                limit: Optional[int]) -> List[Dict[str, Any]]:
+        step = RESOLUTIONS.get(resolution, self.resolution)
+        c = self.candles[symbol]
+        last = min(self._anchor(step), end if end else self._anchor(step))
+        last = last // step * step
+        first = max(start // step * step if start else last - (len(c["close"]) - 1) * step,
+                    last - (len(c["close"]) - 1) * step)
+        n = max(0, (last - first) // step + 1)
+        if limit:
+            n = min(n, int(limit))
+        times = last - step * np.arange(n - 1, -1, -1)
+        close = c["close"][-n:] if n else c["close"][:0]
+        out = [
+            {"time": int(t), "open": float(c["open"][-n + i]), "high": float(c["high"][-n + i]),
+             "low": float(c["low"][-n + i]), "close": float(close[i]), "volume": float(c["volume"][-n + i])}
+            for i, t in enumerate(times)
+        ]
+        if out:
+            # The forming candle follows the live price
+            live = self.prices[symbol]
+            out[-1].update(close=live, high=max(out[-1]["high"], live), low=min(out[-1]["low"], live))
+        return out
+
+def record_market(client, symbols: Sequence[str], path: str, resolution: str = "1h", limit: int = 1000):
+    """Save real candles (via a DeltaClient) as a recording for `MockMarket.load`."""
+    candles = {}
+    for symbol in symbols:
+        response = client.get_history(symbol, resolution, limit=limit)
+        candles[symbol] = response.get("result", [])
+    with open(path, "w") as f:
+        json.dump({"resolution": RESOLUTIONS[resolution], "candles": candles}, f)
+
+class MockExchange:
+    """
+    REST server (asyncio streams, HTTP/1.1 keep-alive) plus a websocket feed.
+    port / ws_port 0 pick free ports; read `base_url` / `ws_url` after start().
+    api_secret: when set, private endpoints check the HMAC the way DeltaClient signs.
+    """
+    def __init__(self, market: Optional[MockMarket] = None, host: str = "127.0.0.1", port: int = 0,
+                 ws_port: int = 0, faults: Optional[Faults] = None, message_rate: float = 100.0,
+                 api_secret: Optional[str] = None, balance: float = 10_000.0):
+        self.market = market or MockMarket.synthetic()
+        self.host = host
+        self.port = port
+        self.ws_port = ws_port
+        self.faults = faults or Faults()
+        self.message_rate = message_rate
+        self.api_secret = api_secret
+        self.balance = balance
+        self.orders: List[Dict[str, Any]] = []
+        self.counts = Counter()
+        self.latency_injected = 0.0
+        self.ws_sent = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._ws_server = None
+        self._feed: Optional[asyncio.Task] = None
+        self._connections = set()
+        self._subscribers: Dict[Any, set] = {}
+        self._order_ids = itertools.count(1)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.ws_port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ws_server = await websockets.serve(self._ws_handler, self.host, self.ws_port)
+        self.ws_port = next(iter(self._ws_server.sockets)).getsockname()[1]
+        self._feed = asyncio.create_task(self._run_feed())
+        logger.info(f"🧪 Mock exchange: {self.base_url} | {self.ws_url} | {len(self.market.symbols)} symbols")
+
+    async def stop(self):
+        if self._feed:
+            self._feed.cancel()
+            await asyncio.gather(self._feed, return_exceptions=True)
+            self._feed = None
+        if self._ws_server:
+            self._ws_server.close()
+            await self._ws_server.wait_closed()
+            self._ws_server = None
+        if self._server:
+            self._server.close()
+            # Keep-alive clients may still hold a connection open
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": dict(self.counts),
+            "orders": len(self.orders),
+            "ws_subscribers": len(self._subscribers),
+            "ws_sent": self.ws_sent,
+            "latency_injected": round(self.latency_injected, 3),
+            "faults": self.faults.snapshot(),
+        }
+
+    # --- REST ---
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request = await reader.readline()
+                if not request:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+                parts = request.decode("latin-1").split()
+                if len(parts) < 2:
+                    break
+                method, target = parts[0], parts[1]
+                path, _, query = target.partition("?")
+                status, payload, extra = await self._dispatch(method, path, query, headers, body)
+                data = json.dumps(payload).encode()
+                reason = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+                          429: "Too Many Requests", 500: "Internal Server Error"}.get(status, "")
+                head = "".join(f"{k}: {v}\r\n" for k, v in extra.items())
+                writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n{head}"
+                             f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Mock exchange request failed: {e}")
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, query: str, headers: Dict[str, str],
+                        body: bytes) -> Tuple[int, Any, Dict[str, str]]:
+        self.counts[path] += 1
+        if path == "/_mock/stats":
+            return 200, self.stats(), {}
+        if path == "/_mock/faults" and method == "POST":
+            try:
+                self.faults.update(**json.loads(body or b"{}"))
+            except (ValueError, TypeError) as e:
+                return 400, {"success": False, "error": {"code": "bad_request", "message": str(e)}}, {}
+            return 200, self.faults.snapshot(), {}
+
+        if self.faults.applies(path):
+            wait = self.faults.throttle()
+            if wait is not None:
+                self.counts["rate_limited"] += 1
+                return 429, {"success": False, "error": {"code": "ratelimited"}}, \
+                    {"X-RATE-LIMIT-RESET": str(int(wait * 1000) + 1)}
+            delay = self.faults.delay()
+            if delay:
+                self.latency_injected += delay
+                await asyncio.sleep(delay)
+            if self.faults.fail():
+                self.counts["errors_injected"] += 1
+                return 500, {"success": False, "error": {"code": "internal_server_error"}}, {}
+
+        if path in PRIVATE and not self._authorized(method, path, query, headers, body):
+            return 401, {"success": False, "error": {"code": "invalid_api_key"}}, {}
+
+        params = {k: v[-1] for k, v in parse_qs(query).items()}
+        if path == "/v2/products" and method == "GET":
+            return 200, {"success": True, "result": self.market.products()}, {}
+        if path == "/v2/tickers" and method == "GET":
+            symbols = [params["symbol"]] if "symbol" in params else self.market.symbols
+            return 200, {"success": True, "result": [self.market.ticker(s) for s in symbols if s in self.market.prices]}, {}
+        if path == "/v2/history/candles" and method == "GET":
+            symbol = params.get("symbol")
+            if symbol not in self.market.prices:
+                return 200, {"success": True, "result": []}, {}
+            as_int = lambda k: int(params[k]) if k in params else None
+            rows = self.market.history(symbol, params.get("resolution", "1h"), as_int("start"), as_int("end"), as_int("limit"))
+            return 200, {"success": True, "result": rows}, {}
+        if path == "/v2/orders" and method == "POST":
+            return self._place_order(json.loads(body or b"{}"))
+        if path == "/v2/wallet/balances" and method == "GET":
+            return 200, {"success": True, "result": [
+                {"asset_symbol": "USD", "balance": f"{self.balance:.2f}", "available_balance": f"{self.balance:.2f}"}
+            ]}, {}
+        return 404, {"success": False, "error": {"code": "not_found"}}, {}
+
+    def _authorized(self, method: str, path: str, query: str, headers: Dict[str, str], body: bytes) -> bool:
+        if not all(headers.get(h) for h in ("api-key", "signature", "timestamp")):
+            return False
+        if self.api_secret is None:
+            return True
+        signed = method + headers["timestamp"] + path + (body.decode() if method in ("POST", "PUT") else query)
+        expected = hmac.new(self.api_secret.encode(), signed.encode(), hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, headers["signature"])
+
+    def _place_order(self, order: Dict[str, Any]) -> Tuple[int, Any, Dict[str, str]]:
+        symbol = order.get("product_symbol")
+        if symbol not in self.market.prices or order.get("side") not in ("buy", "sell") or int(order.get("size") or 0) <= 0:
+            return 400, {"success": False, "error": {"code": "invalid_order", "context": order}}, {}
+        price = self.market.prices[symbol]
+        fill = {
+            "id": next(self._order_ids),
+            "product_symbol": symbol,
+            "side": order["side"],
+            "size": int(order["size"]),
+            "order_type": order.get("order_type"),
+            "limit_price": order.get("limit_price"),
+            "average_fill_price": f"{price:.6f}",
+            "state": "closed",
+            "created_at": int(time.time() * 1e6),
+        }
+        self.orders.append(fill)
+        return 200, {"success": True, "result": fill}, {}
+
+    # --- Websocket ---
+
+    async def _ws_handler(self, connection, *_):
+        subscribed = self._subscribers[connection] = set()
+        try:
+            async for message in connection:
+                try:
+                    request = json.loads(message)
+                except ValueError:
+                    continue
+                channels = request.get("payload", {}).get("channels", [])
+                for channel in channels:
+                    if channel.get("name") != "v2/ticker":
+                        continue
+                    names = channel.get("symbols") or self.market.symbols
+                    if request.get("type") == "unsubscribe":
+                        subscribed.difference_update(names)
+                    else:
+                        subscribed.update(s for s in names if s in self.market.prices)
+                await connection.send(json.dumps({"type": "subscriptions", "channels": [
+                    {"name": "v2/ticker", "symbols": sorted(subscribed)}]}))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self._subscribers.pop(connection, None)
+
+    async def _run_feed(self, interval: float = 0.01):
+        """Tick subscribed symbols round-robin at `message_rate` messages/sec per connection."""
+        owed: Dict[Any, float] = {}
+        cursor: Dict[Any, int] = {}
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            elapsed, last = now - last, now
+            for connection, subscribed in list(self._subscribers.items()):
+                if not subscribed:
+                    continue
+                owed[connection] = owed.get(connection, 0.0) + elapsed * self.message_rate
+                n = int(owed[connection])
+                if not n:
+                    continue
+                owed[connection] -= n
+                names = sorted(subscribed)
+                start = cursor.get(connection, 0)
+                cursor[connection] = start + n
+                try:
+                    for k in range(n):
+                        symbol = names[(start + k) % len(names)]
+                        self.market.step(symbol)
+                        await connection.send(json.dumps({"type": "v2/ticker", **self.market.ticker(symbol)}))
+                        self.ws_sent += 1
+                except websockets.exceptions.ConnectionClosed:
+                    owed.pop(connection, None)
+                    cursor.pop(connection, None)
+
+
+async def _serve(args):
+    market = MockMarket.load(args.data, args.seed) if args.data else \
+        MockMarket.synthetic(args.symbols, args.length, args.seed)
+    faults = Faults(args.latency, args.jitter, args.error_rate, args.rate_limit, seed=args.seed)
+    exchange = MockExchange(market, args.host, args.port, args.ws_port, faults, args.message_rate, args.api_secret)
+    await exchange.start()
+    print(f"DELTA_BASE_URL={exchange.base_url}\nDELTA_WS_URL={exchange.ws_url}", flush=True)
+    try:
+        while True:
+            await asyncio.sleep(args.stats_every)
+            logger.info(f"📊 {exchange.stats()}")
+    finally:
+        await exchange.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.mock_exchange", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--ws-port", type=int, default=8011)
+    parser.add_argument("--symbols", type=int, default=50, help="Synthetic products")
+    parser.add_argument("--length", type=int, default=1000, help="Synthetic candles per product")
+    parser.add_argument("--data", help="Recorded candles (JSON) instead of synthetic ones")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--message-rate", type=float, default=100.0, help="Ticker messages/sec per connection")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every REST call")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of REST calls failing with 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="REST requests/sec before 429s (0 = off)")
+    parser.add_argument("--api-secret", help="Verify signatures on private endpoints with this secret")
+    parser.add_argument("--stats-every", type=float, default=30.0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO, format="%(asctime)s - %(message)s")
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
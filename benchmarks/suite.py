@@ -0,0 +1,216 @@
+import asyncio
+import json
+import logging
+import os
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+from benchmarks import synthetic
+from benchmarks.baseline import result
+
+logger = logging.getLogger(__name__)
+
+Results = Dict[str, Dict[str, Any]]
+
+class Config:
+    """Sizes for one run. `quick()` shrinks everything for smoke tests."""
+    def __init__(self, seed: int = 42, repeat: int = 7, windows: Sequence[int] = (50, 200, 1000),
+                 batch_symbols: int = 50, backtest_candles: int = 500, frame_rows: int = 1000,
+                 panel_symbols: int = 100, panel_length: int = 200, db_rows: int = 20_000,
+                 ws_messages: int = 20_000, dsn: Optional[str] = None):
+        self.seed = seed
+        self.repeat = repeat
+        self.windows = tuple(windows)
+        self.batch_symbols = batch_symbols
+        self.backtest_candles = backtest_candles
+        self.frame_rows = frame_rows
+        self.panel_symbols = panel_symbols
+        self.panel_length = panel_length
+        self.db_rows = db_rows
+        self.ws_messages = ws_messages
+        self.dsn = dsn or os.getenv("BENCH_DATABASE_URL")
+
+    @classmethod
+    def quick(cls, **overrides) -> "Config":
+        sizes = dict(repeat=2, windows=(60,), batch_symbols=5, backtest_candles=80, frame_rows=100,
+                     panel_symbols=5, panel_length=60, db_rows=500, ws_messages=500)
+        return cls(**{**sizes, **overrides})
+
+async def _median_async(fn: Callable[[], Awaitable[Any]], repeat: int) -> float:
+    """Median seconds per call (one warm-up call first)."""
+    await fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def _median(fn: Callable[[], Any], repeat: int) -> float:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def _agents():
+    """The agents a default engine runs (fresh instances, no env overrides)."""
+    from src.agents.registry import MANIFEST, AgentRegistry
+    from src.main import JarvisEngine
+    return AgentRegistry(MANIFEST).active(JarvisEngine.AVAILABLE_DATA)
+
+# --- Benchmarks ---
+
+def bench_agents(cfg: Config) -> Results:
+    """`analyze` latency per agent at each window size, and `analyze_batch` over a universe."""
+    from src.data.panel import MarketPanel
+    agents = _agents()
+    frames = {w: synthetic.ohlc_frame(w, cfg.seed) for w in cfg.windows}
+    panel = MarketPanel.from_frames(synthetic.universe(cfg.batch_symbols, max(cfg.windows), cfg.seed))
+
+    async def run():
+        out = {}
+        for agent in agents:
+            for w, frame in frames.items():
+                seconds = await _median_async(lambda: agent.analyze("SYN000USD", frame), cfg.repeat)
+                out[f"agents.{agent.name}.analyze.w{w}"] = result(seconds * 1e3, "ms")
+            seconds = await _median_async(lambda: agent.analyze_batch(panel.symbols, panel), cfg.repeat)
+            out[f"agents.{agent.name}.batch.s{cfg.batch_symbols}"] = result(seconds * 1e3, "ms")
+        return out
+    return asyncio.run(run())
+
+def bench_backtest(cfg: Config) -> Results:
+    """
+    Candles/sec of the backtest replay: every agent on the growing window,
+    votes recorded in the SignalMatrix. MainBrain and execution are left out
+    (they wait on Groq and the database, not on this process).
+    """
+    import pandas as pd
+    from src.agents.base_agent import SignalMatrix
+    agents = _agents()
+    df = synthetic.ohlc_frame(cfg.backtest_candles, cfg.seed)
+    df["time"] = pd.to_datetime(df["time"], unit="s")
+
+    async def replay():
+        matrix = SignalMatrix([a.name for a in agents], len(df), symbol="SYN000USD")
+        for i in range(50, len(df)):
+            window = df.iloc[:i]
+            signals = await asyncio.gather(*[a.analyze("SYN000USD", window) for a in agents])
+            matrix.record(i, signals, df["time"].iat[i])
+
+    async def run():
+        return await _median_async(replay, max(1, cfg.repeat // 3))
+    seconds = asyncio.run(run())
+    return {"backtest.candles_per_sec": result((len(df) - 50) / seconds, "candles/s", higher_is_better=True)}
+
+def bench_frames(cfg: Config) -> Results:
+    """Candle JSON -> DataFrame (the scanner's per-symbol fetch) and frames -> MarketPanel."""
+    from src.data.panel import MarketPanel, candles_frame
+    rows = synthetic.candle_rows(cfg.frame_rows, cfg.seed)
+    frames = synthetic.universe(cfg.panel_symbols, cfg.panel_length, cfg.seed)
+    return {
+        f"frames.candles_frame.rows{cfg.frame_rows}": result(_median(lambda: candles_frame(rows), cfg.repeat) * 1e3, "ms"),
+        f"frames.panel.s{cfg.panel_symbols}x{cfg.panel_length}": result(
+            _median(lambda: MarketPanel.from_frames(frames), cfg.repeat) * 1e3, "ms"),
+    }
+
+def bench_db(cfg: Config) -> Results:
+    """
+    Bulk-insert throughput (COPY via a stage table) against a local Postgres.
+    Needs BENCH_DATABASE_URL / --dsn; the tables are created if missing and the
+    benchmark rows are deleted afterwards. Skipped without a DSN.
+    """
+    if not cfg.dsn:
+        logger.warning("⏭️ db: no BENCH_DATABASE_URL / --dsn, skipped")
+        return {}
+    from datetime import datetime, timezone
+    from src.data.db_manager import DatabaseManager
+
+    symbol = f"BENCH{os.getpid()}"
+    frame = synthetic.ohlc_frame(cfg.db_rows, cfg.seed)
+    candles = [
+        {"timestamp": datetime.fromtimestamp(int(t), timezone.utc), "open": o, "high": h, "low": l, "close": c, "volume": v}
+        for t, o, h, l, c, v in frame[["time", "open", "high", "low", "close", "volume"]].itertuples(index=False)
+    ]
+    signals = [(c["timestamp"], f"Agent{i % 10}", symbol, "BUY", 0.5, None) for i, c in enumerate(candles)]
+
+    async def run():
+        db = DatabaseManager()
+        db.dsn = cfg.dsn
+        await db.connect()
+        try:
+            start = time.perf_counter()
+            await db.store_ohlc(symbol, candles)
+            ohlc = time.perf_counter() - start
+            start = time.perf_counter()
+            await db.store_agent_signals(signals)
+            stored = time.perf_counter() - start
+            return ohlc, stored
+        finally:
+            async with db.pool.acquire() as conn:
+                await conn.execute("DELETE FROM ohlc_data WHERE symbol = $1", symbol)
+                await conn.execute("DELETE FROM agent_signals WHERE symbol = $1", symbol)
+            await db.disconnect()
+    ohlc, stored = asyncio.run(run())
+    return {
+        "db.store_ohlc.rows_per_sec": result(len(candles) / ohlc, "rows/s", higher_is_better=True),
+        "db.store_agent_signals.rows_per_sec": result(len(signals) / stored, "rows/s", higher_is_better=True),
+    }
+
+class _ReplayConnection:
+    """Feeds recorded messages to WebSocketClient._listen, then ends the stream."""
+    def __init__(self, client, messages):
+        self.client = client
+        self.messages = iter(messages)
+
+    async def recv(self):
+        message = next(self.messages, None)
+        if message is None:
+            self.client.running = False
+            return "{}"
+        return message
+
+def bench_websocket(cfg: Config) -> Results:
+    """Messages/sec through WebSocketClient dispatch into PositionBook.on_ticker (JSON decode included)."""
+    from src.data.websocket_client import WebSocketClient
+    from src.execution.position_book import PositionBook
+    messages = synthetic.ticker_messages(cfg.ws_messages, seed=cfg.seed)
+
+    async def run():
+        client = WebSocketClient()
+        book = PositionBook()
+        # Half the symbols hold a position (entered at their first tick) so exits get checked
+        first = {}
+        for m in messages:
+            tick = json.loads(m)
+            first.setdefault(tick["symbol"], float(tick["mark_price"]))
+        for i, (s, price) in enumerate(sorted(first.items())[::2]):
+            book.open(s, "BUY" if i % 2 else "SELL", price, 1.0, atr=price, mode="PAPER")
+        client.on_message("v2/ticker", book.on_ticker)
+
+        async def dispatch():
+            client.connection = _ReplayConnection(client, messages)
+            client.running = True
+            await client._listen()
+        return await _median_async(dispatch, max(1, cfg.repeat // 2))
+    seconds = asyncio.run(run())
+    return {"websocket.dispatch.msgs_per_sec": result(len(messages) / seconds, "msgs/s", higher_is_better=True)}
+
+BENCHMARKS: Dict[str, Callable[[Config], Results]] = {
+    "agents": bench_agents,
+    "backtest": bench_backtest,
+    "frames": bench_frames,
+    "db": bench_db,
+    "websocket": bench_websocket,
+}
+
+def run(cfg: Config, only: Optional[Sequence[str]] = None) -> Results:
+    results: Results = {}
+    for name in only or BENCHMARKS:
+        start = time.perf_counter()
+        results.update(BENCHMARKS[name](cfg))
+        logger.info(f"⏱️ {name}: {time.perf_counter() - start:.1f}s")
+    return results
@@ -0,0 +1,64 @@
+import json
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+START_TIME = 1_700_000_000  # Fixed so every run sees the same candles
+
+def _rng(seed) -> np.random.Generator:
+    return seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+
+def ohlc_arrays(n: int, seed=0, start_price: float = 100.0, vol: float = 0.01,
+                drift: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Geometric random walk candles. Open is the previous close; high/low wrap
+    the body with a random wick. Same seed, same candles.
+    """
+    rng = _rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(drift, vol, n)))
+    open_ = np.empty(n)
+    open_[0] = start_price
+    open_[1:] = close[:-1]
+    wick = np.abs(rng.normal(0.0, vol / 2, (2, n)))
+    return {
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + wick[0]),
+        "low": np.minimum(open_, close) * (1 - wick[1]),
+        "close": close,
+        "volume": rng.lognormal(10.0, 1.0, n),
+    }
+
+def ohlc_frame(n: int, seed=0, resolution: int = 3600, start_time: int = START_TIME, **kwargs) -> pd.DataFrame:
+    """`n` candles as the scanner builds them (integer `time` in seconds, oldest first)."""
+    arrays = ohlc_arrays(n, seed, **kwargs)
+    return pd.DataFrame({"time": start_time + resolution * np.arange(n, dtype=np.int64), **arrays})
+
+def candle_rows(n: int, seed=0, resolution: int = 3600, start_time: int = START_TIME, **kwargs) -> List[dict]:
+    """Candles shaped like the `result` of Delta's /v2/history/candles (newest first)."""
+    frame = ohlc_frame(n, seed, resolution, start_time, **kwargs)
+    return frame.iloc[::-1].to_dict("records")
+
+def symbols(n: int) -> List[str]:
+    return [f"SYN{i:03d}USD" for i in range(n)]
+
+def universe(n_symbols: int, length: int, seed=0) -> Dict[str, pd.DataFrame]:
+    """Per-symbol frames with independent walks, as `MarketPanel.from_frames` expects."""
+    rng = _rng(seed)
+    return {
+        s: ohlc_frame(length, rng, start_price=float(rng.uniform(1, 1000)), vol=float(rng.uniform(0.005, 0.03)))
+        for s in symbols(n_symbols)
+    }
+
+def ticker_messages(n: int, names: Optional[Sequence[str]] = None, seed=0) -> List[str]:
+    """`v2/ticker` websocket messages (JSON text) cycling through `names`."""
+    rng = _rng(seed)
+    names = list(names or symbols(10))
+    prices = {s: float(rng.uniform(1, 1000)) for s in names}
+    out = []
+    for i, step in enumerate(rng.normal(0.0, 0.001, n)):
+        s = names[i % len(names)]
+        prices[s] *= 1 + step
+        out.append(json.dumps({"type": "v2/ticker", "symbol": s, "mark_price": f"{prices[s]:.6f}",
+                               "timestamp": (START_TIME + i) * 1_000_000}))
+    return out
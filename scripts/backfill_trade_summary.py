@@ -0,0 +1,24 @@
+import asyncio
+import logging
+import sys
+from src.data.db_manager import db_manager
+
+# Configure logging
+logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+
+
+async def main():
+    """Rebuild trade_daily_summary from every closed trade (run after manual edits to `trades`)."""
+    await db_manager.connect()
+    try:
+        await db_manager.rebuild_trade_summary()
+        for mode in ("BACKTEST", "PAPER", "LIVE"):
+            days = await db_manager.get_daily_summary(mode)
+            trades = sum(d['trades'] for d in days)
+            pnl = sum(d['pnl'] for d in days)
+            print(f"{mode}: {len(days)} days, {trades} closed trades, PnL {pnl:+.2f}")
+    finally:
+        await db_manager.disconnect()
+
+if __name__ == "__main__":
+    asyncio.run(main())
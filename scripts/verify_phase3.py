@@ -19,7 +19,7 @@ async def main():
     # 1. Test Groq Connection (Simple)
     print("\n[1] Testing Groq Connection...")
     try:
-        msg = groq_client.query(
+        msg = await groq_client.query(
             messages=[{"role": "user", "content": "Say 'Hello Jarvis'"}],
             model="openai/gpt-oss-120b"
         )
@@ -32,6 +32,7 @@ async def main():
     print("\n[2] Testing NewsSentimentAgent (Browser Automation)...")
     news_agent = NewsSentimentAgent()
     try:
+        await news_agent.feed.refresh(symbol)  # Normally done by the background ingestion
         news_signal = await news_agent.analyze(symbol)
         print(f"✅ News Signal: {news_signal}")
     except Exception as e:
@@ -1,5 +1,9 @@
+import asyncio
+import numpy as np
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from datetime import timezone
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Sequence, Union
 from pydantic import BaseModel
 
 class Signal(BaseModel):
@@ -9,14 +13,132 @@ class Signal(BaseModel):
     confidence: float  # 0.0 to 1.0
     metadata: Dict[str, Any] = {}
 
+class Action(IntEnum):
+    """Integer-coded signal actions (fits in an int8 array)."""
+    SELL = -1
+    NEUTRAL = 0
+    BUY = 1
+    ANALYSIS = 2  # Raw features, no directional view
+
+    @classmethod
+    def parse(cls, value: Union[str, int, "Action"]) -> "Action":
+        if isinstance(value, str):
+            return cls.__members__.get(value.upper(), cls.NEUTRAL)
+        return cls(value)
+
+class CompactSignal:
+    """
+    What agents emit on the per-candle path: no validation, no per-instance
+    __dict__, and the action kept as an Action code. Reads like a Signal
+    (`action` is the name string), so MainBrain, the writer and live state take
+    either; convert with `to_signal()` at an API or persistence boundary.
+    """
+    __slots__ = ("agent_name", "symbol", "code", "confidence", "metadata")
+
+    def __init__(self, agent_name: str, symbol: str, action: Union[str, int, Action], confidence: float,
+                 metadata: Optional[Dict[str, Any]] = None):
+        self.agent_name = agent_name
+        self.symbol = symbol
+        self.code = Action.parse(action)
+        self.confidence = float(confidence)
+        self.metadata = metadata if metadata is not None else {}
+
+    @property
+    def action(self) -> str:
+        return self.code.name
+
+    def to_signal(self) -> Signal:
+        return Signal(agent_name=self.agent_name, symbol=self.symbol, action=self.code.name,
+                      confidence=self.confidence, metadata=self.metadata)
+
+    def __repr__(self):
+        return f"CompactSignal({self.agent_name}, {self.symbol}, {self.code.name}, {self.confidence:.2f})"
+
+class SignalMatrix:
+    """
+    Struct-of-arrays store for backtests: one row per agent, one column per candle.
+    actions:    int8 action codes (see Action)
+    confidence: float32
+    features:   float32 (agent x candle x feature), NaN when an agent doesn't report it
+    """
+    DEFAULT_FEATURES = ("atr", "rsi", "adx", "vol_ratio", "macd_hist", "roc")
+
+    def __init__(self, agent_names: Sequence[str], n_candles: int, feature_names: Sequence[str] = DEFAULT_FEATURES, symbol: str = ""):
+        self.agent_names = list(agent_names)
+        self.feature_names = list(feature_names)
+        self.symbol = symbol
+        self.timestamps = np.zeros(n_candles, dtype="datetime64[s]")
+        self.actions = np.zeros((len(self.agent_names), n_candles), dtype=np.int8)
+        self.confidence = np.zeros((len(self.agent_names), n_candles), dtype=np.float32)
+        self.features = np.full((len(self.agent_names), n_candles, len(self.feature_names)), np.nan, dtype=np.float32)
+        self._agent_index = {name: i for i, name in enumerate(self.agent_names)}
+
+    @property
+    def shape(self):
+        return self.actions.shape
+
+    def record(self, t: int, signals: Sequence[Union[CompactSignal, Signal]], timestamp: Any = None):
+        """Store one candle's worth of signals (any order; matched by agent name)."""
+        if timestamp is not None:
+            if getattr(timestamp, "tzinfo", None) is not None:
+                # datetime64 has no zone: keep UTC wall time
+                timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+            self.timestamps[t] = np.datetime64(timestamp, "s")
+        for s in signals:
+            i = self._agent_index.get(s.agent_name)
+            if i is None:
+                continue
+            self.actions[i, t] = s.code if type(s) is CompactSignal else Action.parse(s.action)
+            self.confidence[i, t] = s.confidence
+            if s.metadata:
+                for k, name in enumerate(self.feature_names):
+                    value = s.metadata.get(name)
+                    if isinstance(value, (int, float)):
+                        self.features[i, t, k] = value
+
+    def to_signals(self, t: int) -> List[Signal]:
+        """Materialize one candle as pydantic Signals (API / persistence boundary)."""
+        signals = []
+        for i, name in enumerate(self.agent_names):
+            metadata = {
+                f: float(v) for f, v in zip(self.feature_names, self.features[i, t]) if not np.isnan(v)
+            }
+            signals.append(Signal(
+                agent_name=name,
+                symbol=self.symbol,
+                action=Action(int(self.actions[i, t])).name,
+                confidence=float(self.confidence[i, t]),
+                metadata=metadata
+            ))
+        return signals
+
+    def action_counts(self) -> Dict[str, Dict[str, int]]:
+        """Per-agent action counts over the whole run."""
+        counts = {a: (self.actions == a).sum(axis=1) for a in Action}
+        return {
+            name: {a.name: int(counts[a][i]) for a in Action}
+            for i, name in enumerate(self.agent_names)
+        }
+
 class BaseAgent(ABC):
     def __init__(self, name: str):
         self.name = name
 
     @abstractmethod
-    async def analyze(self, symbol: str, data: Any) -> Signal:
+    async def analyze(self, symbol: str, data: Any) -> CompactSignal:
         """
         Analyze the given data for the symbol and return a trading signal.
         data: Can be a DataFrame of OHLC, or other relevant data.
         """
         pass
+
+    async def analyze_batch(self, symbols: Sequence[str], panel: Any) -> List[CompactSignal]:
+        """
+        Analyze many symbols in one call and return one signal per symbol (same order).
+        panel: A MarketPanel whose rows are aligned with `symbols`.
+
+        The default falls back to calling `analyze` once per symbol. Agents whose
+        logic is plain array math override this with a single vectorized pass.
+        """
+        tasks = [self.analyze(symbol, panel.frame(i)) for i, symbol in enumerate(symbols)]
+        return list(await asyncio.gather(*tasks))
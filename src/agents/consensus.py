@@ -0,0 +1,105 @@
+import logging
+from typing import Dict, List, Optional
+from src.agents.base_agent import Signal
+
+logger = logging.getLogger(__name__)
+
+class ConsensusResult:
+    __slots__ = ("action", "confidence", "score", "evidence", "agreement", "supporters")
+
+    def __init__(self, action: Optional[str], confidence: float, score: float, evidence: float, agreement: float, supporters: int):
+        self.action = action          # 'BUY' / 'SELL' / 'NEUTRAL', or None = escalate to the LLM
+        self.confidence = confidence
+        self.score = score            # Signed weighted consensus in [-1, 1]
+        self.evidence = evidence      # Share of total weight that holds a directional view
+        self.agreement = agreement    # |buy - sell| / (buy + sell)
+        self.supporters = supporters  # Agents voting with the majority side
+
+    @property
+    def escalate(self) -> bool:
+        return self.action is None
+
+class ConsensusGate:
+    """
+    Cheap pre-LLM stage for MainBrain.
+    Scores the agents' votes with the Judge's weights and only lets genuinely
+    conflicting cases through to the LLM:
+    - almost no directional evidence (e.g. everyone NEUTRAL) -> NEUTRAL
+    - strong, one-sided evidence from enough agents           -> BUY / SELL
+    - anything else                                            -> escalate
+    """
+    def __init__(self,
+                 neutral_evidence: float = 0.05,
+                 decisive_evidence: float = 0.35,
+                 decisive_agreement: float = 0.9,
+                 min_supporters: int = 3,
+                 default_weight: float = 1.0):
+        self.neutral_evidence = neutral_evidence
+        self.decisive_evidence = decisive_evidence
+        self.decisive_agreement = decisive_agreement
+        self.min_supporters = min_supporters
+        self.default_weight = default_weight
+        self.weights: Dict[str, float] = {}
+
+        self.calls = 0
+        self.neutral_shortcuts = 0
+        self.directional_shortcuts = 0
+
+    def update_weights(self, weights: Dict[str, float]):
+        """Swap in the Judge's latest agent weights."""
+        self.weights = dict(weights)
+
+    def evaluate(self, signals: List[Signal]) -> ConsensusResult:
+        self.calls += 1
+        weights = self.weights
+        default = self.default_weight
+
+        total_weight = buy = sell = 0.0
+        buy_votes = sell_votes = 0
+        buy_conf = sell_conf = 0.0
+        for s in signals:
+            w = weights.get(s.agent_name, default)
+            total_weight += w
+            if s.action == "BUY":
+                buy += w * s.confidence
+                buy_conf += w
+                buy_votes += 1
+            elif s.action == "SELL":
+                sell += w * s.confidence
+                sell_conf += w
+                sell_votes += 1
+
+        directional = buy + sell
+        evidence = directional / total_weight if total_weight else 0.0
+        agreement = abs(buy - sell) / directional if directional else 0.0
+        score = (buy - sell) / total_weight if total_weight else 0.0
+
+        if evidence < self.neutral_evidence:
+            self.neutral_shortcuts += 1
+            return ConsensusResult("NEUTRAL", 0.0, score, evidence, agreement, 0)
+
+        action = "BUY" if buy > sell else "SELL"
+        supporters = buy_votes if action == "BUY" else sell_votes
+        if evidence >= self.decisive_evidence and agreement >= self.decisive_agreement and supporters >= self.min_supporters:
+            self.directional_shortcuts += 1
+            side_mass, side_weight = (buy, buy_conf) if action == "BUY" else (sell, sell_conf)
+            confidence = min(1.0, agreement * side_mass / side_weight)
+            return ConsensusResult(action, confidence, score, evidence, agreement, supporters)
+
+        return ConsensusResult(None, 0.0, score, evidence, agreement, supporters)
+
+    @property
+    def avoided_ratio(self) -> float:
+        """Fraction of decisions that never reached the LLM."""
+        if not self.calls:
+            return 0.0
+        return (self.neutral_shortcuts + self.directional_shortcuts) / self.calls
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "calls": self.calls,
+            "neutral_shortcuts": self.neutral_shortcuts,
+            "directional_shortcuts": self.directional_shortcuts,
+            "escalated": self.calls - self.neutral_shortcuts - self.directional_shortcuts,
+            "avoided_ratio": round(self.avoided_ratio, 4),
+        }
@@ -1,17 +1,76 @@
 import logging
-from typing import Any
-from src.agents.base_agent import BaseAgent, Signal
+import numpy as np
+from typing import Any, List, Sequence
+from src.agents.base_agent import BaseAgent, CompactSignal
+from src.data.correlation import CorrelationService, correlation_service
+from src.data.panel import MarketPanel
 
 logger = logging.getLogger(__name__)
 
 class CorrelationAgent(BaseAgent):
-    def __init__(self):
+    """
+    Follows the benchmark (BTC) for symbols that move with it.
+
+    A symbol correlated above `min_corr` gets the direction of the benchmark's
+    move over the last `lookback` closed bars, when that move is larger than
+    one standard deviation of noise; confidence scales with the correlation.
+    Correlations, betas and clusters come from the shared CorrelationService,
+    which the scanner feeds once per bar.
+    """
+    def __init__(self, service: CorrelationService = None, lookback: int = 6, min_corr: float = 0.5):
         super().__init__("CorrelationAgent")
+        self.service = service or correlation_service
+        self.lookback = lookback
+        self.min_corr = min_corr
+
+    def _neutral(self, symbol: str, note: str) -> CompactSignal:
+        return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0, metadata={"note": note})
+
+    async def analyze(self, symbol: str, data: Any) -> CompactSignal:
+        """Single-symbol data carries no cross-asset information: report what the service already knows."""
+        if symbol not in self.service.symbols or symbol == self.service.benchmark:
+            return self._neutral(symbol, "Pending multi-asset data")
+        return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0,
+                      metadata=self._metadata(self.service.lookup(symbol)))
+
+    @staticmethod
+    def _metadata(info: dict) -> dict:
+        return {
+            "beta": round(info["beta"], 4) if np.isfinite(info["beta"]) else None,
+            "corr_btc": round(info["corr_benchmark"], 4) if np.isfinite(info["corr_benchmark"]) else None,
+            "cluster": info["cluster"],
+            "cluster_size": len(info["cluster_members"]),
+        }
+
+    async def analyze_batch(self, symbols: Sequence[str], panel: MarketPanel) -> List[CompactSignal]:
+        self.service.update_panel(panel)  # No-op when the scanner already pushed this bar
+        benchmark = self.service.benchmark
+        if benchmark not in symbols or panel.width < self.lookback + 2:
+            return [self._neutral(s, "Benchmark not in universe") for s in symbols]
+
+        # Benchmark move over the last `lookback` closed bars, in units of its bar volatility
+        b = list(symbols).index(benchmark)
+        closed = panel.close[b, :-1]
+        move = np.log(closed[-1] / closed[-1 - self.lookback])
+        bench_vol = self.service.vol([benchmark])[0] * np.sqrt(self.lookback)
+        z = move / bench_vol if bench_vol > 0 else np.nan
 
-    async def analyze(self, symbol: str, data: Any) -> Signal:
-        """
-        Analyze correlation with other assets (e.g., BTC/ETH).
-        Note: Requires multi-asset data which is not yet in the pipeline.
-        For now, returns NEUTRAL.
-        """
-        return Signal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0, metadata={"note": "Pending multi-asset data"})
+        signals = []
+        for symbol in symbols:
+            if symbol == benchmark:
+                signals.append(self._neutral(symbol, "Benchmark"))
+                continue
+            info = self.service.lookup(symbol)
+            metadata = {**self._metadata(info), "btc_move_z": round(float(z), 2) if np.isfinite(z) else None}
+            c = info["corr_benchmark"]
+            if not np.isfinite(c) or not np.isfinite(z) or c < self.min_corr or abs(z) < 1.0:
+                signals.append(CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0, metadata=metadata))
+                continue
+            signals.append(CompactSignal(
+                agent_name=self.name,
+                symbol=symbol,
+                action="BUY" if z > 0 else "SELL",
+                confidence=round(float(min(c, 1.0) * min(abs(z) / 3.0, 1.0)), 2),
+                metadata=metadata
+            ))
+        return signals
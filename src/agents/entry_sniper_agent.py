@@ -1,13 +1,13 @@
-from src.agents.base_agent import BaseAgent, Signal
+from src.agents.base_agent import BaseAgent, CompactSignal
 from typing import Any
 
 class EntrySniperAgent(BaseAgent):
     def __init__(self):
         super().__init__("EntrySniperAgent")
 
-    async def analyze(self, symbol: str, data: Any = None) -> Signal:
+    async def analyze(self, symbol: str, data: Any = None) -> CompactSignal:
         # Placeholder logic for God Mode expansion
-        return Signal(
+        return CompactSignal(
             agent_name=self.name,
             symbol=symbol,
             action="NEUTRAL",
@@ -1,4 +1,4 @@
-from src.agents.base_agent import BaseAgent, Signal
+from src.agents.base_agent import BaseAgent, CompactSignal
 from typing import Any
 import pandas as pd
 
@@ -6,7 +6,7 @@ class FundingRateAgent(BaseAgent):
     def __init__(self):
         super().__init__("FundingRateAgent")
 
-    async def analyze(self, symbol: str, data: Any = None) -> Signal:
+    async def analyze(self, symbol: str, data: Any = None) -> CompactSignal:
         """
         Analyzes funding rates to detect potential squeezes.
         Expects 'data' to contain ticker info with funding rate, or fetches it.
@@ -31,7 +31,7 @@ class FundingRateAgent(BaseAgent):
         else:
             # Fallback: We can't analyze without data.
             # In "God Mode", the scanner should fetch Ticker data too.
-            return Signal(
+            return CompactSignal(
                 agent_name=self.name,
                 symbol=symbol,
                 action="NEUTRAL",
@@ -46,7 +46,7 @@ class FundingRateAgent(BaseAgent):
         threshold = 0.0001 # 0.01%
         
         if funding_rate > threshold * 5: # Extreme Positive
-            return Signal(
+            return CompactSignal(
                 agent_name=self.name,
                 symbol=symbol,
                 action="SELL",
@@ -54,7 +54,7 @@ class FundingRateAgent(BaseAgent):
                 metadata={"reason": "Extreme Positive Funding (Long Squeeze Risk)", "rate": funding_rate}
             )
         elif funding_rate < -threshold * 5: # Extreme Negative
-            return Signal(
+            return CompactSignal(
                 agent_name=self.name,
                 symbol=symbol,
                 action="BUY",
@@ -62,7 +62,7 @@ class FundingRateAgent(BaseAgent):
                 metadata={"reason": "Extreme Negative Funding (Short Squeeze Risk)", "rate": funding_rate}
             )
             
-        return Signal(
+        return CompactSignal(
             agent_name=self.name,
             symbol=symbol,
             action="NEUTRAL",
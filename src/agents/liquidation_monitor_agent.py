@@ -1,4 +1,4 @@
-from src.agents.base_agent import BaseAgent, Signal
+from src.agents.base_agent import BaseAgent, CompactSignal
 from typing import Any
 import pandas as pd
 
@@ -6,7 +6,7 @@ class LiquidationMonitorAgent(BaseAgent):
     def __init__(self):
         super().__init__("LiquidationMonitorAgent")
 
-    async def analyze(self, symbol: str, data: Any = None) -> Signal:
+    async def analyze(self, symbol: str, data: Any = None) -> CompactSignal:
         """
         Monitors Open Interest (OI) changes to detect liquidation cascades.
         """
@@ -18,7 +18,7 @@ class LiquidationMonitorAgent(BaseAgent):
         elif isinstance(data, pd.DataFrame) and 'oi' in data.columns:
              oi = float(data['oi'].iloc[-1])
         else:
-            return Signal(
+            return CompactSignal(
                 agent_name=self.name,
                 symbol=symbol,
                 action="NEUTRAL",
@@ -34,7 +34,7 @@ class LiquidationMonitorAgent(BaseAgent):
         # For this version, we'll just flag High OI as "Caution".
         # In a full version, we'd track OI changes over time.
         
-        return Signal(
+        return CompactSignal(
             agent_name=self.name,
             symbol=symbol,
             action="NEUTRAL",
@@ -1,14 +1,74 @@
+import asyncio
 import logging
 import json
-from typing import Any, List
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
 from src.agents.base_agent import BaseAgent, Signal
-from src.data.groq_client import groq_client
+from src.agents.consensus import ConsensusGate
+from src.agents.prompt_builder import PromptBuilder, estimate_tokens
+from src.data.groq_client import groq_client, LLMPriority
 
 logger = logging.getLogger(__name__)
 
+DECISION_LOGIC = """
+            TASK:
+            Analyze the conflicting signals.
+            - Technical Analysis provides the raw stats.
+            - Sentiment provides the news.
+            - Whales provide the flow.
+
+            DECISION LOGIC:
+            - If Whales BUY + Tech OVERSOLD -> STRONG BUY
+            - If News FUD + Tech OVERBOUGHT -> STRONG SELL
+            - If signals conflict -> NEUTRAL (Preserve Capital)
+"""
+
+_EMBEDDER = None
+_EMBEDDER_LOCK = threading.Lock()
+
+def _embedder():
+    """The sentence embedding model, loaded once on first use (False if unavailable)."""
+    global _EMBEDDER
+    with _EMBEDDER_LOCK:
+        if _EMBEDDER is not None:
+            return _EMBEDDER
+        try:
+            from sentence_transformers import SentenceTransformer
+            # Use a small, fast model
+            _EMBEDDER = SentenceTransformer('all-MiniLM-L6-v2')
+        except ImportError:
+            logger.warning("sentence-transformers not installed. Skipping embedding generation.")
+            _EMBEDDER = False
+    return _EMBEDDER
+
+def _compact(prompt: str) -> str:
+    """Drop the source-code indentation and blank lines from a prompt template."""
+    return "\n".join(line.strip() for line in prompt.splitlines() if line.strip())
+
+def _strip_code_fence(content: str) -> str:
+    content = content.strip()
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0]
+    elif content.startswith("```"):
+        content = content.split("```")[1].split("```")[0]
+    return content.strip()
+
 class MainBrain(BaseAgent):
-    def __init__(self):
+    def __init__(self, model: Optional[str] = None, latency_budget: Optional[float] = 5.0,
+                 request_token_budget: int = 1500, batch_token_budget: int = 6000):
         super().__init__("MainBrain")
+        self.gate = ConsensusGate()
+        self.prompt_builder = PromptBuilder()
+        self.model = model                                # None = GroqClient's router picks per call
+        self.latency_budget = latency_budget              # Seconds; the router degrades to faster models to meet it
+        self.request_token_budget = request_token_budget  # Hard cap for a single-symbol prompt
+        self.batch_token_budget = batch_token_budget      # Per batched request (prompt + expected answer)
+        self.tokens_per_answer = 80                       # Expected output per symbol in a batch
+        self.request_log = deque(maxlen=1000)             # Per-request size / token / latency records
+        self.priority = LLMPriority.PAPER_DECISION        # Key-pool queue class; the engine sets it from the mode
+        self.decision_deadline = 30.0                     # Seconds a decision may queue for a key before we give up
 
     async def analyze(self, symbol: str, data: Any = None) -> Signal:
         """
@@ -20,90 +80,264 @@ class MainBrain(BaseAgent):
                 logger.warning("MainBrain received invalid data (expected list of Signals)")
                 return Signal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
 
-            # Prepare context for LLM
-            signal_summary = "\n".join(
-                [f"- {s.agent_name}: {s.action} (Conf: {s.confidence:.2f}) | {s.metadata}" for s in data]
-            )
+            # 1. Consensus Gate: skip the LLM when the answer is obvious
+            verdict = self.gate.evaluate(data)
+            if not verdict.escalate:
+                return self._consensus_signal(symbol, verdict)
+
+            return await self._decide_single(symbol, data)
+
+        except Exception as e:
+            logger.error(f"Brain Lobotomy Error: {e}")
+            return Signal(agent_name="MainBrain", symbol=symbol, action="NEUTRAL", confidence=0.0, metadata={"error": str(e)})
+
+    async def analyze_many(self, batch: Dict[str, List[Signal]]) -> Dict[str, Signal]:
+        """
+        Decide for many symbols with as few LLM calls as possible.
+        The consensus gate runs first; the remaining (conflicting) symbols are packed
+        into structured multi-symbol prompts, chunked by `batch_token_budget`.
+        Symbols missing from (or unparseable in) a batched answer fall back to a
+        single-symbol prompt.
+        """
+        decisions: Dict[str, Signal] = {}
+        escalated: Dict[str, List[Signal]] = {}
+
+        for symbol, signals in batch.items():
+            if not signals or not isinstance(signals, list):
+                decisions[symbol] = Signal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
+                continue
+            verdict = self.gate.evaluate(signals)
+            if verdict.escalate:
+                escalated[symbol] = signals
+            else:
+                decisions[symbol] = self._consensus_signal(symbol, verdict)
+
+        if not escalated:
+            return decisions
+
+        chunks = self._chunk(escalated)
+        results = await asyncio.gather(*[self._decide_chunk(chunk) for chunk in chunks], return_exceptions=True)
+
+        fallback = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, Exception):
+                logger.error(f"Batched decision failed for {list(chunk)}: {result}")
+                result = {}
+            decisions.update(result)
+            fallback.extend(symbol for symbol in chunk if symbol not in result)
+
+        if fallback:
+            logger.warning(f"Batched answer incomplete, deciding {len(fallback)} symbols one by one.")
+            singles = await asyncio.gather(*[self._safe_single(symbol, escalated[symbol]) for symbol in fallback])
+            decisions.update(zip(fallback, singles))
+
+        return decisions
+
+    def _consensus_signal(self, symbol: str, verdict) -> Signal:
+        return Signal(
+            agent_name=self.name,
+            symbol=symbol,
+            action=verdict.action,
+            confidence=verdict.confidence,
+            metadata={"source": "consensus", "score": round(verdict.score, 4), "agreement": round(verdict.agreement, 4)}
+        )
+
+    def _summarize(self, signals: List[Signal], token_budget: int = None) -> str:
+        """Compact, weight-ordered summary of the useful signals (see PromptBuilder)."""
+        summary, _ = self.prompt_builder.build(signals, self.gate.weights, token_budget)
+        return summary
+
+    def _symbol_budget(self) -> int:
+        """Largest summary a single symbol may contribute to a batched prompt."""
+        room = self.batch_token_budget - estimate_tokens(self._batch_prompt({})) - self.tokens_per_answer
+        return max(1, min(self.prompt_builder.token_budget, room))
+
+    async def _call_llm(self, prompt: str, n_symbols: int = 1) -> Tuple[str, Dict[str, Any]]:
+        """Run one completion and record its size, token usage and latency."""
+        started = time.perf_counter()
+        completion = await groq_client.complete(
+            messages=[{"role": "user", "content": prompt}],
+            model=self.model,
+            latency_budget=self.latency_budget,
+            temperature=0.1,
+            priority=self.priority,
+            deadline=self.decision_deadline
+        )
+        usage = {
+            "model": completion.model,
+            "symbols": n_symbols,
+            "prompt_chars": len(prompt),
+            "prompt_tokens_est": estimate_tokens(prompt),
+            "prompt_tokens": completion.prompt_tokens,
+            "completion_tokens": completion.completion_tokens,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        self.request_log.append(usage)
+        return completion.message.content, usage
+
+    def usage_stats(self) -> Dict[str, float]:
+        """Averages over the recent LLM requests (for tracking latency vs. prompt size)."""
+        if not self.request_log:
+            return {"requests": 0}
+        n = len(self.request_log)
+        avg = lambda k: round(sum(r[k] or 0 for r in self.request_log) / n, 1)
+        return {
+            "requests": n,
+            "avg_prompt_tokens": avg("prompt_tokens"),
+            "avg_completion_tokens": avg("completion_tokens"),
+            "avg_latency_ms": avg("latency_ms"),
+            "avg_symbols": avg("symbols"),
+        }
 
-            # 2. RAG: Recall "The Past" (The Vector DB Connection)
-            # We assume the Technical Agent's metadata contains a 'vector' or we build a pseudo-vector string
-            # For simplicity, we search memory using a text description of the strongest signal
-            # strongest_signal = max(signals, key=lambda s: s.confidence)
-            # query_context = f"{strongest_signal.agent_name} says {strongest_signal.action} with {strongest_signal.metadata}"
-            
-            # RECALL MEMORY (The "Spark Plug")
-            # In a real system, we'd generate an embedding here: vector = get_embedding(signal_summary)
-            # For now, we log the intent.
-            # past_wisdom = await db_manager.recall_similar_situations(vector)
-            # if past_wisdom:
-            #     prompt += f"\n\nHISTORICAL PRECEDENT:\n{past_wisdom}"
-
-            prompt = f"""
+    def _chunk(self, escalated: Dict[str, List[Signal]]) -> List[Dict[str, List[Signal]]]:
+        """Split symbols into groups whose prompt + expected answer fit the token budget."""
+        base = estimate_tokens(self._batch_prompt({}))
+        symbol_budget = self._symbol_budget()
+        chunks, current, used = [], {}, base
+        for symbol, signals in escalated.items():
+            cost = estimate_tokens(self._summarize(signals, symbol_budget)) + self.tokens_per_answer
+            if current and used + cost > self.batch_token_budget:
+                chunks.append(current)
+                current, used = {}, base
+            current[symbol] = signals
+            used += cost
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _batch_prompt(self, chunk: Dict[str, List[Signal]]) -> str:
+        symbol_budget = self._symbol_budget() if chunk else None
+        blocks = "\n".join(f"### {symbol}\n{self._summarize(signals, symbol_budget)}" for symbol, signals in chunk.items())
+        return _compact(f"""
             You are the Head Trader of a Crypto Hedge Fund.
-            
+
+            CURRENT MARKET DATA (The "Now"), one block per symbol:
+            Each line: agent action confidence key=value...
+            {blocks}
+            {DECISION_LOGIC}
+            Decide each symbol independently.
+            Return ONLY a JSON array with one object per symbol:
+            [{{ "symbol": "...", "action": "BUY/SELL/NEUTRAL", "confidence": 0.0-1.0, "reasoning": "..." }}]
+            """)
+
+    def _single_prompt(self, signal_summary: str) -> str:
+        return _compact(f"""
+            You are the Head Trader of a Crypto Hedge Fund.
+
             CURRENT MARKET DATA (The "Now"):
+            Each line: agent action confidence key=value...
             {signal_summary}
-            
-            TASK:
-            Analyze the conflicting signals. 
-            - Technical Analysis provides the raw stats.
-            - Sentiment provides the news.
-            - Whales provide the flow.
-            
-            DECISION LOGIC:
-            - If Whales BUY + Tech OVERSOLD -> STRONG BUY
-            - If News FUD + Tech OVERBOUGHT -> STRONG SELL
-            - If signals conflict -> NEUTRAL (Preserve Capital)
-            
+            {DECISION_LOGIC}
             Return JSON: {{ "action": "BUY/SELL/NEUTRAL", "confidence": 0.0-1.0, "reasoning": "..." }}
-            """
+            """)
 
-            # Call Groq
-            response = groq_client.query(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama3-70b-8192", # Use a smart model
-                temperature=0.1
-            )
-            
-            # Parse
-            content = response.content.strip()
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            
-            decision = json.loads(content)
-            
-            # 4. STORE THIS THOUGHT (Save to Memory)
-            # We save the "Scenario" so we can remember it later
-            # (In V2, we generate an embedding here)
-            # Import db_manager here to avoid circular import if needed, or rely on top-level
-            from src.data.db_manager import db_manager
-            
-            # Generate Embedding
-            vector = None
-            try:
-                from sentence_transformers import SentenceTransformer
-                # Use a small, fast model
-                model = SentenceTransformer('all-MiniLM-L6-v2')
-                vector = model.encode(signal_summary).tolist()
-            except ImportError:
-                logger.warning("sentence-transformers not installed. Skipping embedding generation.")
-            except Exception as e:
-                logger.error(f"Embedding generation failed: {e}")
-
-            await db_manager.store_thought(
-                symbol=symbol, 
-                vector=vector, 
-                description=f"Signals: {signal_summary[:200]}... Result: {decision.get('action')}"
-            )
+    async def _decide_chunk(self, chunk: Dict[str, List[Signal]]) -> Dict[str, Signal]:
+        if len(chunk) == 1:
+            symbol, signals = next(iter(chunk.items()))
+            return {symbol: await self._decide_single(symbol, signals)}
+
+        content, usage = await self._call_llm(self._batch_prompt(chunk), n_symbols=len(chunk))
+        decisions = self._parse_batch(content, chunk, usage)
+
+        await asyncio.gather(
+            *[self._remember(symbol, self._summarize(chunk[symbol]), d.action) for symbol, d in decisions.items()],
+            return_exceptions=True
+        )
+        return decisions
 
-            return Signal(
-                agent_name="MainBrain",
+    def _parse_batch(self, content: str, chunk: Dict[str, List[Signal]], usage: Dict[str, Any] = None) -> Dict[str, Signal]:
+        """Per-symbol parse: one bad entry doesn't discard the rest of the answer."""
+        content = _strip_code_fence(content or "")
+        start, end = content.find("["), content.rfind("]")
+        if start == -1 or end == -1:
+            return {}
+        try:
+            entries = json.loads(content[start:end + 1])
+        except json.JSONDecodeError:
+            return {}
+
+        wanted = {symbol.upper(): symbol for symbol in chunk}
+        decisions = {}
+        for entry in entries if isinstance(entries, list) else []:
+            try:
+                symbol = wanted.get(str(entry["symbol"]).upper())
+                action = str(entry.get("action", "NEUTRAL")).upper()
+                confidence = float(entry.get("confidence", 0.0))
+            except (KeyError, TypeError, ValueError, AttributeError):
+                continue
+            if symbol is None or action not in ("BUY", "SELL", "NEUTRAL") or not 0.0 <= confidence <= 1.0:
+                continue
+            decisions[symbol] = Signal(
+                agent_name=self.name,
                 symbol=symbol,
-                action=decision.get("action", "NEUTRAL").upper(),
-                confidence=float(decision.get("confidence", 0.0)),
-                metadata={"reasoning": decision.get("reasoning", "")}
+                action=action,
+                confidence=confidence,
+                metadata={"source": "llm_batch", "model": (usage or {}).get("model"), "reasoning": entry.get("reasoning", ""), "usage": usage or {}}
             )
+        return decisions
 
+    async def _safe_single(self, symbol: str, signals: List[Signal]) -> Signal:
+        try:
+            return await self._decide_single(symbol, signals)
         except Exception as e:
             logger.error(f"Brain Lobotomy Error: {e}")
             return Signal(agent_name="MainBrain", symbol=symbol, action="NEUTRAL", confidence=0.0, metadata={"error": str(e)})
+
+    async def _decide_single(self, symbol: str, data: List[Signal]) -> Signal:
+        # Prepare context for LLM (within the per-request token budget)
+        summary_budget = self.request_token_budget - estimate_tokens(self._single_prompt(""))
+        signal_summary = self._summarize(data, max(1, summary_budget))
+
+        # 2. RAG: Recall "The Past" (The Vector DB Connection)
+        # We assume the Technical Agent's metadata contains a 'vector' or we build a pseudo-vector string
+        # For simplicity, we search memory using a text description of the strongest signal
+        # strongest_signal = max(signals, key=lambda s: s.confidence)
+        # query_context = f"{strongest_signal.agent_name} says {strongest_signal.action} with {strongest_signal.metadata}"
+
+        # RECALL MEMORY (The "Spark Plug")
+        # In a real system, we'd generate an embedding here: vector = get_embedding(signal_summary)
+        # For now, we log the intent.
+        # past_wisdom = await db_manager.recall_similar_situations(vector)
+        # if past_wisdom:
+        #     prompt += f"\n\nHISTORICAL PRECEDENT:\n{past_wisdom}"
+
+        prompt = self._single_prompt(signal_summary)
+
+        # Call Groq
+        content, usage = await self._call_llm(prompt)
+
+        # Parse
+        decision = json.loads(_strip_code_fence(content))
+
+        await self._remember(symbol, signal_summary, decision.get('action'))
+
+        return Signal(
+            agent_name="MainBrain",
+            symbol=symbol,
+            action=decision.get("action", "NEUTRAL").upper(),
+            confidence=float(decision.get("confidence", 0.0)),
+            metadata={"source": "llm", "model": usage["model"], "reasoning": decision.get("reasoning", ""), "usage": usage}
+        )
+
+    async def _remember(self, symbol: str, signal_summary: str, action: str):
+        # 4. STORE THIS THOUGHT (Save to Memory)
+        # We save the "Scenario" so we can remember it later
+        # (In V2, we generate an embedding here)
+        # Import db_manager here to avoid circular import if needed, or rely on top-level
+        from src.data.db_manager import db_manager
+
+        # Generate Embedding
+        vector = None
+        try:
+            # Model load and encoding are CPU-bound: keep them off the event loop
+            model = await asyncio.to_thread(_embedder)
+            if model:
+                vector = (await asyncio.to_thread(model.encode, signal_summary)).tolist()
+        except Exception as e:
+            logger.error(f"Embedding generation failed: {e}")
+
+        await db_manager.store_thought(
+            symbol=symbol,
+            vector=vector,
+            description=f"Signals: {signal_summary[:200]}... Result: {action}"
+        )
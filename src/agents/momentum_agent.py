@@ -1,7 +1,7 @@
 import logging
 import talib
 from typing import Any
-from src.agents.base_agent import BaseAgent, Signal
+from src.agents.base_agent import BaseAgent, CompactSignal
 
 logger = logging.getLogger(__name__)
 
@@ -9,13 +9,13 @@ class MomentumAgent(BaseAgent):
     def __init__(self):
         super().__init__("MomentumAgent")
 
-    async def analyze(self, symbol: str, data: Any) -> Signal:
+    async def analyze(self, symbol: str, data: Any) -> CompactSignal:
         """
         Analyze momentum using Stochastic Oscillator and ROC.
         """
         try:
             if data is None or data.empty:
-                return Signal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
+                return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
 
             # Ensure data is float64 for talib
             # Ensure data is float (double) for TA-Lib
@@ -48,7 +48,7 @@ class MomentumAgent(BaseAgent):
                     action = "SELL"
                     confidence = 0.7
 
-            return Signal(
+            return CompactSignal(
                 agent_name=self.name,
                 symbol=symbol,
                 action=action,
@@ -58,4 +58,4 @@ class MomentumAgent(BaseAgent):
 
         except Exception as e:
             logger.error(f"Momentum analysis failed: {e}")
-            return Signal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
+            return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
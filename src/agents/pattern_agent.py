@@ -1,8 +1,7 @@
 import logging
 import numpy as np
 from typing import Any
-from scipy.signal import find_peaks
-from src.agents.base_agent import BaseAgent, Signal
+from src.agents.base_agent import BaseAgent, CompactSignal
 
 logger = logging.getLogger(__name__)
 
@@ -10,14 +9,16 @@ class PatternRecognitionAgent(BaseAgent):
     def __init__(self):
         super().__init__("PatternRecognitionAgent")
 
-    async def analyze(self, symbol: str, data: Any) -> Signal:
+    async def analyze(self, symbol: str, data: Any) -> CompactSignal:
         """
         Identify chart patterns like Double Top/Bottom using peak detection.
         data: DataFrame with 'close' prices.
         """
         try:
             if data is None or data.empty:
-                return Signal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
+                return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
+
+            from scipy.signal import find_peaks  # ~0.8s to import: paid on first analysis, not at startup
 
             close = data['close'].values
             
@@ -47,7 +48,7 @@ class PatternRecognitionAgent(BaseAgent):
                     confidence = 0.6
                     pattern = "Double Bottom"
 
-            return Signal(
+            return CompactSignal(
                 agent_name=self.name,
                 symbol=symbol,
                 action=action,
@@ -57,4 +58,4 @@ class PatternRecognitionAgent(BaseAgent):
 
         except Exception as e:
             logger.error(f"Pattern analysis failed: {e}")
-            return Signal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
+            return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
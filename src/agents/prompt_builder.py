@@ -0,0 +1,82 @@
+import math
+from typing import Any, Dict, List, Optional, Tuple
+from src.agents.base_agent import Signal
+
+def estimate_tokens(text: str) -> int:
+    """~4 characters per token; close enough for budgeting."""
+    return len(text) // 4 + 1
+
+class PromptBuilder:
+    """
+    Turns agent signals into a compact, budgeted block for MainBrain prompts.
+    - Drops zero-confidence, errored and placeholder signals (metadata["placeholder"] set
+      by agents that have no real view yet).
+    - Encodes metadata as short `key=value` pairs with rounded numbers.
+    - Orders agents by Judge weight so the budget cuts the least trusted ones first.
+    """
+    def __init__(self, token_budget: int = 1200, significant_digits: int = 4, max_text_len: int = 60):
+        self.token_budget = token_budget
+        self.significant_digits = significant_digits
+        self.max_text_len = max_text_len
+
+    def is_placeholder(self, signal: Signal) -> bool:
+        if signal.confidence <= 0.0:
+            return True
+        metadata = signal.metadata or {}
+        return "error" in metadata or metadata.get("placeholder") is True
+
+    def _format_value(self, value: Any) -> Optional[str]:
+        if isinstance(value, bool):
+            return str(value).lower()
+        if isinstance(value, (int, float)):
+            if isinstance(value, float) and not math.isfinite(value):
+                return None
+            return f"{value:.{self.significant_digits}g}"
+        if isinstance(value, str):
+            value = value.strip()
+            return value[:self.max_text_len] if value else None
+        if isinstance(value, (list, tuple)):
+            parts = [p for p in (self._format_value(v) for v in value) if p]
+            return "; ".join(parts)[:self.max_text_len] if parts else None
+        return None
+
+    def encode(self, signal: Signal) -> str:
+        name = signal.agent_name[:-5] if signal.agent_name.endswith("Agent") else signal.agent_name
+        parts = [f"{name} {signal.action} {signal.confidence:.2f}"]
+        for key, value in (signal.metadata or {}).items():
+            if key == "placeholder":
+                continue
+            text = self._format_value(value)
+            if text is not None:
+                parts.append(f"{key}={text}")
+        return " ".join(parts)
+
+    def build(self, signals: List[Signal], weights: Optional[Dict[str, float]] = None,
+              token_budget: Optional[int] = None) -> Tuple[str, Dict[str, int]]:
+        """
+        Returns (summary_text, stats). stats has kept / placeholders / over_budget / tokens.
+        """
+        weights = weights or {}
+        budget = token_budget or self.token_budget
+
+        useful = [s for s in signals if not self.is_placeholder(s)]
+        useful.sort(key=lambda s: (weights.get(s.agent_name, 1.0), s.confidence), reverse=True)
+
+        lines, used = [], 0
+        for s in useful:
+            line = f"- {self.encode(s)}"
+            cost = estimate_tokens(line)
+            if used + cost > budget:
+                break
+            lines.append(line)
+            used += cost
+
+        stats = {
+            "kept": len(lines),
+            "placeholders": len(signals) - len(useful),
+            "over_budget": len(useful) - len(lines),
+            "tokens": used,
+        }
+        if not lines:
+            return "- (no agent has an active view)", stats
+        return "\n".join(lines), stats
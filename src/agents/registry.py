@@ -0,0 +1,152 @@
+import importlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.agents.base_agent import BaseAgent
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Cheapest first: plain array math, then TA-Lib/SciPy, then agents that do I/O
+COST_CLASSES = ("light", "medium", "heavy")
+
+@dataclass(frozen=True)
+class AgentSpec:
+    """
+    One manifest entry. Nothing is imported until the agent is first used.
+    requires: data the agent needs to say anything useful ('ohlc', 'news',
+              'funding', 'oi', ...). It is skipped when the engine can't supply it.
+    """
+    name: str
+    module: str
+    class_name: str
+    cost: str = "light"
+    enabled: bool = True
+    requires: Tuple[str, ...] = ("ohlc",)
+
+# Placeholders (they only ever answer NEUTRAL "Waiting for Data stream") are
+# listed so they can be switched on once their data exists, but start disabled.
+MANIFEST: Tuple[AgentSpec, ...] = (
+    AgentSpec("TechnicalAnalysisAgent", "src.agents.technical_agent", "TechnicalAnalysisAgent", cost="medium"),
+    AgentSpec("TrendFollowingAgent", "src.agents.trend_agent", "TrendFollowingAgent", cost="medium"),
+    AgentSpec("MomentumAgent", "src.agents.momentum_agent", "MomentumAgent", cost="medium"),
+    AgentSpec("VolumeAnalysisAgent", "src.agents.volume_agent", "VolumeAnalysisAgent", cost="medium"),
+    AgentSpec("VolatilityAgent", "src.agents.volatility_agent", "VolatilityAgent"),
+    AgentSpec("PatternRecognitionAgent", "src.agents.pattern_agent", "PatternRecognitionAgent", cost="medium"),
+    AgentSpec("WhaleMovementAgent", "src.agents.whale_movement_agent", "WhaleMovementAgent"),
+    AgentSpec("RiskManagementAgent", "src.agents.risk_management_agent", "RiskManagementAgent"),
+    AgentSpec("CorrelationAgent", "src.agents.correlation_agent", "CorrelationAgent"),
+    AgentSpec("NewsSentimentAgent", "src.agents.news_agent", "NewsSentimentAgent", cost="heavy", requires=("news",)),
+    AgentSpec("StopLossOptimizerAgent", "src.agents.stop_loss_optimizer", "StopLossOptimizerAgent", cost="heavy"),
+    AgentSpec("FundingRateAgent", "src.agents.funding_rate_agent", "FundingRateAgent", requires=("funding",)),
+    AgentSpec("LiquidationMonitorAgent", "src.agents.liquidation_monitor_agent", "LiquidationMonitorAgent", requires=("oi",)),
+    AgentSpec("SentimentAggregationAgent", "src.agents.sentiment_aggregation_agent", "SentimentAggregationAgent", enabled=False, requires=("social",)),
+    AgentSpec("AnomalyDetectionAgent", "src.agents.anomaly_detection_agent", "AnomalyDetectionAgent", enabled=False),
+    AgentSpec("CrossExchangeArbitrage", "src.agents.cross_exchange_arbitrage", "CrossExchangeArbitrage", enabled=False, requires=("exchanges",)),
+    AgentSpec("EconomicCalendarAgent", "src.agents.economic_calendar_agent", "EconomicCalendarAgent", enabled=False, requires=("calendar",)),
+    AgentSpec("EntrySniperAgent", "src.agents.entry_sniper_agent", "EntrySniperAgent", enabled=False),
+    AgentSpec("ExchangeInflowAgent", "src.agents.exchange_inflow_agent", "ExchangeInflowAgent", enabled=False, requires=("onchain",)),
+    AgentSpec("GasFeeAgent", "src.agents.gas_fee_agent", "GasFeeAgent", enabled=False, requires=("onchain",)),
+    AgentSpec("MarketRegimeAgent", "src.agents.market_regime_agent", "MarketRegimeAgent", enabled=False),
+    AgentSpec("MeanReversionAgent", "src.agents.mean_reversion_agent", "MeanReversionAgent", enabled=False),
+    AgentSpec("OptionsFlowAgent", "src.agents.options_flow_agent", "OptionsFlowAgent", enabled=False, requires=("options",)),
+    AgentSpec("OrderBookAgent", "src.agents.order_book_agent", "OrderBookAgent", enabled=False, requires=("orderbook",)),
+    AgentSpec("PositionSizingAgent", "src.agents.position_sizing_agent", "PositionSizingAgent", enabled=False),
+    AgentSpec("SessionAgent", "src.agents.session_agent", "SessionAgent", enabled=False),
+    AgentSpec("SmartMoneyAgent", "src.agents.smart_money_agent", "SmartMoneyAgent", enabled=False),
+    AgentSpec("SpreadAgent", "src.agents.spread_agent", "SpreadAgent", enabled=False, requires=("orderbook",)),
+    AgentSpec("StakingAgent", "src.agents.staking_agent", "StakingAgent", enabled=False, requires=("onchain",)),
+    AgentSpec("VolatilitySmileAgent", "src.agents.volatility_smile_agent", "VolatilitySmileAgent", enabled=False, requires=("options",)),
+)
+
+class AgentRegistry:
+    """
+    Declarative agent loading. The manifest says which agents exist; a module
+    is imported and its agent built only the first time it is asked for, so
+    disabled agents (and their TA-Lib/SciPy imports) never cost anything.
+
+    enable/disable: agent names overriding the manifest's `enabled` flag.
+    """
+    def __init__(self, manifest: Iterable[AgentSpec] = MANIFEST,
+                 enable: Iterable[str] = (), disable: Iterable[str] = ()):
+        self.specs: Dict[str, AgentSpec] = {spec.name: spec for spec in manifest}
+        for name in set(enable) | set(disable):
+            if name not in self.specs:
+                logger.warning(f"⚠️ Unknown agent in overrides: {name}")
+        self._overrides = {**{n: True for n in enable}, **{n: False for n in disable}}
+        self._instances: Dict[str, BaseAgent] = {}
+        self._failed: Dict[str, str] = {}
+        self._active: Dict[Optional[frozenset], List[BaseAgent]] = {}  # By `available`, until overrides change
+        self.import_times: Dict[str, float] = {}
+
+    def is_enabled(self, name: str) -> bool:
+        return self._overrides.get(name, self.specs[name].enabled)
+
+    def set_enabled(self, name: str, enabled: bool):
+        if name not in self.specs:
+            raise KeyError(name)
+        self._overrides[name] = enabled
+        self._active.clear()
+
+    def selected(self, available: Optional[Iterable[str]] = None) -> List[AgentSpec]:
+        """Enabled specs whose required data is in `available` (None: don't filter)."""
+        have = None if available is None else set(available)
+        return [
+            spec for spec in self.specs.values()
+            if self.is_enabled(spec.name) and (have is None or have.issuperset(spec.requires))
+        ]
+
+    def get(self, name: str) -> Optional[BaseAgent]:
+        """The agent instance, importing its module on first use. None if it failed to load."""
+        if name in self._instances:
+            return self._instances[name]
+        if name in self._failed:
+            return None
+        spec = self.specs[name]
+        start = time.perf_counter()
+        try:
+            module = importlib.import_module(spec.module)
+            agent = getattr(module, spec.class_name)()
+        except Exception as e:
+            self._failed[name] = str(e)
+            logger.error(f"❌ Failed to load {name}: {e}")
+            return None
+        finally:
+            self.import_times[name] = time.perf_counter() - start
+        self._instances[name] = agent
+        logger.info(f"✅ Loaded Agent: {name} ({self.import_times[name] * 1000:.0f} ms)")
+        return agent
+
+    def active(self, available: Optional[Iterable[str]] = None) -> List[BaseAgent]:
+        """Instances of every selected agent, cheapest cost class first (built once per `available`)."""
+        key = None if available is None else frozenset(available)
+        agents = self._active.get(key)
+        if agents is None:
+            specs = sorted(self.selected(available), key=lambda s: COST_CLASSES.index(s.cost))
+            agents = self._active[key] = [agent for agent in (self.get(s.name) for s in specs) if agent is not None]
+        return agents
+
+    def loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def stats(self) -> Dict[str, object]:
+        skipped = [n for n in self.specs if not self.is_enabled(n)]
+        return {
+            "loaded": len(self._instances),
+            "failed": dict(self._failed),
+            "disabled": len(skipped),
+            "import_seconds": round(sum(self.import_times.values()), 4),
+            "slowest": sorted(self.import_times.items(), key=lambda kv: kv[1], reverse=True)[:5],
+        }
+
+    def report(self):
+        """Log the import time of every agent loaded so far, slowest first."""
+        stats = self.stats()
+        timings = ", ".join(f"{n} {t * 1000:.0f}ms" for n, t in stats["slowest"])
+        logger.info(
+            f"🧩 Agents: {stats['loaded']} loaded in {stats['import_seconds']:.2f}s, "
+            f"{stats['disabled']} disabled, {len(stats['failed'])} failed. Slowest: {timings or '-'}"
+        )
+
+agent_registry = AgentRegistry(MANIFEST, enable=settings.AGENTS_ENABLE, disable=settings.AGENTS_DISABLE)
@@ -1,23 +1,42 @@
-from src.agents.base_agent import BaseAgent, Signal
-from typing import Any
+from src.agents.base_agent import BaseAgent, CompactSignal
+from src.data.panel import MarketPanel, trailing_mean
+from typing import Any, List, Sequence
 
 class RiskManagementAgent(BaseAgent):
     def __init__(self):
         super().__init__("RiskManagementAgent")
 
-    async def analyze(self, symbol: str, data: Any = None) -> Signal:
+    async def analyze(self, symbol: str, data: Any = None) -> CompactSignal:
         # Basic Risk Check: High Volatility = Reduce Size
         try:
             if data is None or data.empty:
-                return Signal(self.name, symbol, "NEUTRAL", 0.0, {"status": "No Data"})
+                return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0, metadata={"status": "No Data"})
             
             # Calculate ATR-like volatility (High - Low)
             high_low = (data['high'] - data['low']) / data['close']
             avg_volatility = high_low.rolling(14).mean().iloc[-1]
             
             if avg_volatility > 0.05: # >5% daily move is risky
-                return Signal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=1.0, metadata={"risk": "HIGH_VOLATILITY", "advice": "Reduce Position Size"})
+                return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=1.0, metadata={"risk": "HIGH_VOLATILITY", "advice": "Reduce Position Size"})
             
-            return Signal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0, metadata={"risk": "NORMAL", "status": "Safe to Trade"})
+            return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0, metadata={"risk": "NORMAL", "status": "Safe to Trade"})
         except Exception as e:
-            return Signal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0, metadata={"error": str(e)})
+            return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0, metadata={"error": str(e)})
+
+    async def analyze_batch(self, symbols: Sequence[str], panel: MarketPanel) -> List[CompactSignal]:
+        """Vectorized volatility risk check across every symbol of the panel."""
+        if panel.width == 0:
+            return await super().analyze_batch(symbols, panel)
+
+        avg_volatility = trailing_mean((panel.high - panel.low) / panel.close, 14)
+        high_risk = avg_volatility > 0.05
+
+        signals = []
+        for i, symbol in enumerate(symbols):
+            if panel.lengths[i] == 0:
+                signals.append(CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0, metadata={"status": "No Data"}))
+            elif high_risk[i]:
+                signals.append(CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=1.0, metadata={"risk": "HIGH_VOLATILITY", "advice": "Reduce Position Size"}))
+            else:
+                signals.append(CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0, metadata={"risk": "NORMAL", "status": "Safe to Trade"}))
+        return signals
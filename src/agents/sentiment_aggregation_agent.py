@@ -1,11 +1,11 @@
-from src.agents.base_agent import BaseAgent, Signal
+from src.agents.base_agent import BaseAgent, CompactSignal
 from typing import Any
 
 class SentimentAggregationAgent(BaseAgent):
     def __init__(self):
         super().__init__("SentimentAggregationAgent")
 
-    async def analyze(self, symbol: str, data: Any = None) -> Signal:
+    async def analyze(self, symbol: str, data: Any = None) -> CompactSignal:
         """
         Aggregates sentiment from NewsSentimentAgent and potentially others.
         'data' is expected to be a list of Signals from other agents, or we run them here.
@@ -21,10 +21,10 @@ class SentimentAggregationAgent(BaseAgent):
         # as we don't have Twitter/Reddit scrapers yet.
         # Or if data contains "news_sentiment", we boost it.
         
-        return Signal(
+        return CompactSignal(
             agent_name=self.name,
             symbol=symbol,
             action="NEUTRAL",
             confidence=0.5,
-            metadata={"status": "Aggregating Social Sentiment (Pending Twitter API)"}
+            metadata={"status": "Aggregating Social Sentiment (Pending Twitter API)", "placeholder": True}
         )
@@ -1,16 +1,108 @@
-from src.agents.base_agent import BaseAgent, Signal
-from typing import Any
+import asyncio
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Sequence
+from src.agents.base_agent import BaseAgent, CompactSignal
+from src.data.db_manager import db_manager
+from src.data.panel import MarketPanel
+from src.risk.risk_manager import risk_manager
+from src.risk.stop_optimizer import StopOptimizer, StopTable, rolling_atr
 
-class StopLossOptimizer(BaseAgent):
-    def __init__(self):
-        super().__init__("StopLossOptimizer")
+logger = logging.getLogger(__name__)
 
-    async def analyze(self, symbol: str, data: Any = None) -> Signal:
-        # Placeholder logic for God Mode expansion
-        return Signal(
+def entry_bars(times: np.ndarray, entry_times: np.ndarray) -> np.ndarray:
+    """
+    Bar index of each entry, given candle open times: the first bar opening at or
+    after the signal. A bar still forming when the signal fired has traded partly
+    before the entry, so it is skipped. The entry fills at that bar's close and
+    `excursions` starts its window at the bar after.
+    """
+    return np.searchsorted(times, entry_times, side="left")
+
+class StopLossOptimizerAgent(BaseAgent):
+    """
+    Reports the ATR and the optimized stop for each symbol, and (periodically)
+    re-fits the stop table from stored OHLC and past MainBrain entries.
+    Only decisions above `min_confidence` (the scanner's execution threshold)
+    count as entries; weaker calls were never traded.
+    """
+    def __init__(self, optimizer: StopOptimizer = None, lookback_days: int = 180, min_confidence: float = 0.8):
+        super().__init__("StopLossOptimizerAgent")
+        self.optimizer = optimizer or StopOptimizer()
+        self.lookback_days = lookback_days
+        self.min_confidence = min_confidence
+
+    def _signal(self, symbol: str, atr: float, price: float) -> CompactSignal:
+        if not np.isfinite(atr) or not price:
+            return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0, metadata={"status": "Waiting for Data stream"})
+        table = risk_manager.stop_table
+        multiplier = table.multiplier(symbol, atr, price)
+        return CompactSignal(
             agent_name=self.name,
             symbol=symbol,
-            action="NEUTRAL",
-            confidence=0.0,
-            metadata={"status": "Waiting for Data stream"}
+            action="ANALYSIS",
+            confidence=0.5,
+            metadata={
+                "atr": float(atr),
+                "regime": table.regime(symbol, atr, price) or "UNFITTED",
+                "stop_multiplier": multiplier,
+                "stop_distance_pct": float(multiplier * atr / price),
+            }
         )
+
+    async def analyze(self, symbol: str, data: Any = None) -> CompactSignal:
+        if data is None or not isinstance(data, pd.DataFrame) or data.empty:
+            return self._signal(symbol, np.nan, 0.0)
+        high, low, close = (data[c].to_numpy(dtype=float) for c in ("high", "low", "close"))
+        atr = rolling_atr(high, low, close, self.optimizer.atr_window)[-1]
+        return self._signal(symbol, atr, float(close[-1]))
+
+    async def analyze_batch(self, symbols: Sequence[str], panel: MarketPanel) -> List[CompactSignal]:
+        if panel.width == 0:
+            return await super().analyze_batch(symbols, panel)
+        atr = panel.atr(self.optimizer.atr_window)
+        price = panel.close[:, -1]
+        return [self._signal(symbol, atr[i], float(price[i]) if panel.lengths[i] else 0.0) for i, symbol in enumerate(symbols)]
+
+    async def optimize(self, symbols: Sequence[str], end: datetime = None) -> StopTable:
+        """
+        Re-fit stops for `symbols` from the database and publish the table to the
+        RiskManager. Symbols without enough history keep their previous entry.
+        """
+        end = end or datetime.now(timezone.utc)
+        start = end - timedelta(days=self.lookback_days)
+        fitted = dict(risk_manager.stop_table.symbols)
+
+        for symbol in symbols:
+            candles = await db_manager.get_ohlc(symbol, start, end)
+            signals = await db_manager.get_entry_signals(symbol, start, end, min_confidence=self.min_confidence)
+            if not candles or not signals:
+                continue
+
+            times = np.array([c['timestamp'].timestamp() for c in candles])
+            ohlc = {f: np.array([c[f] for c in candles], dtype=float) for f in ("high", "low", "close")}
+            entry_times = np.array([s['timestamp'].timestamp() for s in signals])
+            entries = entry_bars(times, entry_times)
+            directions = np.where(np.array([s['signal'] for s in signals]) == "BUY", 1.0, -1.0)
+
+            result = self.optimizer.optimize_symbol(ohlc["high"], ohlc["low"], ohlc["close"], entries, directions)
+            if result is None:
+                logger.info(f"🎯 {symbol}: not enough entries to fit stops ({len(signals)} signals).")
+                continue
+            fitted[symbol] = result
+            logger.info(f"🎯 {symbol}: stop multipliers {result['multipliers']} (expectancy {result['expectancy']})")
+
+        table = StopTable(fitted, default=risk_manager.stop_table.default)
+        table.save(risk_manager.stop_table_path)
+        risk_manager.set_stop_table(table)
+        return table
+
+# Usage
+if __name__ == "__main__":
+    async def _main():
+        await db_manager.connect()
+        await StopLossOptimizerAgent().optimize(["BTCUSD", "ETHUSD"])
+        await db_manager.disconnect()
+    asyncio.run(_main())
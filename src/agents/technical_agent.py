@@ -1,19 +1,19 @@
 import talib
 import pandas as pd
 import numpy as np
-from src.agents.base_agent import BaseAgent, Signal
+from src.agents.base_agent import BaseAgent, CompactSignal
 
 class TechnicalAnalysisAgent(BaseAgent):
     def __init__(self):
         super().__init__("TechnicalAnalysisAgent")
 
-    async def analyze(self, symbol: str, data: pd.DataFrame) -> Signal:
+    async def analyze(self, symbol: str, data: pd.DataFrame) -> CompactSignal:
         """
         Analyze technical indicators: RSI, MACD, SMA.
         data: DataFrame with 'close' column.
         """
         if data.empty or len(data) < 30:
-            return Signal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
+            return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
 
         close = data['close'].values
 
@@ -39,7 +39,7 @@ class TechnicalAnalysisAgent(BaseAgent):
 
         # Return Raw Features (No Decision)
         # The Main Brain will decide if RSI 35 is a buy or sell based on context
-        return Signal(
+        return CompactSignal(
             agent_name=self.name,
             symbol=symbol,
             action="ANALYSIS", # Placeholder
@@ -1,17 +1,17 @@
 import talib
 import pandas as pd
-from src.agents.base_agent import BaseAgent, Signal
+from src.agents.base_agent import BaseAgent, CompactSignal
 
 class TrendFollowingAgent(BaseAgent):
     def __init__(self):
         super().__init__("TrendFollowingAgent")
 
-    async def analyze(self, symbol: str, data: pd.DataFrame) -> Signal:
+    async def analyze(self, symbol: str, data: pd.DataFrame) -> CompactSignal:
         """
         Analyze trend using ADX and EMA.
         """
         if data.empty or len(data) < 30:
-            return Signal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
+            return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
 
         high = data['high'].values
         low = data['low'].values
@@ -36,7 +36,7 @@ class TrendFollowingAgent(BaseAgent):
                 action = "SELL"
                 confidence = 0.6 + (min(adx, 50) / 100)
         
-        return Signal(
+        return CompactSignal(
             agent_name=self.name,
             symbol=symbol,
             action=action,
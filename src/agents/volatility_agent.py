@@ -1,13 +1,15 @@
-from src.agents.base_agent import BaseAgent, Signal
+from src.agents.base_agent import BaseAgent, CompactSignal
 import pandas as pd
 import numpy as np
+from typing import List, Sequence
+from src.data.panel import MarketPanel, trailing_mean
 
 class VolatilityAgent(BaseAgent):
     def __init__(self):
         super().__init__("VolatilityAgent")
 
-    async def analyze(self, symbol: str, data: pd.DataFrame) -> Signal:
-        if data is None or data.empty: return Signal(self.name, symbol, "NEUTRAL", 0.0)
+    async def analyze(self, symbol: str, data: pd.DataFrame) -> CompactSignal:
+        if data is None or data.empty: return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
         
         # ATR Calculation
         high_low = data['high'] - data['low']
@@ -21,8 +23,37 @@ class VolatilityAgent(BaseAgent):
         
         # Logic: High Volatility = High Risk but High Reward potential
         if current_vol > 2 * atr:
-            return Signal(self.name, symbol, "NEUTRAL", 0.9, {"status": "High Volatility", "atr": float(atr)})
+            return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.9, metadata={"status": "High Volatility", "atr": float(atr)})
         elif current_vol < 0.5 * atr:
-            return Signal(self.name, symbol, "ANALYSIS", 0.8, {"status": "Squeeze (Breakout Soon)", "atr": float(atr)})
+            return CompactSignal(agent_name=self.name, symbol=symbol, action="ANALYSIS", confidence=0.8, metadata={"status": "Squeeze (Breakout Soon)", "atr": float(atr)})
             
-        return Signal(self.name, symbol, "NEUTRAL", 0.5, {"atr": float(atr)})
+        return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.5, metadata={"atr": float(atr)})
+
+    async def analyze_batch(self, symbols: Sequence[str], panel: MarketPanel) -> List[CompactSignal]:
+        """Vectorized ATR / true-range check across every symbol of the panel."""
+        if panel.width == 0:
+            return await super().analyze_batch(symbols, panel)
+
+        # True Range (fmax skips the missing previous close, like pandas' max)
+        prev_close = np.empty_like(panel.close)
+        prev_close[:, 0] = np.nan
+        prev_close[:, 1:] = panel.close[:, :-1]
+        high_low = panel.high - panel.low
+        high_close = np.abs(panel.high - prev_close)
+        low_close = np.abs(panel.low - prev_close)
+        true_range = np.fmax(high_low, np.fmax(high_close, low_close))
+
+        atr = trailing_mean(true_range, 14)
+        current_vol = true_range[:, -1]
+
+        signals = []
+        for i, symbol in enumerate(symbols):
+            if panel.lengths[i] == 0:
+                signals.append(CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0))
+            elif current_vol[i] > 2 * atr[i]:
+                signals.append(CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.9, metadata={"status": "High Volatility", "atr": float(atr[i])}))
+            elif current_vol[i] < 0.5 * atr[i]:
+                signals.append(CompactSignal(agent_name=self.name, symbol=symbol, action="ANALYSIS", confidence=0.8, metadata={"status": "Squeeze (Breakout Soon)", "atr": float(atr[i])}))
+            else:
+                signals.append(CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.5, metadata={"atr": float(atr[i])}))
+        return signals
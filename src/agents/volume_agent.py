@@ -1,18 +1,20 @@
 import talib
 import pandas as pd
 import numpy as np
-from src.agents.base_agent import BaseAgent, Signal
+from typing import List, Sequence
+from src.agents.base_agent import BaseAgent, CompactSignal
+from src.data.panel import MarketPanel, trailing_mean
 
 class VolumeAnalysisAgent(BaseAgent):
     def __init__(self):
         super().__init__("VolumeAnalysisAgent")
 
-    async def analyze(self, symbol: str, data: pd.DataFrame) -> Signal:
+    async def analyze(self, symbol: str, data: pd.DataFrame) -> CompactSignal:
         """
         Analyze volume patterns.
         """
         if data.empty or len(data) < 30:
-            return Signal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
+            return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
 
         close = data['close'].values
         volume = data['volume'].values.astype(float)
@@ -37,10 +39,53 @@ class VolumeAnalysisAgent(BaseAgent):
                 action = "SELL" # High volume down-move
                 confidence = 0.8
         
-        return Signal(
+        return CompactSignal(
             agent_name=self.name,
             symbol=symbol,
             action=action,
             confidence=confidence,
             metadata={"obv": float(obv), "vol_ratio": float(current_vol / vol_sma if vol_sma else 0)}
         )
+
+    async def analyze_batch(self, symbols: Sequence[str], panel: MarketPanel) -> List[CompactSignal]:
+        """
+        Vectorized volume analysis across every symbol of the panel.
+        OBV is rebuilt from the close-to-close direction (same rule as talib.OBV).
+        """
+        if panel.width < 2:
+            return await super().analyze_batch(symbols, panel)
+
+        close = panel.close
+        volume = panel.volume
+        rows = np.arange(len(symbols))
+
+        # OBV: first real volume, then +/- volume on up/down closes
+        first_volume = volume[rows, np.clip(panel.width - panel.lengths, 0, panel.width - 1)]
+        direction = np.sign(np.diff(close, axis=1))
+        obv = first_volume + np.nansum(direction * volume[:, 1:], axis=1)
+
+        vol_sma = trailing_mean(volume, 20)
+        current_vol = volume[:, -1]
+        spike = current_vol > 2 * vol_sma
+        up_move = close[:, -1] > close[:, -2]
+
+        signals = []
+        for i, symbol in enumerate(symbols):
+            if panel.lengths[i] < 30:
+                signals.append(CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0))
+                continue
+
+            action = "NEUTRAL"
+            confidence = 0.5
+            if spike[i]:
+                action = "BUY" if up_move[i] else "SELL"
+                confidence = 0.8
+
+            signals.append(CompactSignal(
+                agent_name=self.name,
+                symbol=symbol,
+                action=action,
+                confidence=confidence,
+                metadata={"obv": float(obv[i]), "vol_ratio": float(current_vol[i] / vol_sma[i] if vol_sma[i] else 0)}
+            ))
+        return signals
@@ -1,12 +1,14 @@
-from src.agents.base_agent import BaseAgent, Signal
+from typing import List, Sequence
+from src.agents.base_agent import BaseAgent, CompactSignal
+from src.data.panel import MarketPanel, trailing_mean
 
 class WhaleMovementAgent(BaseAgent):
     def __init__(self):
         super().__init__("WhaleMovementAgent")
 
-    async def analyze(self, symbol: str, data: object = None) -> Signal:
+    async def analyze(self, symbol: str, data: object = None) -> CompactSignal:
         # Detect Volume Anomalies (Whales)
-        if data is None or data.empty: return Signal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
+        if data is None or data.empty: return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0)
         
         # Calculate Volume Moving Average
         vol_sma = data['volume'].rolling(20).mean().iloc[-1]
@@ -16,6 +18,27 @@ class WhaleMovementAgent(BaseAgent):
         if curr_vol > 3.0 * vol_sma:
             price_change = data['close'].iloc[-1] - data['open'].iloc[-1]
             action = "BUY" if price_change > 0 else "SELL"
-            return Signal(agent_name=self.name, symbol=symbol, action=action, confidence=0.95, metadata={"reason": "Whale Volume Spike"})
+            return CompactSignal(agent_name=self.name, symbol=symbol, action=action, confidence=0.95, metadata={"reason": "Whale Volume Spike"})
             
-        return Signal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.1, metadata={"reason": "Normal Volume"})
+        return CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.1, metadata={"reason": "Normal Volume"})
+
+    async def analyze_batch(self, symbols: Sequence[str], panel: MarketPanel) -> List[CompactSignal]:
+        """Vectorized whale detection across every symbol of the panel."""
+        if panel.width == 0:
+            return await super().analyze_batch(symbols, panel)
+
+        vol_sma = trailing_mean(panel.volume, 20)
+        curr_vol = panel.volume[:, -1]
+        spike = curr_vol > 3.0 * vol_sma
+        up_move = (panel.close[:, -1] - panel.open[:, -1]) > 0
+
+        signals = []
+        for i, symbol in enumerate(symbols):
+            if panel.lengths[i] == 0:
+                signals.append(CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.0))
+            elif spike[i]:
+                action = "BUY" if up_move[i] else "SELL"
+                signals.append(CompactSignal(agent_name=self.name, symbol=symbol, action=action, confidence=0.95, metadata={"reason": "Whale Volume Spike"}))
+            else:
+                signals.append(CompactSignal(agent_name=self.name, symbol=symbol, action="NEUTRAL", confidence=0.1, metadata={"reason": "Normal Volume"}))
+        return signals
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from types import MappingProxyType
+from typing import Any, Callable, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()  # The default snapshot falls back to the TRADING_MODE env var
+
+logger = logging.getLogger(__name__)
+
+def _float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+class ConfigSnapshot:
+    """
+    One immutable view of the runtime config. Readers hold a reference to a
+    snapshot; a change produces a new one, it never mutates this.
+    """
+    __slots__ = ("trading_mode", "risk_per_trade", "max_daily_loss", "max_leverage", "values", "version", "loaded_at")
+
+    def __init__(self, values: dict, version: int = 0):
+        env_mode = os.getenv("TRADING_MODE", "PAPER").upper()
+        set_ = lambda k, v: object.__setattr__(self, k, v)
+        set_("values", MappingProxyType(dict(values)))
+        set_("trading_mode", str(values.get("TRADING_MODE") or env_mode).upper())
+        # Optional risk overrides; None = keep the RiskManager's own default
+        set_("risk_per_trade", _float(values.get("RISK_PER_TRADE")))
+        set_("max_daily_loss", _float(values.get("MAX_DAILY_LOSS")))
+        set_("max_leverage", _float(values.get("MAX_LEVERAGE")))
+        set_("version", version)
+        set_("loaded_at", time.time())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.values.get(key, default)
+
+class RuntimeConfig:
+    """
+    Loads `data/config.json` once and re-reads it only when its mtime/size
+    changes (polled from a background task). Each change swaps
+    `self.snapshot` in a single assignment and calls the subscribers with
+    (new, old), so hot paths just read `runtime_config.snapshot.trading_mode`.
+    A file that fails to parse is ignored and the last good snapshot stays.
+    """
+    def __init__(self, path: str = "data/config.json", poll_interval: float = 2.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._stamp = None
+        self._subscribers: List[Callable[[ConfigSnapshot, Optional[ConfigSnapshot]], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self.snapshot = ConfigSnapshot({})
+        self.reload()
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def reload(self) -> bool:
+        """Re-read the file if it changed. Returns True when a new snapshot was published."""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return False
+
+        values = {}
+        if stamp is not None:
+            try:
+                with open(self.path, "r") as f:
+                    values = json.load(f)
+                if not isinstance(values, dict):
+                    raise ValueError("top level must be an object")
+            except (OSError, ValueError) as e:
+                # Half-written file or a typo: keep the last good snapshot, retry on the next change
+                logger.error(f"Ignoring invalid runtime config {self.path}: {e}")
+                self._stamp = stamp
+                return False
+
+        self._stamp = stamp
+        old = self.snapshot
+        self.snapshot = ConfigSnapshot(values, version=old.version + 1)
+        if self.snapshot.trading_mode != old.trading_mode:
+            logger.warning(f"🔁 Trading mode changed: {old.trading_mode} -> {self.snapshot.trading_mode}")
+        self._notify(self.snapshot, old)
+        return True
+
+    def subscribe(self, callback: Callable[[ConfigSnapshot, Optional[ConfigSnapshot]], None], replay: bool = True):
+        """Register `callback(new, old)`. With replay, it is called once right away with (current, None)."""
+        self._subscribers.append(callback)
+        if replay:
+            callback(self.snapshot, None)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _notify(self, new: ConfigSnapshot, old: ConfigSnapshot):
+        for callback in list(self._subscribers):
+            try:
+                callback(new, old)
+            except Exception as e:
+                logger.error(f"Config subscriber {getattr(callback, '__qualname__', callback)} failed: {e}")
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            self.reload()
+
+runtime_config = RuntimeConfig()
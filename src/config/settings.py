@@ -1,5 +1,7 @@
 import os
+import re
 from dotenv import load_dotenv
+from src.config.runtime import runtime_config
 
 load_dotenv()
 
@@ -7,19 +9,36 @@ class Settings:
     DELTA_API_KEY = os.getenv("DELTA_API_KEY")
     DELTA_API_SECRET = os.getenv("DELTA_API_SECRET")
     DATABASE_URL = os.getenv("DATABASE_URL")
-    GROQ_API_KEYS = [os.getenv(f"GROQ_API_KEY_{i}") for i in range(1, 10) if os.getenv(f"GROQ_API_KEY_{i}")]
+    # Exchange endpoints (point both at `python -m benchmarks.mock_exchange` for load tests)
+    DELTA_BASE_URL = os.getenv("DELTA_BASE_URL", "https://api.india.delta.exchange").rstrip("/")
+    DELTA_WS_URL = os.getenv("DELTA_WS_URL", "wss://socket.india.delta.exchange")
+    # Every GROQ_API_KEY_<n> in the environment, in numeric order (no upper bound)
+    GROQ_API_KEYS = [
+        v for _, v in sorted(
+            (int(k.rsplit("_", 1)[1]), v) for k, v in os.environ.items()
+            if re.fullmatch(r"GROQ_API_KEY_\d+", k) and v
+        )
+    ]
+    # Hedged LLM requests: duplicate a slow request on a second key (off by default)
+    GROQ_HEDGE = os.getenv("GROQ_HEDGE", "false").lower() in ("1", "true", "yes")
+    GROQ_HEDGE_PERCENTILE = float(os.getenv("GROQ_HEDGE_PERCENTILE", "95"))
+    # News ingestion: 'google', 'file:<path.jsonl>' or 'static' (offline, no news)
+    NEWS_SOURCE = os.getenv("NEWS_SOURCE", "google")
+    NEWS_REFRESH_SECONDS = float(os.getenv("NEWS_REFRESH_SECONDS", "900"))
+    NEWS_TTL_SECONDS = float(os.getenv("NEWS_TTL_SECONDS", "3600"))
+    # Live engine state for the dashboard (HTTP /state and SSE /events); port 0 turns it off
+    STATE_STREAM_HOST = os.getenv("STATE_STREAM_HOST", "127.0.0.1")
+    STATE_STREAM_PORT = int(os.getenv("STATE_STREAM_PORT", "8765"))
+    # In-process metrics (Prometheus text at /metrics on the state stream) and their periodic log summary
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    METRICS_LOG_SECONDS = float(os.getenv("METRICS_LOG_SECONDS", "300"))
+    # Agent registry overrides (comma-separated agent names), e.g. AGENTS_ENABLE=MeanReversionAgent
+    AGENTS_ENABLE = [n.strip() for n in os.getenv("AGENTS_ENABLE", "").split(",") if n.strip()]
+    AGENTS_DISABLE = [n.strip() for n in os.getenv("AGENTS_DISABLE", "").split(",") if n.strip()]
     
     @property
     def TRADING_MODE(self):
-        """Dynamic property to allow runtime switching."""
-        import json
-        try:
-            if os.path.exists("data/config.json"):
-                with open("data/config.json", "r") as f:
-                    config = json.load(f)
-                    return config.get("TRADING_MODE", os.getenv("TRADING_MODE", "PAPER").upper())
-        except:
-            pass
-        return os.getenv("TRADING_MODE", "PAPER").upper()
+        """Current mode from the runtime config snapshot (data/config.json, hot-reloaded)."""
+        return runtime_config.snapshot.trading_mode
 
 settings = Settings()
@@ -1,52 +1,98 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import asyncio
-import os
-from src.data.db_manager import db_manager
+from src.dashboard.data import DashboardData, LiveStateClient
 
 st.set_page_config(page_title="Jarvis God Mode", layout="wide")
 
+@st.cache_resource
+def get_data() -> DashboardData:
+    """One pooled, cached data layer per server process, shared by every session."""
+    return DashboardData()
+
+data = get_data()
+
 # Sidebar
 st.sidebar.title("🎮 Control Center")
 selected_mode = st.sidebar.radio("View Data For:", ["BACKTEST", "PAPER", "LIVE"])
 
 st.title(f"🚀 Jarvis Operations: {selected_mode}")
 
-# 1. Fetch Data from DB for Selected Mode
-# (Note: In production, use a synchronous wrapper or run async in loop)
-# For this UI snippet, we assume a helper function gets the data
-conn_str = os.getenv("DATABASE_URL", "postgresql://mitulpatel@localhost/jarvis_crypto")
+# 1. Fetch Data for Selected Mode (served from memory unless new trades landed)
 try:
-    import psycopg2
-    conn = psycopg2.connect(conn_str)
-    query = f"SELECT * FROM trades WHERE mode = '{selected_mode}' ORDER BY entry_time DESC LIMIT 50"
-    trades_df = pd.read_sql(query, conn)
-    conn.close()
+    trades_df = data.trades(selected_mode)
+    daily_df = data.daily(selected_mode)
+    stats = data.stats(selected_mode)
+    db_status = "🟢 Online"
 except Exception as e:
     st.error(f"DB Error: {e}")
-    trades_df = pd.DataFrame()
+    trades_df = daily_df = pd.DataFrame()
+    stats = {"total_trades": 0, "win_rate": 0.0, "total_pnl": 0.0, "max_drawdown_pct": 0.0}
+    db_status = "🔴 Offline"
 
-# 2. Metrics
-total_trades = len(trades_df)
-win_rate = "0%"
-if total_trades > 0:
-    wins = len(trades_df[trades_df['profit_loss'] > 0])
-    win_rate = f"{(wins/total_trades)*100:.1f}%"
+# 2. Metrics (full history, from the daily summary table)
+c1, c2, c3, c4, c5 = st.columns(5)
+c1.metric("Total Trades", stats["total_trades"])
+c2.metric("Win Rate", f"{stats['win_rate']*100:.1f}%")
+c3.metric("Total PnL", f"{stats['total_pnl']:+.2f}")
+c4.metric("Max Drawdown", f"{stats['max_drawdown_pct']*100:.1f}%")
+c5.metric("Database Status", db_status)
 
-c1, c2, c3 = st.columns(3)
-c1.metric("Total Trades", total_trades)
-c2.metric("Win Rate", win_rate)
-c3.metric("Database Status", "🟢 Online")
+# Equity curve and drawdown, one point per day
+if not daily_df.empty:
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=daily_df["day"], y=daily_df["equity"], name="Equity"))
+    fig.add_trace(go.Scatter(x=daily_df["day"], y=daily_df["drawdown"], name="Drawdown", fill="tozeroy", yaxis="y2"))
+    fig.update_layout(height=350, margin=dict(t=20, b=20),
+                      yaxis2=dict(overlaying="y", side="right", showgrid=False))
+    st.plotly_chart(fig, use_container_width=True)
 
-# 3. Trade History Table
+# 3. Trade History Table (newest first)
 st.subheader("📜 Trade Log")
-st.dataframe(trades_df, use_container_width=True)
-
-# 4. Agent Health
-st.subheader("🧠 Neural Network Status")
-st.write("Checking active agents in `src/agents/`...")
-# (You can list active files here)
-agent_files = [f for f in os.listdir("src/agents") if f.endswith("_agent.py")]
-st.write(f"Active Agents: {len(agent_files)}")
-st.json(agent_files)
+st.dataframe(trades_df.iloc[::-1], use_container_width=True)
+
+# 4. Live Engine (SSE stream from the engine; nothing here touches the database)
+@st.cache_resource
+def get_live() -> LiveStateClient:
+    return LiveStateClient().start()
+
+live = get_live()
+
+def render_live():
+    state = live.state()
+    st.subheader("🧠 Live Engine")
+    if not live.connected and not state:
+        st.info(f"Engine state stream not reachable at {live.url}")
+        return
+    status = state.get("status", {})
+    timings = state.get("timings", {})
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Phase", status.get("phase", "-"))
+    c2.metric("Cycle", status.get("cycle", 0))
+    c3.metric("Symbols", status.get("symbols", 0))
+    c4.metric("Cycle Time", f"{timings.get('total', 0.0):.2f}s")
+    if timings:
+        st.caption(" | ".join(f"{k}: {v:.2f}s" for k, v in timings.items() if k != "total"))
+
+    positions = state.get("positions", {})
+    st.write(f"Open Positions: {len(positions)}")
+    if positions:
+        st.dataframe(pd.DataFrame(list(positions.values())), use_container_width=True)
+
+    decisions = state.get("decisions", {})
+    if decisions:
+        st.write("Latest Decisions")
+        st.dataframe(pd.DataFrame(list(decisions.values())), use_container_width=True)
+
+    signals = state.get("signals", {})
+    if signals:
+        st.write("Agent Votes")
+        votes = pd.DataFrame({symbol: {agent: v[0] for agent, v in agents.items()} for symbol, agents in signals.items()})
+        st.dataframe(votes, use_container_width=True)
+
+# Re-render just this section every second when the Streamlit version supports fragments
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+if fragment is not None:
+    fragment(run_every=1.0)(render_live)()
+else:
+    render_live()
@@ -0,0 +1,334 @@
+import copy
+import json
+import logging
+import os
+import select
+import threading
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from src.monitoring.live_state import apply_patch
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "trades_changed"  # NOTIFY channel fed by the trigger in DatabaseManager._init_tables
+
+TRADE_COLUMNS = ["id", "symbol", "direction", "mode", "entry_price", "exit_price", "quantity",
+                 "profit_loss", "entry_time", "exit_time", "status"]
+_SELECT = f"SELECT {', '.join(TRADE_COLUMNS)} FROM trades"
+
+def merge_trades(cached: pd.DataFrame, new: pd.DataFrame, refreshed: pd.DataFrame, tail: int) -> pd.DataFrame:
+    """
+    Fold a poll into the cached tail: `refreshed` rows replace their cached
+    versions (same id), `new` rows are appended, and only the newest `tail`
+    rows (by entry_time, id) are kept.
+    """
+    frames = [f for f in (cached, refreshed, new) if not f.empty]
+    if not frames:
+        return cached
+    merged = pd.concat(frames, ignore_index=True).drop_duplicates("id", keep="last")
+    merged = merged.sort_values(["entry_time", "id"], kind="stable")
+    return merged.iloc[-tail:].reset_index(drop=True)
+
+def equity_curve(days: pd.DataFrame, starting_equity: float) -> pd.DataFrame:
+    """Add equity, running peak and drawdown (absolute and % of peak) to per-day PnL rows."""
+    days = days.copy()
+    pnl = days["pnl"].to_numpy(dtype=float)
+    equity = starting_equity + np.cumsum(pnl)
+    peak = np.maximum.accumulate(np.concatenate(([starting_equity], equity)))[1:]
+    days["equity"] = equity
+    days["peak"] = peak
+    days["drawdown"] = equity - peak
+    days["drawdown_pct"] = np.divide(equity - peak, peak, out=np.zeros_like(peak), where=peak > 0)
+    return days
+
+class _ModeCache:
+    __slots__ = ("trades", "watermark", "version", "daily", "daily_version", "open_trades", "stats")
+
+    def __init__(self):
+        self.trades = pd.DataFrame(columns=TRADE_COLUMNS)
+        self.watermark: Optional[int] = None  # Highest trade id seen
+        self.version = -1
+        self.daily: Optional[pd.DataFrame] = None
+        self.daily_version = -1
+        self.open_trades = 0
+        self.stats: Optional[Dict[str, Any]] = None  # Derived from `daily`, reset with it
+
+class DashboardData:
+    """
+    Read side of the dashboard, shared by every Streamlit session of a server
+    process (create it once with st.cache_resource).
+
+    - Connections come from a small psycopg2 pool instead of one per rerun;
+      every query is parameterized.
+    - A dedicated connection LISTENs on `trades_changed` (a trigger NOTIFYs
+      the trade's mode on insert/update). Each notification bumps that mode's
+      version; a rerun with an unchanged version is served from memory without
+      touching the database.
+    - A changed version fetches only rows inserted after the cached watermark,
+      plus the cached OPEN rows (the only ones that can still change), and keeps
+      the newest `tail` rows by entry_time. The watermark is the trade id, not
+      entry_time: backtests insert trades with historical entry times. A burst
+      of more than `tail` new rows just reloads the tail. Aggregates are single
+      SQL queries, so nothing scales with the table in Python.
+    - Metrics and the equity curve come from trade_daily_summary (maintained by
+      DatabaseManager.close_trades), so they cover the full history in O(days).
+    If LISTEN is unavailable, every call polls incrementally instead.
+    """
+    def __init__(self, dsn: Optional[str] = None, pool=None, min_connections: int = 1,
+                 max_connections: int = 4, tail: int = 5000, starting_equity: float = 10000.0):
+        self.dsn = dsn or os.getenv("DATABASE_URL", "postgresql://mitulpatel@localhost/jarvis_crypto")
+        self.tail = tail
+        self.starting_equity = starting_equity
+        self._pool = pool
+        self._pool_size = (min_connections, max_connections)
+        self._listener = None
+        self._listen_failed = False
+        self._versions: Dict[str, int] = {}
+        self._caches: Dict[str, _ModeCache] = {}
+        self._lock = threading.Lock()
+        self.queries = 0
+
+    # --- Connections ---
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            from psycopg2.pool import ThreadedConnectionPool
+            self._pool = ThreadedConnectionPool(*self._pool_size, self.dsn)
+        return self._pool
+
+    def _query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        conn = self.pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                columns = [c[0] for c in cur.description]
+                rows = cur.fetchall()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn)
+        self.queries += 1
+        return pd.DataFrame(rows, columns=columns)
+
+    def _listen(self) -> bool:
+        """Open the LISTEN connection once. False when notifications are unavailable."""
+        if self._listener is not None:
+            return True
+        if self._listen_failed:
+            return False
+        try:
+            import psycopg2
+            conn = psycopg2.connect(self.dsn)
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+            self._listener = conn
+            return True
+        except Exception as e:
+            logger.warning(f"LISTEN {CHANNEL} unavailable, polling instead: {e}")
+            self._listen_failed = True
+            return False
+
+    def poll(self, timeout: float = 0.0) -> Dict[str, int]:
+        """Drain pending notifications (waiting up to `timeout`). Returns the per-mode versions."""
+        if not self._listen():
+            return self._versions
+        conn = self._listener
+        try:
+            if timeout and not conn.notifies:
+                select.select([conn], [], [], timeout)
+            conn.poll()
+        except Exception as e:
+            logger.warning(f"Lost the LISTEN connection, reconnecting on next poll: {e}")
+            self._listener = None
+            self._bump_all()
+            return self._versions
+        while conn.notifies:
+            mode = conn.notifies.pop(0).payload or ""
+            self._versions[mode] = self._versions.get(mode, 0) + 1
+        return self._versions
+
+    def _bump_all(self):
+        for mode in list(self._versions) + list(self._caches):
+            self._versions[mode] = self._versions.get(mode, 0) + 1
+
+    def _fresh(self, mode: str, seen: int) -> Tuple[bool, int]:
+        """(cache still valid, current version)."""
+        versions = self.poll()
+        if self._listener is None:
+            return False, seen + 1  # No notifications: always check
+        version = versions.get(mode, 0)
+        return version == seen, version
+
+    # --- Reads ---
+
+    def _cache(self, mode: str) -> _ModeCache:
+        cache = self._caches.get(mode)
+        if cache is None:
+            cache = self._caches[mode] = _ModeCache()
+        return cache
+
+    def trades(self, mode: str) -> pd.DataFrame:
+        """The newest `tail` trades of `mode`, oldest first."""
+        with self._lock:
+            cache = self._cache(mode)
+            fresh, version = self._fresh(mode, cache.version)
+            if fresh:
+                return cache.trades
+
+            new = None
+            if cache.watermark is not None:
+                new = self._query(f"{_SELECT} WHERE mode = %s AND id > %s ORDER BY id LIMIT %s",
+                                  (mode, cache.watermark, self.tail))
+                if len(new) >= self.tail:
+                    cache.trades, new = cache.trades.iloc[0:0], None  # Too far behind: reload the tail
+            if new is None:
+                cache.watermark = int(self._query("SELECT COALESCE(MAX(id), 0) AS id FROM trades WHERE mode = %s",
+                                                  (mode,)).iloc[0]["id"])
+                new = self._query(f"{_SELECT} WHERE mode = %s AND id <= %s ORDER BY entry_time DESC, id DESC LIMIT %s",
+                                  (mode, cache.watermark, self.tail))
+                refreshed = new.iloc[0:0]
+            else:
+                open_ids = cache.trades.loc[cache.trades["status"] == "OPEN", "id"].tolist()
+                refreshed = self._query(f"{_SELECT} WHERE id = ANY(%s)", (open_ids,)) if open_ids else new.iloc[0:0]
+                if not new.empty:
+                    cache.watermark = int(new["id"].max())
+
+            cache.trades = merge_trades(cache.trades, new, refreshed, self.tail)
+            cache.version = version
+            return cache.trades
+
+    def daily(self, mode: str) -> pd.DataFrame:
+        """
+        Per-day closed-trade totals with the equity curve and drawdown, read from
+        trade_daily_summary: O(days) rows however many trades the mode has.
+        """
+        with self._lock:
+            cache = self._cache(mode)
+            fresh, version = self._fresh(mode, cache.daily_version)
+            if fresh and cache.daily is not None:
+                return cache.daily
+            days = self._query("""
+                SELECT day, SUM(trades) AS trades, SUM(wins) AS wins, SUM(pnl) AS pnl,
+                       SUM(gross_profit) AS gross_profit, SUM(gross_loss) AS gross_loss
+                FROM trade_daily_summary WHERE mode = %s
+                GROUP BY day ORDER BY day
+            """, (mode,))
+            open_trades = int(self._query("SELECT COUNT(*) AS n FROM trades WHERE mode = %s AND status = 'OPEN'",
+                                          (mode,)).iloc[0]["n"])
+            cache.daily = equity_curve(days, self.starting_equity)
+            cache.open_trades = open_trades
+            cache.stats = None
+            cache.daily_version = version
+            return cache.daily
+
+    def stats(self, mode: str) -> Dict[str, Any]:
+        """Full-history counters for `mode`, derived from the daily summary."""
+        daily = self.daily(mode)
+        with self._lock:
+            cache = self._cache(mode)
+            if cache.stats is None:
+                closed = int(daily["trades"].sum()) if not daily.empty else 0
+                wins = int(daily["wins"].sum()) if not daily.empty else 0
+                gross_loss = float(daily["gross_loss"].sum()) if not daily.empty else 0.0
+                cache.stats = {
+                    "total_trades": closed + cache.open_trades,
+                    "closed_trades": closed,
+                    "open_trades": cache.open_trades,
+                    "win_rate": wins / closed if closed else 0.0,
+                    "total_pnl": float(daily["pnl"].sum()) if not daily.empty else 0.0,
+                    "profit_factor": float(daily["gross_profit"].sum() / -gross_loss) if gross_loss else None,
+                    "max_drawdown": float(daily["drawdown"].min()) if not daily.empty else 0.0,
+                    "max_drawdown_pct": float(daily["drawdown_pct"].min()) if not daily.empty else 0.0,
+                }
+            return cache.stats
+
+    def invalidate(self, mode: Optional[str] = None):
+        """Drop cached rows (all modes by default); the next read reloads the tail."""
+        with self._lock:
+            for m in ([mode] if mode else list(self._caches)):
+                self._caches.pop(m, None)
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
+
+class LiveStateClient:
+    """
+    Mirror of the engine's live state (src.monitoring.live_state), fed by its
+    SSE stream from a background thread. Reruns read `state()` from memory, so
+    sub-second refreshes cost nothing on either the engine or the database.
+    Reconnects with backoff when the engine is down.
+    """
+    def __init__(self, url: Optional[str] = None, timeout: float = 30.0, max_backoff: float = 10.0):
+        host = os.getenv("STATE_STREAM_HOST", "127.0.0.1")
+        port = os.getenv("STATE_STREAM_PORT", "8765")
+        self.url = (url or f"http://{host}:{port}").rstrip("/")
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        self.connected = False
+        self.events = 0
+        self._state: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="live-state", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def state(self) -> Dict[str, Any]:
+        with self._lock:
+            return copy.deepcopy(self._state)
+
+    def handle(self, event: str, data: str):
+        """Apply one SSE event (`state` = full snapshot, `patch` = one change)."""
+        payload = json.loads(data)
+        with self._lock:
+            if event == "state":
+                self._state = payload
+            elif event == "patch":
+                apply_patch(self._state, payload)
+            self.events += 1
+
+    def _run(self):
+        import requests
+        backoff = 0.5
+        while not self._stop.is_set():
+            try:
+                with requests.get(f"{self.url}/events", stream=True, timeout=self.timeout) as response:
+                    response.raise_for_status()
+                    self.connected = True
+                    backoff = 0.5
+                    event, data = "message", []
+                    for line in response.iter_lines(decode_unicode=True):
+                        if self._stop.is_set():
+                            return
+                        if line:
+                            if line.startswith("event:"):
+                                event = line[6:].strip()
+                            elif line.startswith("data:"):
+                                data.append(line[5:].lstrip())
+                            continue
+                        if data:
+                            self.handle(event, "\n".join(data))
+                        event, data = "message", []
+            except Exception as e:
+                logger.debug(f"Live state stream unavailable: {e}")
+            self.connected = False
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
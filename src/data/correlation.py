@@ -0,0 +1,314 @@
+import logging
+import math
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+Window = Union[int, str]
+
+def _grow_square(a: np.ndarray, capacity: int, fill: float = 0.0) -> np.ndarray:
+    new = np.full((capacity, capacity), fill)
+    n = a.shape[0]
+    new[:n, :n] = a
+    return new
+
+class RollingWindow:
+    """
+    Pairwise-complete return moments over the last `size` bars.
+
+    Each bar adds its outer products to running N x N sums and subtracts the
+    ones of the bar leaving the window, so an update is O(N^2) however long
+    the window. Pairs only count bars where both symbols had a return. Sums
+    are rebuilt from the ring buffer once per `size` bars to stop float drift.
+    """
+    def __init__(self, size: int, capacity: int):
+        self.size = size
+        self.returns = np.full((size, capacity), np.nan)
+        self.pos = 0
+        self.filled = 0
+        self._since_rebuild = 0
+        n = capacity
+        self.count = np.zeros((n, n))   # bars where both i and j have a return
+        self.sx = np.zeros((n, n))      # sum x_i over those bars
+        self.sxx = np.zeros((n, n))     # sum x_i^2 over those bars
+        self.sxy = np.zeros((n, n))     # sum x_i x_j
+
+    def grow(self, capacity: int):
+        returns = np.full((self.size, capacity), np.nan)
+        returns[:, :self.returns.shape[1]] = self.returns
+        self.returns = returns
+        for name in ("count", "sx", "sxx", "sxy"):
+            setattr(self, name, _grow_square(getattr(self, name), capacity))
+
+    @staticmethod
+    def _moments(x: np.ndarray):
+        m = np.isfinite(x).astype(float)
+        x0 = np.where(m > 0, x, 0.0)
+        return np.outer(m, m), np.outer(x0, m), np.outer(x0 * x0, m), np.outer(x0, x0)
+
+    def push(self, x: np.ndarray):
+        if self.filled == self.size:
+            old = self.returns[self.pos]
+            for name, moment in zip(("count", "sx", "sxx", "sxy"), self._moments(old)):
+                getattr(self, name).__isub__(moment)
+        else:
+            self.filled += 1
+        self.returns[self.pos] = x
+        for name, moment in zip(("count", "sx", "sxx", "sxy"), self._moments(x)):
+            getattr(self, name).__iadd__(moment)
+        self.pos = (self.pos + 1) % self.size
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.size:
+            self._rebuild()
+
+    def _rebuild(self):
+        r = self.returns
+        m = np.isfinite(r).astype(float)
+        x0 = np.where(m > 0, r, 0.0)
+        self.count = m.T @ m
+        self.sx = x0.T @ m
+        self.sxx = (x0 * x0).T @ m
+        self.sxy = x0.T @ x0
+        self._since_rebuild = 0
+
+    def cov(self, min_periods: int) -> np.ndarray:
+        c = self.count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = (self.sxy - self.sx * self.sx.T / c) / (c - 1)
+        return np.where(c >= max(min_periods, 2), cov, np.nan)
+
+    def corr(self, min_periods: int) -> np.ndarray:
+        c = self.count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = c * self.sxy - self.sx * self.sx.T
+            var_i = c * self.sxx - self.sx ** 2        # variance of i over the pair's bars
+            corr = cov / np.sqrt(var_i * var_i.T)
+        return np.where(c >= max(min_periods, 2), np.clip(corr, -1.0, 1.0), np.nan)
+
+class EwmaWindow:
+    """Exponentially weighted return covariance (RiskMetrics style), O(N^2) per bar."""
+    def __init__(self, halflife: float, capacity: int):
+        self.halflife = halflife
+        self.decay = 0.5 ** (1.0 / halflife)
+        self.mean = np.zeros(capacity)
+        self.mean_weight = np.zeros(capacity)
+        self.weighted = np.zeros((capacity, capacity))
+        self.weight = np.zeros((capacity, capacity))  # Sum of weights, for bias correction
+        self.count = np.zeros((capacity, capacity))
+
+    def grow(self, capacity: int):
+        for name in ("mean", "mean_weight"):
+            old = getattr(self, name)
+            new = np.zeros(capacity)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        for name in ("weighted", "weight", "count"):
+            setattr(self, name, _grow_square(getattr(self, name), capacity))
+
+    def push(self, x: np.ndarray):
+        m = np.isfinite(x)
+        lam = self.decay
+        x0 = np.where(m, x, 0.0)
+        self.mean_weight[m] = lam * self.mean_weight[m] + (1 - lam)
+        self.mean[m] += (1 - lam) * (x0[m] - self.mean[m]) / self.mean_weight[m]
+        d = np.where(m, x0 - self.mean, 0.0)
+        pair = np.outer(m, m)
+        self.weighted = np.where(pair, lam * self.weighted + (1 - lam) * np.outer(d, d), self.weighted)
+        self.weight = np.where(pair, lam * self.weight + (1 - lam), self.weight)
+        self.count += pair
+
+    def cov(self, min_periods: int) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = self.weighted / self.weight
+        return np.where(self.count >= max(min_periods, 2), cov, np.nan)
+
+    def corr(self, min_periods: int) -> np.ndarray:
+        cov = self.cov(min_periods)
+        sd = np.sqrt(np.maximum(np.diag(cov), 0.0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.clip(cov / np.outer(sd, sd), -1.0, 1.0)
+
+class CorrelationService:
+    """
+    Cross-asset return correlation for the whole scanned universe.
+
+    Every closed bar is pushed once (`update_panel` skips bars it has already
+    seen and the still-forming last candle) into one rolling window per
+    lookback in `windows`, plus an EWMA estimator when `halflife` is set
+    (window name "ewma"). Queries are array lookups on the current moments:
+    correlation / covariance blocks, per-bar volatility, beta to `benchmark`
+    and correlation clusters (connected components above `cluster_threshold`).
+    Derived arrays are cached until the next bar.
+    """
+    def __init__(self,
+                 windows: Sequence[int] = (24, 168),
+                 halflife: Optional[float] = None,
+                 benchmark: str = "BTCUSD",
+                 min_periods: int = 12,
+                 cluster_threshold: float = 0.7,
+                 capacity: int = 16):
+        self.benchmark = benchmark
+        self.min_periods = min_periods
+        self.cluster_threshold = cluster_threshold
+        self.windows: Dict[Window, Union[RollingWindow, EwmaWindow]] = {w: RollingWindow(w, capacity) for w in windows}
+        if halflife:
+            self.windows["ewma"] = EwmaWindow(halflife, capacity)
+        self.default_window: Window = windows[0] if windows else "ewma"
+        self._index: Dict[str, int] = {}
+        self.capacity = capacity
+        self.last_time = None
+        self.bars = 0
+        self._cache: Dict[tuple, np.ndarray] = {}
+
+    # --- Universe ---
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._index)
+
+    def slot(self, symbol: str) -> int:
+        i = self._index.get(symbol)
+        if i is None:
+            i = len(self._index)
+            if i >= self.capacity:
+                self.capacity *= 2
+                for window in self.windows.values():
+                    window.grow(self.capacity)
+                self._cache.clear()
+            self._index[symbol] = i
+        return i
+
+    def slots(self, symbols: Sequence[str]) -> np.ndarray:
+        return np.fromiter((self.slot(s) for s in symbols), dtype=np.int64, count=len(symbols))
+
+    # --- Updates ---
+
+    def push(self, symbols: Sequence[str], returns: np.ndarray, timestamp=None):
+        """One bar of returns for `symbols` (NaN = no return); everything else counts as missing."""
+        slots = self.slots(symbols)
+        x = np.full(self.capacity, np.nan)
+        x[slots] = returns
+        for window in self.windows.values():
+            window.push(x)
+        self.bars += 1
+        self._cache.clear()
+        if timestamp is not None:
+            self.last_time = timestamp
+
+    def update_panel(self, panel) -> int:
+        """
+        Push the panel's closed bars newer than the last one seen (log returns of
+        close). The last column is the forming candle and waits for the next call.
+        Returns the number of bars pushed.
+        """
+        if panel.time is None or panel.width < 3:
+            return 0
+        times = panel.time.max(axis=0)
+        closed = panel.width - 1
+        with np.errstate(invalid="ignore", divide="ignore"):
+            returns = np.log(panel.close[:, 1:closed] / panel.close[:, :closed - 1])
+        pushed = 0
+        for t in range(1, closed):
+            if self.last_time is not None and times[t] <= self.last_time:
+                continue
+            self.push(panel.symbols, returns[:, t - 1], int(times[t]))
+            pushed += 1
+        return pushed
+
+    # --- Lookups ---
+
+    def _cached(self, key: tuple, compute):
+        value = self._cache.get(key)
+        if value is None:
+            value = self._cache[key] = compute()
+        return value
+
+    def _window(self, window: Optional[Window]):
+        return window if window is not None else self.default_window
+
+    def corr(self, symbols: Optional[Sequence[str]] = None, window: Optional[Window] = None) -> np.ndarray:
+        w = self._window(window)
+        full = self._cached(("corr", w), lambda: self.windows[w].corr(self.min_periods))
+        return self._block(full, symbols)
+
+    def cov(self, symbols: Optional[Sequence[str]] = None, window: Optional[Window] = None) -> np.ndarray:
+        w = self._window(window)
+        full = self._cached(("cov", w), lambda: self.windows[w].cov(self.min_periods))
+        return self._block(full, symbols)
+
+    def _block(self, full: np.ndarray, symbols: Optional[Sequence[str]]) -> np.ndarray:
+        if symbols is None:
+            n = len(self._index)
+            return full[:n, :n]
+        slots = self.slots(symbols)
+        return full[np.ix_(slots, slots)]
+
+    def vol(self, symbols: Optional[Sequence[str]] = None, window: Optional[Window] = None) -> np.ndarray:
+        """Per-bar return standard deviation."""
+        return np.sqrt(np.maximum(np.diag(self.cov(symbols, window)), 0.0))
+
+    def beta(self, symbols: Optional[Sequence[str]] = None, window: Optional[Window] = None) -> np.ndarray:
+        """Beta of each symbol's returns to the benchmark's (NaN until both have history)."""
+        w = self._window(window)
+        b = self._index.get(self.benchmark)
+        n = self.capacity
+        def compute():
+            if b is None:
+                return np.full(n, np.nan)
+            cov = self.cov(None, w)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                beta = cov[:, b] / cov[b, b]
+            out = np.full(n, np.nan)
+            out[:len(beta)] = beta
+            return out
+        full = self._cached(("beta", w), compute)
+        return full[self.slots(symbols)] if symbols is not None else full[:len(self._index)]
+
+    def clusters(self, symbols: Optional[Sequence[str]] = None, window: Optional[Window] = None) -> np.ndarray:
+        """
+        Cluster label per symbol: symbols linked by correlation above the threshold
+        (directly or through a chain) share the lowest slot number among them.
+        """
+        w = self._window(window)
+        def compute():
+            corr = self.corr(None, w)
+            n = len(corr)
+            adjacent = np.nan_to_num(corr, nan=0.0) >= self.cluster_threshold
+            np.fill_diagonal(adjacent, True)
+            labels = np.arange(n)
+            while True:
+                # Every symbol takes the smallest label among its neighbours until nothing changes
+                spread = np.where(adjacent, labels[None, :], n).min(axis=1)
+                if np.array_equal(spread, labels):
+                    break
+                labels = spread
+            out = np.arange(self.capacity)
+            out[:n] = labels
+            return out
+        full = self._cached(("clusters", w), compute)
+        return full[self.slots(symbols)] if symbols is not None else full[:len(self._index)]
+
+    def lookup(self, symbol: str, window: Optional[Window] = None) -> dict:
+        """Everything known about one symbol, for agents and logs."""
+        i = self.slot(symbol)
+        b = self._index.get(self.benchmark)
+        labels = self.clusters(None, window)
+        corr_btc = self.corr(None, window)[i, b] if b is not None else np.nan
+        members = [s for s, j in self._index.items() if labels[j] == labels[i]]
+        return {
+            "beta": float(self.beta(None, window)[i]),
+            "corr_benchmark": float(corr_btc),
+            "vol": float(self.vol(None, window)[i]),
+            "cluster": int(labels[i]),
+            "cluster_members": members,
+        }
+
+    def risk_model(self, symbols: Sequence[str], bars_per_day: float = 24.0, window: Optional[Window] = None):
+        """(daily vol, correlation) for PortfolioRisk.set_risk_model."""
+        return self.vol(symbols, window) * math.sqrt(bars_per_day), self.corr(symbols, window)
+
+    def stats(self) -> Dict[str, float]:
+        return {"symbols": len(self._index), "bars": self.bars, "windows": list(self.windows)}
+
+correlation_service = CorrelationService(windows=(24, 168), halflife=48)
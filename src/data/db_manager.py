@@ -2,11 +2,29 @@ import logging
 import json
 import os
 import asyncpg
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Dict, List
 from src.config.settings import settings
+from src.monitoring.metrics import DB_ROWS, DB_WRITE_SECONDS
 
 logger = logging.getLogger(__name__)
 
+# Folds closed trades ({source}: mode, symbol, exit_time, profit_loss) into the daily summary
+TRADE_SUMMARY_UPSERT = """
+    INSERT INTO trade_daily_summary AS s (mode, symbol, day, trades, wins, pnl, gross_profit, gross_loss)
+    SELECT mode, symbol, (exit_time AT TIME ZONE 'UTC')::date,
+           COUNT(*), COUNT(*) FILTER (WHERE profit_loss > 0), COALESCE(SUM(profit_loss), 0),
+           COALESCE(SUM(GREATEST(profit_loss, 0)), 0), COALESCE(SUM(LEAST(profit_loss, 0)), 0)
+    FROM {source}
+    GROUP BY 1, 2, 3
+    ON CONFLICT (mode, day, symbol) DO UPDATE SET
+        trades = s.trades + EXCLUDED.trades,
+        wins = s.wins + EXCLUDED.wins,
+        pnl = s.pnl + EXCLUDED.pnl,
+        gross_profit = s.gross_profit + EXCLUDED.gross_profit,
+        gross_loss = s.gross_loss + EXCLUDED.gross_loss
+"""
+
 class DatabaseManager:
     def __init__(self):
         # Default to local if not set
@@ -51,6 +69,77 @@ class DatabaseManager:
                     status TEXT
                 );
             """)
+            # ATR at entry, so open positions can get their stops back after a restart
+            await conn.execute("ALTER TABLE trades ADD COLUMN IF NOT EXISTS atr DOUBLE PRECISION;")
+
+            # Close order: exit_time is historical for backtests, so the Judge's
+            # watermark follows this sequence instead (older closes are numbered once)
+            await conn.execute("CREATE SEQUENCE IF NOT EXISTS trades_closed_seq;")
+            await conn.execute("ALTER TABLE trades ADD COLUMN IF NOT EXISTS closed_seq BIGINT;")
+            await conn.execute("""
+                UPDATE trades t SET closed_seq = b.seq
+                FROM (
+                    SELECT id, nextval('trades_closed_seq') AS seq
+                    FROM (SELECT id FROM trades WHERE status = 'CLOSED' AND closed_seq IS NULL
+                          ORDER BY exit_time, id) o
+                ) b
+                WHERE t.id = b.id;
+            """)
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_trades_closed_seq
+                ON trades (closed_seq) WHERE closed_seq IS NOT NULL;
+            """)
+            
+            # The dashboard reads each mode's newest trades first
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_trades_mode_entry_time
+                ON trades (mode, entry_time DESC, id DESC);
+            """)
+            # Closed-trade aggregates per (mode, symbol, UTC day), maintained by close_trades
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS trade_daily_summary (
+                    mode TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    day DATE NOT NULL,
+                    trades INTEGER NOT NULL DEFAULT 0,
+                    wins INTEGER NOT NULL DEFAULT 0,
+                    pnl DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    gross_profit DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    gross_loss DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    PRIMARY KEY (mode, day, symbol)
+                );
+            """)
+            # Open trades are few; counting them shouldn't scan the mode's history
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_trades_open
+                ON trades (mode) WHERE status = 'OPEN';
+            """)
+            needs_backfill = await conn.fetchval("""
+                SELECT NOT EXISTS (SELECT 1 FROM trade_daily_summary)
+                   AND EXISTS (SELECT 1 FROM trades WHERE status = 'CLOSED')
+            """)
+            if needs_backfill:
+                await self._rebuild_trade_summary(conn)
+
+            # Tell dashboard listeners which mode changed (identical payloads collapse within a transaction)
+            await conn.execute("""
+                CREATE OR REPLACE FUNCTION notify_trades_changed() RETURNS trigger AS $$
+                BEGIN
+                    PERFORM pg_notify('trades_changed', NEW.mode);
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+            """)
+            await conn.execute("""
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trades_changed') THEN
+                        CREATE TRIGGER trades_changed AFTER INSERT OR UPDATE ON trades
+                        FOR EACH ROW EXECUTE PROCEDURE notify_trades_changed();
+                    END IF;
+                END;
+                $$;
+            """)
             
             # 3. Signals and OHLC (Standard)
             await conn.execute("""
@@ -64,6 +153,11 @@ class DatabaseManager:
                     PRIMARY KEY (timestamp, agent_name, symbol)
                 );
             """)
+            # Votes are looked up by (symbol, time); the PK leads with timestamp
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_agent_signals_symbol_time
+                ON agent_signals (symbol, timestamp DESC);
+            """)
             
             await conn.execute("""
                 CREATE TABLE IF NOT EXISTS ohlc_data (
@@ -102,24 +196,79 @@ class DatabaseManager:
                 """)
 
     async def store_trade(self, trade_data: dict):
+        """Insert a trade and return its id (None without a database)."""
+        if not self.pool: return None
+        query = """
+        INSERT INTO trades (symbol, direction, mode, entry_price, exit_price, quantity, profit_loss, entry_time, exit_time, status, atr)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
+        RETURNING id
+        """
+        with DB_WRITE_SECONDS.time("store_trade"):
+            async with self.pool.acquire() as conn:
+                return await conn.fetchval(query, 
+                    trade_data['symbol'], 
+                    trade_data['direction'], 
+                    trade_data.get('mode', 'PAPER'), # Default to PAPER
+                    trade_data['entry_price'],
+                    trade_data.get('exit_price'), 
+                    trade_data['quantity'], 
+                    trade_data.get('profit_loss'),
+                    trade_data['entry_time'], 
+                    trade_data.get('exit_time'), 
+                    trade_data['status'],
+                    trade_data.get('atr')
+                )
+
+    async def close_trades(self, records: List[tuple]):
+        """
+        Batch-close trades and fold them into trade_daily_summary in the same statement.
+        records: (trade_id, exit_price, exit_time, profit_loss) tuples.
+        Trades that are already CLOSED are skipped, so a retried batch can't count twice.
+        """
+        if not self.pool or not records: return
+        ids, prices, times, pnls = (list(c) for c in zip(*records))
+        query = """
+        WITH closed AS (
+            UPDATE trades t
+            SET exit_price = u.exit_price, exit_time = u.exit_time, profit_loss = u.profit_loss, status = 'CLOSED',
+                closed_seq = nextval('trades_closed_seq')
+            FROM unnest($1::int[], $2::float8[], $3::timestamptz[], $4::float8[])
+                 AS u(id, exit_price, exit_time, profit_loss)
+            WHERE t.id = u.id AND t.status IS DISTINCT FROM 'CLOSED'
+            RETURNING t.mode, t.symbol, t.exit_time, t.profit_loss
+        )
+        """ + TRADE_SUMMARY_UPSERT.format(source="closed")
+        DB_ROWS.labels("close_trades").inc(len(ids))
+        with DB_WRITE_SECONDS.time("close_trades"):
+            async with self.pool.acquire() as conn:
+                await conn.execute(query, ids, prices, times, pnls)
+
+    async def _rebuild_trade_summary(self, conn):
+        async with conn.transaction():
+            await conn.execute("LOCK TABLE trade_daily_summary IN EXCLUSIVE MODE")
+            await conn.execute("DELETE FROM trade_daily_summary")
+            await conn.execute(TRADE_SUMMARY_UPSERT.format(
+                source="(SELECT mode, symbol, exit_time, profit_loss FROM trades "
+                       "WHERE status = 'CLOSED' AND exit_time IS NOT NULL) closed"))
+        logger.info("📊 Rebuilt trade_daily_summary from the trades table.")
+
+    async def rebuild_trade_summary(self):
+        """Recompute trade_daily_summary from scratch (backfill / repair)."""
         if not self.pool: return
+        async with self.pool.acquire() as conn:
+            await self._rebuild_trade_summary(conn)
+
+    async def get_daily_summary(self, mode: str) -> List[dict]:
+        """Per-day totals for `mode` across symbols, oldest first (O(days))."""
+        if not self.pool: return []
         query = """
-        INSERT INTO trades (symbol, direction, mode, entry_price, exit_price, quantity, profit_loss, entry_time, exit_time, status)
-        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+            SELECT day, SUM(trades) AS trades, SUM(wins) AS wins, SUM(pnl) AS pnl
+            FROM trade_daily_summary WHERE mode = $1
+            GROUP BY day ORDER BY day
         """
         async with self.pool.acquire() as conn:
-            await conn.execute(query, 
-                trade_data['symbol'], 
-                trade_data['direction'], 
-                trade_data.get('mode', 'PAPER'), # Default to PAPER
-                trade_data['entry_price'],
-                trade_data.get('exit_price'), 
-                trade_data['quantity'], 
-                trade_data.get('profit_loss'),
-                trade_data['entry_time'], 
-                trade_data.get('exit_time'), 
-                trade_data['status']
-            )
+            rows = await conn.fetch(query, mode)
+            return [dict(r) for r in rows]
 
     async def get_trades_by_mode(self, mode: str, limit=50):
         if not self.pool: return []
@@ -128,6 +277,164 @@ class DatabaseManager:
             rows = await conn.fetch(query, mode, limit)
             return [dict(r) for r in rows]
 
+    async def get_open_trades(self, modes: List[str]) -> List[dict]:
+        """Trades still OPEN in the given modes, oldest first."""
+        if not self.pool: return []
+        query = """
+            SELECT id, symbol, direction, mode, entry_price, quantity, entry_time, atr
+            FROM trades WHERE status = 'OPEN' AND mode = ANY($1::text[])
+            ORDER BY entry_time, id
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, list(modes))
+            return [dict(r) for r in rows]
+
+    async def get_recent_trades(self, limit=50):
+        """Most recently closed trades (any mode)."""
+        if not self.pool: return []
+        query = "SELECT * FROM trades WHERE status = 'CLOSED' ORDER BY exit_time DESC LIMIT $1"
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, limit)
+            return [dict(r) for r in rows]
+
+    async def get_closed_trade_votes(self, after_seq: int, limit=500, tolerance=timedelta(minutes=5)) -> List[dict]:
+        """
+        Trades closed after the `closed_seq` watermark, joined in one query with
+        each agent's latest vote for that symbol at entry. One row per (trade, agent);
+        trades without recorded votes come back once with agent_name = NULL.
+        """
+        if not self.pool: return []
+        query = """
+            WITH new_trades AS (
+                SELECT id, symbol, direction, profit_loss, entry_time, exit_time, closed_seq
+                FROM trades
+                WHERE closed_seq > $1
+                ORDER BY closed_seq
+                LIMIT $2
+            )
+            SELECT t.id, t.closed_seq, t.direction, t.profit_loss, t.exit_time, v.agent_name, v.signal
+            FROM new_trades t
+            LEFT JOIN LATERAL (
+                SELECT DISTINCT ON (s.agent_name) s.agent_name, s.signal
+                FROM agent_signals s
+                WHERE s.symbol = t.symbol
+                  AND s.timestamp <= t.entry_time
+                  AND s.timestamp >= t.entry_time - $3::interval
+                ORDER BY s.agent_name, s.timestamp DESC
+            ) v ON TRUE
+            ORDER BY t.closed_seq
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, after_seq, limit, tolerance)
+            return [dict(r) for r in rows]
+
+    async def store_agent_signals(self, records: List[tuple]):
+        """
+        Bulk insert agent signals via COPY.
+        records: (timestamp, agent_name, symbol, signal, confidence, metadata_json) tuples.
+        Rows are staged in a temp table so duplicate keys are skipped instead of failing the batch.
+        """
+        if not self.pool or not records: return
+        columns = ['timestamp', 'agent_name', 'symbol', 'signal', 'confidence', 'metadata']
+        DB_ROWS.labels("store_agent_signals").inc(len(records))
+        with DB_WRITE_SECONDS.time("store_agent_signals"):
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute("""
+                        CREATE TEMP TABLE IF NOT EXISTS agent_signals_stage
+                        (LIKE agent_signals INCLUDING DEFAULTS) ON COMMIT DELETE ROWS
+                    """)
+                    await conn.copy_records_to_table('agent_signals_stage', records=records, columns=columns)
+                    await conn.execute("""
+                        INSERT INTO agent_signals SELECT * FROM agent_signals_stage
+                        ON CONFLICT DO NOTHING
+                    """)
+
+    async def get_agent_signals_at_time(self, symbol: str, timestamp: datetime, tolerance=timedelta(minutes=5)) -> Dict[str, str]:
+        """
+        Each agent's latest vote for `symbol` at or before `timestamp` (within `tolerance`).
+        Returns {agent_name: signal}.
+        """
+        if not self.pool: return {}
+        query = """
+            SELECT DISTINCT ON (agent_name) agent_name, signal
+            FROM agent_signals
+            WHERE symbol = $1 AND timestamp <= $2 AND timestamp >= $2 - $3::interval
+            ORDER BY agent_name, timestamp DESC
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, symbol, timestamp, tolerance)
+            return {r['agent_name']: r['signal'] for r in rows}
+
+    async def get_agent_signals_range(self, symbol: str, start: datetime, end: datetime) -> List[dict]:
+        """All agents' votes for `symbol` in [start, end], oldest first."""
+        if not self.pool: return []
+        query = """
+            SELECT timestamp, agent_name, symbol, signal, confidence, metadata
+            FROM agent_signals
+            WHERE symbol = $1 AND timestamp BETWEEN $2 AND $3
+            ORDER BY timestamp, agent_name
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, symbol, start, end)
+            return [dict(r) for r in rows]
+
+    async def get_entry_signals(self, symbol: str, start: datetime, end: datetime, agent_name: str = "MainBrain",
+                                min_confidence: float = 0.0) -> List[dict]:
+        """
+        The decision-maker's BUY/SELL calls for `symbol` in [start, end], oldest first.
+        min_confidence: only calls above it (the execution threshold keeps entries that were taken).
+        """
+        if not self.pool: return []
+        query = """
+            SELECT timestamp, signal, confidence
+            FROM agent_signals
+            WHERE symbol = $1 AND agent_name = $4 AND signal IN ('BUY', 'SELL')
+              AND confidence > $5
+              AND timestamp BETWEEN $2 AND $3
+            ORDER BY timestamp
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, symbol, start, end, agent_name, min_confidence)
+            return [dict(r) for r in rows]
+
+    async def store_ohlc(self, symbol: str, candles: List[dict]):
+        """
+        Bulk insert candles ({'timestamp', 'open', 'high', 'low', 'close', 'volume'}) via COPY.
+        Candles already stored are skipped, so overlapping fetches are safe.
+        """
+        if not self.pool or not candles: return
+        columns = ['symbol', 'timestamp', 'open', 'high', 'low', 'close', 'volume']
+        records = [(symbol, c['timestamp'], c['open'], c['high'], c['low'], c['close'], c['volume']) for c in candles]
+        DB_ROWS.labels("store_ohlc").inc(len(records))
+        with DB_WRITE_SECONDS.time("store_ohlc"):
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute("""
+                        CREATE TEMP TABLE IF NOT EXISTS ohlc_stage
+                        (LIKE ohlc_data INCLUDING DEFAULTS) ON COMMIT DELETE ROWS
+                    """)
+                    await conn.copy_records_to_table('ohlc_stage', records=records, columns=columns)
+                    await conn.execute("""
+                        INSERT INTO ohlc_data SELECT * FROM ohlc_stage
+                        ON CONFLICT DO NOTHING
+                    """)
+
+    async def get_ohlc(self, symbol: str, start: datetime = None, end: datetime = None) -> List[dict]:
+        """Stored candles for `symbol`, oldest first (optionally within [start, end])."""
+        if not self.pool: return []
+        query = """
+            SELECT timestamp, open, high, low, close, volume
+            FROM ohlc_data
+            WHERE symbol = $1
+              AND ($2::timestamptz IS NULL OR timestamp >= $2)
+              AND ($3::timestamptz IS NULL OR timestamp <= $3)
+            ORDER BY timestamp
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, symbol, start, end)
+            return [dict(r) for r in rows]
+
     async def store_thought(self, symbol: str, vector: list, description: str):
         if not self.pool: return
         
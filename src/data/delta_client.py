@@ -6,16 +6,19 @@ import json
 import logging
 from urllib.parse import urlencode
 from src.config.settings import settings
+from src.monitoring.metrics import HTTP_ERRORS, HTTP_SECONDS
 
 logger = logging.getLogger(__name__)
 
 class DeltaClient:
     BASE_URL = "https://api.india.delta.exchange"
 
-    def __init__(self):
+    def __init__(self, base_url: str = None):
+        self.BASE_URL = (base_url or settings.DELTA_BASE_URL).rstrip("/")
         self.api_key = settings.DELTA_API_KEY
         self.api_secret = settings.DELTA_API_SECRET
         self.session = requests.Session()
+        self._contract_values = {}  # symbol -> base units per contract
 
     def _generate_signature(self, method, path, payload):
         timestamp = str(int(time.time()))
@@ -49,10 +52,13 @@ class DeltaClient:
             })
 
         try:
-            response = self.session.request(method, url, params=params, json=data, headers=headers)
+            with HTTP_SECONDS.time(method, endpoint):
+                response = self.session.request(method, url, params=params, json=data, headers=headers)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            HTTP_ERRORS.labels(endpoint, str(status or type(e).__name__)).inc()
             logger.error(f"API Request failed: {e}")
             if 'response' in locals() and response is not None:
                 logger.error(f"Response Status: {response.status_code}")
@@ -99,6 +105,7 @@ class DeltaClient:
     def place_order(self, symbol, side, order_type, quantity, price=None, stop_price=None):
         """
         Place a new order.
+        quantity: number of contracts (see to_contracts)
         side: 'buy' or 'sell'
         order_type: 'limit', 'market', 'stop_limit', 'stop_market'
         """
@@ -115,10 +122,31 @@ class DeltaClient:
             
         return self._request('POST', '/v2/orders', data=data, auth=True)
 
+    def contract_value(self, symbol):
+        """Base units per contract for `symbol` (from the products list, fetched once)."""
+        if symbol not in self._contract_values:
+            for product in self.get_products().get('result', []):
+                try:
+                    self._contract_values[product['symbol']] = float(product['contract_value'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+        return self._contract_values[symbol]
+
+    def to_contracts(self, symbol, quantity):
+        """Whole contracts in `quantity` base units (rounded down: never more than was risked)."""
+        return int(quantity / self.contract_value(symbol) + 1e-9)
+
     def get_balances(self):
         """Get wallet balances."""
         return self._request('GET', '/v2/wallet/balances', auth=True)
 
+    def get_wallet_balance(self, asset='USD'):
+        """Balance of one settling asset (raises when the wallet doesn't hold it)."""
+        for wallet in self.get_balances().get('result', []):
+            if wallet.get('asset_symbol') == asset:
+                return float(wallet['balance'])
+        raise KeyError(f"No {asset} wallet")
+
     def get_products(self):
         """
         Fetch all available products from Delta Exchange.
@@ -1,108 +1,566 @@
-import os
+import re
 import time
+import asyncio
 import logging
-import json
-from typing import List, Dict, Any, Optional
-from groq import Groq, RateLimitError
+import itertools
+import numpy as np
+from enum import IntEnum
+from collections import deque
+from typing import List, Dict, Any, Iterable, Optional
+from groq import AsyncGroq, RateLimitError
 from src.config.settings import settings
+from src.data.model_router import ModelRouter
+from src.monitoring.metrics import LLM_ERRORS, LLM_SECONDS, LLM_TOKENS
 
 logger = logging.getLogger(__name__)
 
+class LLMPriority(IntEnum):
+    """Admission order for the key pool. Lower value = served first."""
+    LIVE_DECISION = 0
+    PAPER_DECISION = 1
+    NEWS = 2
+    BACKTEST = 3
+
+    @classmethod
+    def for_mode(cls, mode: str) -> "LLMPriority":
+        """Decision priority for a trading mode ('LIVE' / 'PAPER' / 'BACKTEST')."""
+        return {"LIVE": cls.LIVE_DECISION, "BACKTEST": cls.BACKTEST}.get(str(mode).upper(), cls.PAPER_DECISION)
+
+class LLMShedError(Exception):
+    """Low-priority request dropped because the pool is short on rate-limit headroom."""
+
+class LLMDeadlineError(Exception):
+    """Request could not be admitted to a key before its deadline."""
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+def parse_duration(value: Any) -> float:
+    """
+    Parse Groq's reset durations into seconds.
+    Examples: "2s", "7.66s", "2m59.56s", "1h2m", "250ms", "12" (plain seconds).
+    """
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(n) * scale[unit] for n, unit in _DURATION_PART.findall(value))
+
+class KeyState:
+    """Live rate-limit view of one API key, refreshed from response headers."""
+    __slots__ = ("index", "client", "limit_requests", "limit_tokens", "remaining_requests",
+                 "remaining_tokens", "reset_requests_at", "reset_tokens_at", "blocked_until", "in_flight")
+
+    def __init__(self, index: int, client: Any):
+        self.index = index
+        self.client = client
+        # None = unknown until the first response; be optimistic and let headers correct us
+        self.limit_requests = None
+        self.limit_tokens = None
+        self.remaining_requests = None
+        self.remaining_tokens = None
+        self.reset_requests_at = 0.0
+        self.reset_tokens_at = 0.0
+        self.blocked_until = 0.0
+        self.in_flight = 0
+
+    def refresh(self, now: float):
+        """Restore budgets whose reset time has passed."""
+        if self.remaining_requests is not None and self.remaining_requests <= 0 and now >= self.reset_requests_at:
+            self.remaining_requests = self.limit_requests
+        if self.remaining_tokens is not None and now >= self.reset_tokens_at:
+            self.remaining_tokens = self.limit_tokens
+
+    def can_serve(self, now: float, est_tokens: int, max_in_flight: int) -> bool:
+        if now < self.blocked_until or self.in_flight >= max_in_flight:
+            return False
+        if self.remaining_requests is not None and self.remaining_requests - self.in_flight <= 0:
+            return False
+        if self.remaining_tokens is not None and self.remaining_tokens < min(est_tokens, self.limit_tokens or est_tokens):
+            return False
+        return True
+
+    def next_reset(self, now: float) -> Optional[float]:
+        """Seconds until this key could free up by itself (None if only busy)."""
+        candidates = [t for t in (self.blocked_until, self.reset_requests_at, self.reset_tokens_at) if t > now]
+        return min(candidates) - now if candidates else None
+
+    def update_from_headers(self, headers: Any, now: float):
+        def _int(name):
+            v = headers.get(name)
+            return int(float(v)) if v is not None else None
+
+        limit_req, limit_tok = _int('x-ratelimit-limit-requests'), _int('x-ratelimit-limit-tokens')
+        rem_req, rem_tok = _int('x-ratelimit-remaining-requests'), _int('x-ratelimit-remaining-tokens')
+        if limit_req is not None: self.limit_requests = limit_req
+        if limit_tok is not None: self.limit_tokens = limit_tok
+        if rem_req is not None:
+            self.remaining_requests = rem_req
+            self.reset_requests_at = now + parse_duration(headers.get('x-ratelimit-reset-requests'))
+        if rem_tok is not None:
+            self.remaining_tokens = rem_tok
+            self.reset_tokens_at = now + parse_duration(headers.get('x-ratelimit-reset-tokens'))
+
+    def free_requests(self, max_in_flight: int) -> int:
+        """Requests this key could start right now."""
+        slots = max_in_flight - self.in_flight
+        if self.remaining_requests is not None:
+            slots = min(slots, self.remaining_requests - self.in_flight)
+        return max(0, slots)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "remaining_requests": self.remaining_requests,
+            "remaining_tokens": self.remaining_tokens,
+            "reset_requests_in": max(0.0, self.reset_requests_at - time.time()),
+            "reset_tokens_in": max(0.0, self.reset_tokens_at - time.time()),
+            "in_flight": self.in_flight,
+        }
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "deferred")
+
+    def __init__(self, priority: int, seq: int):
+        self.priority = priority
+        self.seq = seq
+        self.deferred = False
+
+    @property
+    def rank(self):
+        return (self.priority, self.seq)
+
+class KeyPool:
+    """
+    Hands out API keys to concurrent requests.
+    A key is eligible while it has request/token headroom and fewer than
+    `max_in_flight` requests running. When none is eligible, callers wait on
+    an asyncio.Condition (woken by releases, or by the earliest reset time)
+    instead of blocking the event loop.
+
+    Waiters are served strictly by (priority, arrival), so a burst of NEWS or
+    BACKTEST calls cannot starve a live decision. When the pool's request
+    headroom drops below `shed_below[p]` new work of priority p is rejected
+    (LLMShedError); below `defer_below[p]` it stays queued behind everyone else
+    until the budget recovers.
+    """
+    def __init__(self, clients: List[Any], max_in_flight: int = 4,
+                 shed_below: Optional[Dict[LLMPriority, float]] = None,
+                 defer_below: Optional[Dict[LLMPriority, float]] = None):
+        self.keys = [KeyState(i, c) for i, c in enumerate(clients)]
+        self.max_in_flight = max_in_flight
+        self.shed_below = {LLMPriority.NEWS: 0.1} if shed_below is None else shed_below
+        self.defer_below = {LLMPriority.BACKTEST: 0.25, LLMPriority.NEWS: 0.2} if defer_below is None else defer_below
+        self._cond: Optional[asyncio.Condition] = None
+        self._loop = None
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+
+        # Queue wait (enqueue -> key assigned) per priority class
+        self.queue_wait = {p: LatencyTracker() for p in LLMPriority}
+        self.shed = {p: 0 for p in LLMPriority}
+        self.expired = {p: 0 for p in LLMPriority}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._cond is None or self._loop is not loop:
+            self._cond = asyncio.Condition()
+            self._loop = loop
+        return self._cond
+
+    def _pick(self, now: float, est_tokens: int, exclude: Iterable[int] = (), reserve: int = 0) -> Optional[KeyState]:
+        best = None
+        for key in self.keys:
+            if key.index in exclude:
+                continue
+            key.refresh(now)
+            if not key.can_serve(now, est_tokens, self.max_in_flight):
+                continue
+            if reserve and key.remaining_requests is not None and key.remaining_requests - key.in_flight <= reserve:
+                continue
+            if best is None or key.free_requests(self.max_in_flight) > best.free_requests(self.max_in_flight):
+                best = key
+        return best
+
+    def _wake_in(self, now: float) -> Optional[float]:
+        waits = [w for w in (k.next_reset(now) for k in self.keys) if w is not None]
+        return min(waits) if waits else None
+
+    def _take(self, key: KeyState, est_tokens: int) -> KeyState:
+        key.in_flight += 1
+        if key.remaining_tokens is not None:
+            key.remaining_tokens -= est_tokens
+        return key
+
+    def try_acquire(self, est_tokens: int = 0, exclude: Iterable[int] = (), reserve: int = 0) -> Optional[KeyState]:
+        """
+        Non-blocking acquire. Only succeeds if a key (not in `exclude`) would still
+        have more than `reserve` requests left in its rate-limit window, so optional
+        work never eats into the last of a key's budget. Never jumps the queue.
+        """
+        if self._waiters:
+            return None
+        key = self._pick(time.time(), est_tokens, exclude, reserve)
+        return self._take(key, est_tokens) if key is not None else None
+
+    def headroom_ratio(self, now: Optional[float] = None) -> float:
+        """Share of the known request budget still unspent (1.0 while limits are unknown)."""
+        now = time.time() if now is None else now
+        limit = remaining = 0
+        for key in self.keys:
+            key.refresh(now)
+            if key.limit_requests and key.remaining_requests is not None:
+                limit += key.limit_requests
+                remaining += max(0, key.remaining_requests - key.in_flight)
+        return remaining / limit if limit else 1.0
+
+    def _is_next(self, waiter: _Waiter) -> bool:
+        for other in self._waiters:
+            if other is not waiter and not other.deferred and other.rank < waiter.rank:
+                return False
+        return True
+
+    async def acquire(self, est_tokens: int = 0, exclude: Iterable[int] = (),
+                      priority: LLMPriority = LLMPriority.PAPER_DECISION,
+                      deadline: Optional[float] = None) -> KeyState:
+        """
+        Wait for a key in priority order.
+        deadline: time.time() by which a key must be assigned, else LLMDeadlineError.
+        """
+        priority = LLMPriority(priority)
+        enqueued = time.time()
+        ratio = self.headroom_ratio(enqueued)
+        if ratio < self.shed_below.get(priority, 0.0):
+            self.shed[priority] += 1
+            raise LLMShedError(f"{priority.name} shed: request headroom at {ratio:.0%}")
+
+        cond = self._condition()
+        async with cond:
+            waiter = _Waiter(priority, next(self._seq))
+            self._waiters.append(waiter)
+            warned = False
+            try:
+                while True:
+                    now = time.time()
+                    waiter.deferred = self.headroom_ratio(now) < self.defer_below.get(priority, 0.0)
+                    if not waiter.deferred and self._is_next(waiter):
+                        key = self._pick(now, est_tokens, exclude)
+                        if key is not None:
+                            self.queue_wait[priority].add(now - enqueued)
+                            return self._take(key, est_tokens)
+                    if deadline is not None and now >= deadline:
+                        self.expired[priority] += 1
+                        raise LLMDeadlineError(f"{priority.name} not admitted within its deadline")
+                    if not warned and not waiter.deferred:
+                        logger.warning("All Groq API keys are busy or rate limited. Waiting...")
+                        warned = True
+                    timeout = self._wake_in(now)
+                    if deadline is not None:
+                        left = max(0.0, deadline - now)
+                        timeout = left if timeout is None else min(timeout, left)
+                    try:
+                        await asyncio.wait_for(cond.wait(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                self._waiters.remove(waiter)
+                # Whoever is next in line needs to re-check
+                cond.notify_all()
+
+    def waiting(self) -> int:
+        """Requests queued for a key right now."""
+        return len(self._waiters)
+
+    def queue_stats(self) -> Dict[str, Any]:
+        """Per-class queue wait percentiles plus shed / expired counts."""
+        return {
+            p.name: {**self.queue_wait[p].summary(), "shed": self.shed[p], "expired": self.expired[p]}
+            for p in LLMPriority
+        }
+
+    async def release(self, key: KeyState, headers: Any = None, retry_after: Optional[float] = None):
+        cond = self._condition()
+        async with cond:
+            now = time.time()
+            key.in_flight -= 1
+            if headers is not None:
+                key.update_from_headers(headers, now)
+            elif key.remaining_requests is not None:
+                key.remaining_requests -= 1
+            if retry_after is not None:
+                key.blocked_until = now + retry_after
+            cond.notify_all()
+
+    def headroom(self) -> int:
+        """Requests that could be started right now across all keys."""
+        now = time.time()
+        total = 0
+        for key in self.keys:
+            key.refresh(now)
+            if now >= key.blocked_until:
+                total += key.free_requests(self.max_in_flight)
+        return total
+
+class Completion:
+    """A chat completion plus the bookkeeping the callers care about."""
+    __slots__ = ("message", "model", "key_index", "latency", "prompt_tokens", "completion_tokens", "hedged")
+
+    def __init__(self, message, model, key_index, latency, prompt_tokens, completion_tokens, hedged=False):
+        self.message = message
+        self.model = model
+        self.key_index = key_index
+        self.latency = latency
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.hedged = hedged  # True when the answer came from the duplicate request
+
+class LatencyTracker:
+    """Rolling window of latencies (seconds) with percentile lookups."""
+    def __init__(self, window: int = 2000):
+        self.samples = deque(maxlen=window)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        return float(np.percentile(np.fromiter(self.samples, dtype=float), q))
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.samples:
+            return {"n": 0}
+        p50, p95, p99 = np.percentile(np.fromiter(self.samples, dtype=float), [50, 95, 99])
+        return {"n": len(self.samples), "p50_ms": round(p50 * 1000, 1), "p95_ms": round(p95 * 1000, 1), "p99_ms": round(p99 * 1000, 1)}
+
 class GroqClient:
-    def __init__(self):
+    def __init__(self,
+                 max_in_flight_per_key: int = 4,
+                 hedge: bool = False,
+                 hedge_percentile: float = 95.0,
+                 hedge_min_samples: int = 20,
+                 hedge_default_delay: float = 2.0,
+                 hedge_min_delay: float = 0.2,
+                 hedge_reserve: int = 2,
+                 clients: Optional[List[Any]] = None,
+                 router: Optional[ModelRouter] = None):
         self.api_keys = settings.GROQ_API_KEYS
-        if not self.api_keys:
+        if not self.api_keys and clients is None:
             logger.warning("No Groq API keys found in settings.")
-        
-        self.clients = [Groq(api_key=k) for k in self.api_keys]
-        self.current_key_index = 0
-        self.rate_limits = {i: {'remaining': 1000, 'reset': 0} for i in range(len(self.api_keys))}
-
-    def _get_client(self):
-        """Get the next available client based on rate limits."""
-        start_index = self.current_key_index
-        
-        while True:
-            # Check if current key is valid (simple check, can be more complex)
-            limit_info = self.rate_limits[self.current_key_index]
-            if limit_info['remaining'] > 0 or time.time() > limit_info['reset']:
-                client = self.clients[self.current_key_index]
-                # Update index for round-robin load balancing
-                self.current_key_index = (self.current_key_index + 1) % len(self.clients)
-                return client
-            
-            # Move to next key
-            self.current_key_index = (self.current_key_index + 1) % len(self.clients)
-            
-            # If we've circled back to start, all keys are exhausted
-            if self.current_key_index == start_index:
-                logger.warning("All Groq API keys are rate limited. Waiting...")
-                time.sleep(5) # Wait a bit and try again
-
-    def _update_rate_limits(self, headers, key_index):
-        """Update rate limit info from response headers."""
-        try:
-            remaining = int(headers.get('x-ratelimit-remaining-requests', 1000))
-            reset_time = float(headers.get('x-ratelimit-reset-requests', 0))
-            # Convert duration string (e.g., "12s") to timestamp if needed, 
-            # but Groq usually sends duration or timestamp. 
-            # Let's assume it might need parsing if it's not a float.
-            # For now, we'll trust the header or default.
-            
-            # Actually Groq headers:
-            # x-ratelimit-remaining-requests: 14
-            # x-ratelimit-reset-requests: 2s
-            
-            if isinstance(reset_time, str):
-                if 's' in reset_time:
-                    reset_time = float(reset_time.replace('s', ''))
-                elif 'm' in reset_time:
-                    reset_time = float(reset_time.replace('m', '')) * 60
-            
-            self.rate_limits[key_index]['remaining'] = remaining
-            self.rate_limits[key_index]['reset'] = time.time() + reset_time
-            
-        except Exception as e:
-            logger.debug(f"Failed to parse rate limit headers: {e}")
-
-    def query(self, 
-              messages: List[Dict[str, str]], 
-              model: str = "openai/gpt-oss-120b",
-              tools: Optional[List[Dict]] = None,
-              temperature: float = 0.7,
-              **kwargs) -> Any:
+
+        # Retries are ours to make (on another key), not the SDK's
+        self.clients = clients if clients is not None else [AsyncGroq(api_key=k, max_retries=0) for k in self.api_keys]
+        self.pool = KeyPool(self.clients, max_in_flight=max_in_flight_per_key)
+
+        # Hedging: if the first request is slower than p{hedge_percentile} of what
+        # we've observed, fire a duplicate on another key and keep the faster one.
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_default_delay = hedge_default_delay
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_reserve = hedge_reserve  # Free requests a key must keep after a hedge
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.hedges_skipped = 0
+        self.latency = {"unhedged": LatencyTracker(), "hedged": LatencyTracker()}
+
+        # Picks a model per call when the caller doesn't name one
+        self.router = router or ModelRouter()
+
+    @property
+    def rate_limits(self) -> Dict[int, Dict[str, Any]]:
+        return {k.index: k.snapshot() for k in self.pool.keys}
+
+    @staticmethod
+    def estimate_tokens(messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> int:
+        """Rough token estimate (~4 chars/token) used to reserve TPM budget."""
+        prompt = sum(len(m.get("content") or "") for m in messages) // 4
+        return prompt + (max_tokens or 256)
+
+    def hedge_delay(self) -> float:
+        """How long to wait for the first answer before hedging."""
+        tracker = self.latency["unhedged"]
+        if len(tracker) < self.hedge_min_samples:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, tracker.percentile(self.hedge_percentile))
+
+    def latency_stats(self) -> Dict[str, Any]:
+        """p50/p95/p99 per request (unhedged) and as seen by hedged callers."""
+        return {
+            "unhedged": self.latency["unhedged"].summary(),
+            "hedged": self.latency["hedged"].summary(),
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "hedges_skipped": self.hedges_skipped,
+        }
+
+    async def complete(self,
+                       messages: List[Dict[str, str]],
+                       model: Optional[str] = None,
+                       tools: Optional[List[Dict]] = None,
+                       temperature: float = 0.7,
+                       hedge: Optional[bool] = None,
+                       latency_budget: Optional[float] = None,
+                       priority: LLMPriority = LLMPriority.PAPER_DECISION,
+                       deadline: Optional[float] = None,
+                       **kwargs) -> Completion:
         """
-        Execute a query against the Groq API.
+        Execute a chat completion on the least-loaded key with headroom.
+        Rate-limited keys are parked until their reset and the call moves to another key.
+        model: None = let the ModelRouter pick the largest model fitting `latency_budget` (seconds).
+        hedge: Override the client-wide hedging setting for this call.
+        priority: Queue class when keys are contended (see LLMPriority).
+        deadline: Seconds from now within which a key must be assigned, else LLMDeadlineError.
         """
+        if not self.clients:
+            raise RuntimeError("No Groq API keys configured (GROQ_API_KEY_n).")
+
+        est_tokens = self.estimate_tokens(messages, kwargs.get("max_tokens"))
+        if model is None:
+            model = self.router.select(latency_budget, est_tokens, n_keys=len(self.pool), headroom=self.pool.headroom_ratio())
+
+        params = {
+            "messages": messages,
+            "model": model,
+            "temperature": temperature,
+            **kwargs
+        }
+        if tools:
+            params["tools"] = tools
+            params["tool_choice"] = "auto"
+
+        admission = {"priority": priority, "deadline": time.time() + deadline if deadline is not None else None}
+        if (self.hedge if hedge is None else hedge) and len(self.pool) > 1:
+            started = time.perf_counter()
+            completion = await self._complete_hedged(params, est_tokens, admission)
+            self.latency["hedged"].add(time.perf_counter() - started)
+            return completion
+        return await self._attempt(params, est_tokens, admission=admission)
+
+    def queue_stats(self) -> Dict[str, Any]:
+        return self.pool.queue_stats()
+
+    def model_stats(self) -> Dict[str, Dict[str, Any]]:
+        return self.router.snapshot()
+
+    async def _complete_hedged(self, params: Dict[str, Any], est_tokens: int, admission: Dict[str, Any]) -> Completion:
+        used_keys: List[int] = []
+        hedge_keys: List[int] = []
+        primary = asyncio.create_task(self._attempt(params, est_tokens, used_keys=used_keys, admission=admission))
+        secondary, key = None, None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay())
+            if done:
+                return primary.result()
+
+            # Budget-aware: only hedge on a different key that keeps `hedge_reserve` requests spare
+            key = self.pool.try_acquire(est_tokens, exclude=used_keys, reserve=self.hedge_reserve)
+            if key is None:
+                self.hedges_skipped += 1
+                return await primary
+
+            self.hedges_fired += 1
+            secondary = asyncio.create_task(self._attempt(params, est_tokens, key=key, used_keys=hedge_keys, hedged=True))
+            pending = {primary, secondary}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is secondary:
+                            self.hedges_won += 1
+                        return task.result()
+            # Both failed: surface the primary's error
+            return primary.result()
+        finally:
+            # Also when the caller is cancelled (e.g. a decision deadline): no orphaned request keeps a key
+            tasks = [t for t in (primary, secondary) if t is not None and not t.done()]
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            if key is not None and not hedge_keys:
+                # The hedge was cancelled before it started, so it never released its key
+                await self.pool.release(key)
+
+    async def _attempt(self, params: Dict[str, Any], est_tokens: int, key: Optional[KeyState] = None,
+                       used_keys: Optional[List[int]] = None, hedged: bool = False,
+                       admission: Optional[Dict[str, Any]] = None) -> Completion:
+        """One logical request: up to 3 tries, rotating keys on rate limits."""
         retries = 3
         while retries > 0:
-            client = self._get_client()
-            key_index = self.clients.index(client)
+            if key is None:
+                key = await self.pool.acquire(est_tokens, **(admission or {}))
+            if used_keys is not None:
+                used_keys.append(key.index)
 
+            key_index = key.index
+            headers, retry_after = None, None
+            started = time.perf_counter()
             try:
-                params = {
-                    "messages": messages,
-                    "model": model,
-                    "temperature": temperature,
-                    **kwargs
-                }
-                if tools:
-                    params["tools"] = tools
-                    params["tool_choice"] = "auto"
-
-                response = client.chat.completions.create(**params)
-                return response.choices[0].message
-
+                raw = await key.client.chat.completions.with_raw_response.create(**params)
+                headers = raw.headers
+                response = await raw.parse()
             except RateLimitError as e:
-                logger.warning(f"Rate limit hit for key {key_index}. Rotating...")
-                self.rate_limits[key_index]['remaining'] = 0
-                self.rate_limits[key_index]['reset'] = time.time() + 60 # Default wait
+                headers = getattr(getattr(e, "response", None), "headers", None)
+                retry_after = parse_duration(headers.get("retry-after")) if headers is not None and headers.get("retry-after") else 60.0
+                # A per-key quota, not a model fault: the pool cools the key down instead
+                LLM_ERRORS.labels(str(key_index), "rate_limit").inc()
+                logger.warning(f"Rate limit hit for key {key.index}. Rotating...")
                 retries -= 1
-                
+                continue
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Groq API Error: {e}")
+                self.router.record(params["model"], error=True)
+                LLM_ERRORS.labels(str(key_index), type(e).__name__).inc()
                 raise e
-        
+            finally:
+                # Always hand the key back, including when a hedge race cancels us
+                await self.pool.release(key, headers=headers, retry_after=retry_after)
+                key = None
+
+            latency = time.perf_counter() - started
+            self.latency["unhedged"].add(latency)
+            usage = getattr(response, "usage", None)
+            used = (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+            self.router.record(params["model"], latency=latency, tokens=used or est_tokens)
+            LLM_SECONDS.labels(str(key_index), params["model"]).observe(latency)
+            LLM_TOKENS.labels(str(key_index), "prompt").inc(getattr(usage, "prompt_tokens", 0) or 0)
+            LLM_TOKENS.labels(str(key_index), "completion").inc(getattr(usage, "completion_tokens", 0) or 0)
+            return Completion(
+                message=response.choices[0].message,
+                model=params["model"],
+                key_index=key_index,
+                latency=latency,
+                prompt_tokens=getattr(usage, "prompt_tokens", None),
+                completion_tokens=getattr(usage, "completion_tokens", None),
+                hedged=hedged,
+            )
+
         raise Exception("Max retries exceeded for Groq API")
 
-groq_client = GroqClient()
+    async def query(self,
+                    messages: List[Dict[str, str]],
+                    model: Optional[str] = None,
+                    tools: Optional[List[Dict]] = None,
+                    temperature: float = 0.7,
+                    **kwargs) -> Any:
+        """
+        Execute a query against the Groq API and return the response message.
+        """
+        completion = await self.complete(messages, model=model, tools=tools, temperature=temperature, **kwargs)
+        return completion.message
+
+groq_client = GroqClient(hedge=settings.GROQ_HEDGE, hedge_percentile=settings.GROQ_HEDGE_PERCENTILE)
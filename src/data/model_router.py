@@ -0,0 +1,132 @@
+import time
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class ModelSpec:
+    """A Groq model the router may pick, with its static limits."""
+    __slots__ = ("name", "size", "tokens_per_minute", "prior_latency")
+
+    def __init__(self, name: str, size: float, tokens_per_minute: int, prior_latency: float):
+        self.name = name
+        self.size = size                            # Billions of parameters; bigger = smarter, slower
+        self.tokens_per_minute = tokens_per_minute  # Per-key TPM limit for this model
+        self.prior_latency = prior_latency          # Seconds, used until we have samples
+
+# Largest first. TPM values are Groq's free-tier limits per key.
+DEFAULT_MODELS = [
+    ModelSpec("openai/gpt-oss-120b", 120, 8000, 3.0),
+    ModelSpec("llama-3.3-70b-versatile", 70, 12000, 2.0),
+    ModelSpec("openai/gpt-oss-20b", 20, 8000, 1.0),
+    ModelSpec("llama-3.1-8b-instant", 8, 6000, 0.5),
+]
+
+class ModelStats:
+    """Live view of one model: EWMA latency and error rate, tokens used in the last minute."""
+    __slots__ = ("latency", "error_rate", "error_time", "samples", "tokens", "calls", "errors")
+
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.error_time = 0.0  # When error_rate was last updated
+        self.samples = 0
+        self.tokens = deque()  # (timestamp, tokens)
+        self.calls = 0
+        self.errors = 0
+
+    def tokens_last_minute(self, now: float) -> int:
+        while self.tokens and now - self.tokens[0][0] > 60.0:
+            self.tokens.popleft()
+        return sum(t for _, t in self.tokens)
+
+    def error_rate_at(self, now: float, half_life: float) -> float:
+        """The error rate, halved for every `half_life` seconds since it was last updated."""
+        if not self.error_rate:
+            return 0.0
+        return self.error_rate * 0.5 ** (max(now - self.error_time, 0.0) / half_life)
+
+class ModelRouter:
+    """
+    Picks the largest model that fits the caller's latency budget.
+    A model is skipped when
+    - its expected latency (EWMA, or the prior) exceeds the budget,
+    - its recent error rate is above `max_error_rate` (the rate halves every
+      `error_half_life` seconds, so a skipped model is tried again once it cools down),
+    - the request would push it past `quota_reserve` of its per-minute token budget,
+    - or the key pool is nearly out of requests (then the biggest models are dropped first).
+    Falls back to the smallest model when nothing fits.
+    """
+    def __init__(self, models: Optional[List[ModelSpec]] = None, alpha: float = 0.2,
+                 max_error_rate: float = 0.3, quota_reserve: float = 0.9, low_headroom: float = 0.2,
+                 error_half_life: float = 60.0):
+        self.models = sorted(models or DEFAULT_MODELS, key=lambda m: m.size, reverse=True)
+        self.alpha = alpha
+        self.max_error_rate = max_error_rate
+        self.quota_reserve = quota_reserve
+        self.low_headroom = low_headroom
+        self.error_half_life = error_half_life
+        self.stats: Dict[str, ModelStats] = {m.name: ModelStats() for m in self.models}
+        self.picks: Dict[str, int] = {m.name: 0 for m in self.models}
+
+    def expected_latency(self, spec: ModelSpec) -> float:
+        latency = self.stats[spec.name].latency
+        return spec.prior_latency if latency is None else latency
+
+    def select(self, latency_budget: Optional[float] = None, est_tokens: int = 0,
+               n_keys: int = 1, headroom: float = 1.0) -> str:
+        now = time.time()
+        candidates = self.models
+        if headroom < self.low_headroom and len(candidates) > 1:
+            # Near quota exhaustion: shed the heavier half, keep the requests short
+            candidates = candidates[len(candidates) // 2:]
+
+        choice = None
+        for spec in candidates:
+            stats = self.stats[spec.name]
+            if latency_budget is not None and self.expected_latency(spec) > latency_budget:
+                continue
+            if stats.error_rate_at(now, self.error_half_life) > self.max_error_rate:
+                continue
+            budget = spec.tokens_per_minute * max(1, n_keys) * self.quota_reserve
+            if stats.tokens_last_minute(now) + est_tokens > budget:
+                continue
+            choice = spec
+            break
+
+        if choice is None:
+            choice = self.models[-1]
+        self.picks[choice.name] += 1
+        return choice.name
+
+    def record(self, model: str, latency: Optional[float] = None, tokens: int = 0, error: bool = False):
+        stats = self.stats.get(model)
+        if stats is None:
+            # Explicitly requested model outside the routing table
+            stats = self.stats[model] = ModelStats()
+        a = self.alpha
+        now = time.time()
+        stats.calls += 1
+        stats.errors += int(error)
+        rate = stats.error_rate_at(now, self.error_half_life)
+        stats.error_rate = (1 - a) * rate + a * (1.0 if error else 0.0)
+        stats.error_time = now
+        if latency is not None and not error:
+            stats.latency = latency if stats.latency is None else (1 - a) * stats.latency + a * latency
+            stats.samples += 1
+        if tokens:
+            stats.tokens.append((now, tokens))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        now = time.time()
+        return {
+            name: {
+                "latency_ms": round(s.latency * 1000, 1) if s.latency is not None else None,
+                "error_rate": round(s.error_rate_at(now, self.error_half_life), 3),
+                "tokens_1m": s.tokens_last_minute(now),
+                "calls": s.calls,
+                "picks": self.picks.get(name, 0),
+            }
+            for name, s in self.stats.items()
+        }
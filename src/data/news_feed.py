@@ -0,0 +1,301 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+from src.config.settings import settings
+from src.data.groq_client import groq_client, LLMPriority, LLMShedError
+
+logger = logging.getLogger(__name__)
+
+def headline_hash(text: str) -> str:
+    """Content hash used to dedupe headlines (case and whitespace insensitive)."""
+    return hashlib.sha1(" ".join(text.lower().split()).encode()).hexdigest()
+
+class NewsSource(ABC):
+    """Where headlines come from."""
+    name = "base"
+
+    @abstractmethod
+    async def fetch(self, symbol: str) -> List[str]:
+        """Latest headlines for `symbol` as 'title: description' strings."""
+        pass
+
+class GoogleNewsSource(NewsSource):
+    """googlesearch-python, run in a worker thread (it blocks)."""
+    name = "google"
+
+    def __init__(self, num_results: int = 5):
+        self.num_results = num_results
+
+    def _search(self, symbol: str) -> List[str]:
+        from googlesearch import search
+        query = f"crypto news {symbol} price analysis bullish bearish"
+        return [f"{r.title}: {r.description}" for r in search(query, num_results=self.num_results, advanced=True)]
+
+    async def fetch(self, symbol: str) -> List[str]:
+        return await asyncio.to_thread(self._search, symbol)
+
+class FileNewsSource(NewsSource):
+    """
+    JSON-lines file for offline runs, one headline per line:
+    {"symbol": "BTCUSD", "title": "...", "description": "..."}
+    Re-read only when the file changes.
+    """
+    name = "file"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mtime = None
+        self._by_symbol: Dict[str, List[str]] = {}
+
+    def _load(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            self._by_symbol = {}
+            return
+        if mtime == self._mtime:
+            return
+        by_symbol: Dict[str, List[str]] = {}
+        with open(self.path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                text = f"{item.get('title', '')}: {item.get('description', '')}".strip(": ")
+                by_symbol.setdefault(str(item.get("symbol", "")).upper(), []).append(text)
+        self._by_symbol, self._mtime = by_symbol, mtime
+
+    async def fetch(self, symbol: str) -> List[str]:
+        self._load()
+        return list(self._by_symbol.get(symbol.upper(), []))
+
+class StaticNewsSource(NewsSource):
+    """Fixed headlines per symbol (tests, offline stubs)."""
+    name = "static"
+
+    def __init__(self, headlines: Optional[Dict[str, List[str]]] = None):
+        self.headlines = headlines or {}
+
+    async def fetch(self, symbol: str) -> List[str]:
+        return list(self.headlines.get(symbol, []))
+
+def source_from_settings(spec: Optional[str] = None) -> NewsSource:
+    """NEWS_SOURCE: 'google' (default), 'file:<path>' or 'static' (no news)."""
+    spec = (spec if spec is not None else settings.NEWS_SOURCE).strip()
+    if spec.startswith("file:"):
+        return FileNewsSource(spec[len("file:"):])
+    if spec == "static":
+        return StaticNewsSource()
+    return GoogleNewsSource()
+
+class TTLCache:
+    """Tiny dict with per-entry expiry; expired entries read as missing."""
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._data: Dict[str, tuple] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if time.time() >= expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    def set(self, key: str, value: Any):
+        self._data[key] = (time.time() + self.ttl, value)
+
+    def touch(self, key: str) -> bool:
+        """Extend an entry's lifetime (e.g. the news was re-checked and nothing changed)."""
+        value = self.get(key)
+        if value is None:
+            return False
+        self.set(key, value)
+        return True
+
+    def __len__(self):
+        return len(self._data)
+
+class NewsIngestor:
+    """
+    Background news pipeline, off the decision path:
+    1. Every `refresh_interval` seconds, fetch headlines for each watched symbol.
+    2. Drop headlines already seen (content hash).
+    3. Score only the new ones with the LLM (NEWS priority) and blend with the
+       previous sentiment.
+    4. Keep the result in a TTL cache; `get(symbol)` is a dict lookup.
+    """
+    def __init__(self, source: Optional[NewsSource] = None, refresh_interval: float = 900.0, ttl: float = 3600.0,
+                 concurrency: int = 2, max_seen: int = 500, decay: float = 0.5):
+        self.source = source or StaticNewsSource()
+        self.refresh_interval = refresh_interval
+        self.cache = TTLCache(ttl)
+        self.concurrency = concurrency
+        self.max_seen = max_seen  # Hashes remembered per symbol
+        self.decay = decay        # Weight of the previous sentiment vs. a fresh batch of equal size
+        self.symbols: Dict[str, None] = {}
+        self._pending: Dict[str, None] = {}  # Watched but never fetched
+        self._seen: Dict[str, OrderedDict] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.fetched = 0
+        self.scored = 0
+        self.duplicates = 0
+
+    def watch(self, symbols: Iterable[str]):
+        """Add symbols to the refresh set (cheap; safe to call every cycle). New ones are fetched right away."""
+        for symbol in symbols:
+            if symbol not in self.symbols:
+                self.symbols[symbol] = None
+                self._pending[symbol] = None
+        if self._pending and self._wakeup is not None:
+            self._wakeup.set()
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.cache.get(symbol)
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"📰 News ingestion started ({self.source.name} source).")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        next_full = time.monotonic()
+        while True:
+            if time.monotonic() >= next_full:
+                await self.refresh_all()
+                next_full = time.monotonic() + self.refresh_interval
+            elif self._pending:
+                await self.refresh_all(list(self._pending))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, next_full - time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def refresh_all(self, symbols: Optional[List[str]] = None):
+        symbols = list(self.symbols) if symbols is None else symbols
+        for symbol in symbols:
+            self._pending.pop(symbol, None)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _one(symbol):
+            async with semaphore:
+                try:
+                    await self.refresh(symbol)
+                except Exception as e:
+                    logger.warning(f"News refresh failed for {symbol}: {e}")
+
+        await asyncio.gather(*[_one(s) for s in symbols])
+
+    def _new_headlines(self, symbol: str, headlines: List[str]) -> List[str]:
+        seen = self._seen.setdefault(symbol, OrderedDict())
+        fresh = []
+        for text in headlines:
+            h = headline_hash(text)
+            if h in seen:
+                self.duplicates += 1
+                continue
+            seen[h] = None
+            fresh.append(text)
+        while len(seen) > self.max_seen:
+            seen.popitem(last=False)
+        return fresh
+
+    async def refresh(self, symbol: str) -> Optional[Dict[str, Any]]:
+        headlines = await self.source.fetch(symbol)
+        self.fetched += len(headlines)
+        fresh = self._new_headlines(symbol, headlines)
+        if not fresh:
+            self.cache.touch(symbol)
+            return self.cache.get(symbol)
+
+        try:
+            result = await self.score(symbol, fresh)
+        except Exception as e:
+            # Forget the hashes so these headlines get scored on the next pass
+            for text in fresh:
+                self._seen[symbol].pop(headline_hash(text), None)
+            if not isinstance(e, LLMShedError):
+                raise
+            logger.info(f"News scoring deferred for {symbol}: {e}")
+            return self.cache.get(symbol)
+        self.scored += len(fresh)
+
+        entry = self._blend(self.cache.get(symbol), result, len(fresh))
+        self.cache.set(symbol, entry)
+        return entry
+
+    def _blend(self, previous: Optional[Dict[str, Any]], result: Dict[str, Any], n_new: int) -> Dict[str, Any]:
+        """Signed score in [-1, 1]; the previous sentiment's weight decays by `decay` per update."""
+        score = {"BULLISH": 1.0, "BEARISH": -1.0}.get(result["sentiment"], 0.0) * result["confidence"]
+        n_prev = previous["weight"] * self.decay if previous else 0.0
+        if n_prev:
+            score = (previous["score"] * n_prev + score * n_new) / (n_prev + n_new)
+        return {
+            "score": score,
+            "action": "BUY" if score > 0 else "SELL" if score < 0 else "NEUTRAL",
+            "confidence": min(1.0, abs(score)),
+            "summary": result["summary"],
+            "headlines": result["headlines"][:2],
+            "weight": n_prev + n_new,
+            "headline_count": n_new + (previous["headline_count"] if previous else 0),
+            "updated_at": time.time(),
+        }
+
+    async def score(self, symbol: str, headlines: List[str]) -> Dict[str, Any]:
+        news_text = "\n".join(headlines)
+        prompt = f"""
+        Analyze the sentiment for {symbol} based on these recent news headlines/snippets:
+        {news_text}
+
+        Return JSON: {{ "sentiment": "BULLISH/BEARISH/NEUTRAL", "confidence": 0.0-1.0, "summary": "Brief summary of news" }}
+        """
+        response = await groq_client.query([{"role": "user", "content": prompt}], priority=LLMPriority.NEWS)
+        content = response.content.strip()
+        # Clean json
+        if "```json" in content:
+            content = content.split("```json")[1].split("```")[0]
+        elif "```" in content:
+            content = content.split("```")[1].split("```")[0]
+
+        result = json.loads(content)
+        return {
+            "sentiment": str(result.get("sentiment", "NEUTRAL")).upper(),
+            "confidence": min(1.0, max(0.0, float(result.get("confidence", 0.5)))),
+            "summary": result.get("summary", ""),
+            "headlines": headlines,
+        }
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "symbols": len(self.symbols),
+            "cached": len(self.cache),
+            "fetched": self.fetched,
+            "scored": self.scored,
+            "duplicates": self.duplicates,
+        }
+
+news_feed = NewsIngestor(source_from_settings(), refresh_interval=settings.NEWS_REFRESH_SECONDS, ttl=settings.NEWS_TTL_SECONDS)
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Union
+
+
+class MarketPanel:
+    """
+    Aligned OHLCV arrays for many symbols at once (shape: symbols x time).
+
+    Rows follow the order of `symbols`. Series shorter than the panel are
+    right-aligned (the latest candle is always the last column) and padded
+    on the left with NaN, so `lengths[i]` tells how many columns are real.
+    """
+    FIELDS = ("open", "high", "low", "close", "volume")
+
+    def __init__(self,
+                 symbols: Sequence[str],
+                 open: np.ndarray,
+                 high: np.ndarray,
+                 low: np.ndarray,
+                 close: np.ndarray,
+                 volume: np.ndarray,
+                 time: Optional[np.ndarray] = None,
+                 lengths: Optional[np.ndarray] = None):
+        self.symbols = list(symbols)
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.time = time
+        if lengths is None:
+            lengths = np.full(len(self.symbols), close.shape[1] if close.ndim == 2 else 0, dtype=np.int64)
+        self.lengths = lengths
+        self._index = {s: i for i, s in enumerate(self.symbols)}
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], length: Optional[int] = None) -> "MarketPanel":
+        """
+        Build a panel from per-symbol OHLCV DataFrames (as returned by the scanner).
+        length: Number of trailing candles to keep. Defaults to the longest frame.
+        """
+        symbols = list(frames.keys())
+        if length is None:
+            length = max((len(df) for df in frames.values()), default=0)
+
+        n = len(symbols)
+        arrays = {f: np.full((n, length), np.nan) for f in cls.FIELDS}
+        time = np.zeros((n, length), dtype=np.int64)
+        has_time = True
+        lengths = np.zeros(n, dtype=np.int64)
+
+        for i, symbol in enumerate(symbols):
+            df = frames[symbol]
+            if df is None or df.empty:
+                continue
+            tail = df.iloc[-length:] if length else df.iloc[0:0]
+            k = len(tail)
+            lengths[i] = k
+            if k == 0:
+                continue
+            for f in cls.FIELDS:
+                arrays[f][i, length - k:] = tail[f].to_numpy(dtype=float)
+            if has_time and 'time' in tail.columns:
+                t = tail['time']
+                if pd.api.types.is_datetime64_any_dtype(t):
+                    t = t.astype('int64') // 10**9
+                time[i, length - k:] = np.asarray(t, dtype=np.int64)
+            else:
+                has_time = False
+
+        return cls(symbols, time=time if has_time and n else None, lengths=lengths, **arrays)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @property
+    def width(self) -> int:
+        return self.close.shape[1]
+
+    def index(self, symbol: str) -> int:
+        return self._index[symbol]
+
+    def frame(self, key: Union[int, str]) -> pd.DataFrame:
+        """Return a single symbol's rows as a DataFrame (padding dropped)."""
+        i = self._index[key] if isinstance(key, str) else key
+        k = int(self.lengths[i])
+        start = self.width - k
+        data = {f: getattr(self, f)[i, start:] for f in self.FIELDS}
+        if self.time is not None:
+            data = {'time': self.time[i, start:], **data}
+        return pd.DataFrame(data)
+
+    def atr(self, window: int = 14) -> np.ndarray:
+        """Latest ATR (mean true range of the last `window` bars) per symbol."""
+        return trailing_mean(true_range(self.high, self.low, self.close), window)
+
+    def select(self, symbols: List[str]) -> "MarketPanel":
+        """Return a panel restricted to (and ordered by) `symbols`."""
+        rows = np.array([self._index[s] for s in symbols], dtype=np.int64)
+        return MarketPanel(
+            symbols,
+            time=self.time[rows] if self.time is not None else None,
+            lengths=self.lengths[rows],
+            **{f: getattr(self, f)[rows] for f in self.FIELDS}
+        )
+
+
+def candles_frame(rows: List[dict]) -> pd.DataFrame:
+    """OHLCV DataFrame from the `result` of /v2/history/candles: numeric columns, oldest first."""
+    df = pd.DataFrame(rows)
+    for c in MarketPanel.FIELDS:
+        df[c] = pd.to_numeric(df[c])
+    if 'time' in df.columns:
+        df = df.sort_values('time')
+    return df
+
+def trailing_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Mean of the last `window` columns for every row.
+    Matches `Series.rolling(window).mean().iloc[-1]`: NaN when fewer than
+    `window` real values are available.
+    """
+    if values.shape[1] < window:
+        return np.full(values.shape[0], np.nan)
+    return values[:, -window:].mean(axis=1)
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """
+    True range along the last axis (1-D series or symbol x time panels).
+    The first bar has no previous close and falls back to high - low, like pandas' max.
+    """
+    prev_close = np.empty_like(close)
+    prev_close[..., 0] = np.nan
+    prev_close[..., 1:] = close[..., :-1]
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import logging
+import math
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Iterable, Optional
+import asyncpg
+from src.data.db_manager import db_manager
+
+logger = logging.getLogger(__name__)
+
+def _json_safe(value: Any) -> Any:
+    """Postgres JSONB rejects NaN/Infinity; map them to null."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    return value
+
+# Worth retrying: the database is unreachable or busy, the rows themselves are fine
+TRANSIENT_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.InterfaceError,
+    asyncpg.TooManyConnectionsError,
+    asyncpg.CannotConnectNowError,
+)
+
+class SignalWriter:
+    """
+    Buffers every agent's signal per cycle and flushes them to `agent_signals`
+    in batches (COPY) from a background task.
+
+    `record()` only appends to an in-memory deque, so it never waits on the
+    database. The buffer is bounded: when it is full the oldest rows are
+    dropped and counted in `dropped`. A batch that fails on a transient error
+    goes back to the front of the buffer and is retried on the next flush;
+    any other error drops it (counted in `failed`).
+    """
+    def __init__(self, max_buffer: int = 100_000, batch_size: int = 5_000, flush_interval: float = 1.0):
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = deque(maxlen=max_buffer)
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def record(self, signals: Iterable[Any], timestamp: Optional[datetime] = None):
+        """Queue one cycle's signals for persistence."""
+        ts = timestamp or datetime.now(timezone.utc)
+        if hasattr(ts, "to_pydatetime"):
+            ts = ts.to_pydatetime()
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+
+        for s in signals:
+            if len(self._buffer) == self.max_buffer:
+                self.dropped += 1
+            self._buffer.append((ts, s.agent_name, s.symbol, s.action, float(s.confidence), s.metadata))
+
+        if self._wakeup is not None and len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            logger.info("🧾 Signal writer started.")
+
+    async def stop(self):
+        """Stop the background task and write out whatever is still buffered."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._buffer:
+            if not await self.flush():
+                break
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._buffer:
+                if not await self.flush():
+                    break
+
+    async def flush(self) -> int:
+        """Write up to `batch_size` buffered rows. Returns the number written."""
+        if not self._buffer:
+            return 0
+        batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+        records = [
+            (ts, agent, symbol, action, conf, json.dumps(_json_safe(meta)) if meta else None)
+            for ts, agent, symbol, action, conf, meta in batch
+        ]
+        try:
+            await db_manager.store_agent_signals(records)
+        except TRANSIENT_ERRORS as e:
+            self._requeue(batch)
+            logger.warning(f"Signal flush failed, {len(batch)} rows kept for retry: {e}")
+            return 0
+        except Exception as e:
+            self.failed += len(records)
+            logger.error(f"Signal flush failed ({len(records)} rows dropped): {e}")
+            return 0
+        self.written += len(records)
+        return len(records)
+
+    def _requeue(self, batch: list):
+        """Put a batch back in front, oldest rows first to go if it no longer fits."""
+        room = self.max_buffer - len(self._buffer)
+        if room < len(batch):
+            self.dropped += len(batch) - room
+            batch = batch[len(batch) - room:] if room > 0 else []
+        self._buffer.extendleft(reversed(batch))
+
+signal_writer = SignalWriter()
@@ -3,13 +3,15 @@ import websockets
 import json
 import logging
 from typing import List, Callable, Dict
+from src.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
 class WebSocketClient:
     URL = "wss://socket.india.delta.exchange"
 
-    def __init__(self):
+    def __init__(self, url: str = None):
+        self.URL = url or settings.DELTA_WS_URL
         self.connection = None
         self.callbacks: Dict[str, List[Callable]] = {}
         self.running = False
@@ -1,58 +1,52 @@
 import logging
 import json
 import os
+from typing import Optional
 from src.config.settings import settings
 from src.data.delta_client import delta_client
+from src.execution.paper_account import PaperAccount
 
 logger = logging.getLogger(__name__)
 
 class BalanceManager:
-    def __init__(self):
-        self.paper_file = "data/paper_wallet.json"
-        self._init_paper_wallet()
+    def __init__(self, account: PaperAccount = None):
+        self.paper_file = "data/paper_wallet.json"  # Legacy wallet, only read to seed a new account
+        self._paper = account
 
-    def _init_paper_wallet(self):
-        if not os.path.exists(self.paper_file):
-            with open(self.paper_file, "w") as f:
-                json.dump({"balance": 10000.0, "currency": "USD"}, f)
+    @property
+    def paper(self) -> PaperAccount:
+        """Opened (and replayed) on first use."""
+        if self._paper is None:
+            self._paper = PaperAccount(starting_balance=self._legacy_balance())
+        return self._paper
 
-    def get_balance(self, mode: str = None) -> float:
+    def _legacy_balance(self) -> float:
+        try:
+            with open(self.paper_file, "r") as f:
+                return float(json.load(f).get("balance", 10000.0))
+        except FileNotFoundError:
+            return 10000.0
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Unreadable legacy paper wallet {self.paper_file}: {e}")
+            return 10000.0
+
+    def get_balance(self, mode: str = None) -> Optional[float]:
+        """Account equity for `mode`; None when the live wallet can't be read."""
         if mode is None:
             mode = settings.TRADING_MODE
 
         if mode == "LIVE":
             try:
-                # Fetch from Delta Exchange
-                # Note: This requires delta_client to have a get_wallet_balance method
-                # If not, we might need to implement it or use a raw request
-                # For now, assuming delta_client has it or we catch error
-                if hasattr(delta_client, 'get_wallet_balance'):
-                    return delta_client.get_wallet_balance()
-                else:
-                    # Fallback or mock if method missing
-                    return 0.0
+                return delta_client.get_wallet_balance()
             except Exception as e:
                 logger.error(f"Failed to fetch live balance: {e}")
-                return 0.0
+                return None
         else:
-            # Paper Mode
-            try:
-                with open(self.paper_file, "r") as f:
-                    data = json.load(f)
-                    return data.get("balance", 10000.0)
-            except:
-                return 10000.0
+            # Paper Mode: in-memory, journaled by PaperAccount
+            return self.paper.balance
 
     def update_paper_balance(self, amount: float):
         """Add or subtract amount from paper balance."""
-        try:
-            current = self.get_balance("PAPER")
-            new_bal = current + amount
-            with open(self.paper_file, "w") as f:
-                json.dump({"balance": new_bal, "currency": "USD"}, f)
-            return new_bal
-        except Exception as e:
-            logger.error(f"Failed to update paper balance: {e}")
-            return current
+        return self.paper.adjust(amount, reason="manual")
 
 balance_manager = BalanceManager()
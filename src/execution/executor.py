@@ -1,22 +1,110 @@
+import asyncio
 import logging
 from typing import Optional, Dict
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timezone
 from src.data.delta_client import delta_client
 from src.data.db_manager import db_manager
+from src.config.runtime import runtime_config
+from src.execution.balance_manager import balance_manager
+from src.execution.position_book import position_book, Position
+from src.risk.portfolio_risk import portfolio_risk
+from src.risk.risk_manager import risk_manager
 
 logger = logging.getLogger(__name__)
 
 class ExecutionEngine:
-    async def execute_order(self, symbol, action, confidence, current_price, atr, mode, timestamp=None):
+    def __init__(self):
+        self.mode = runtime_config.snapshot.trading_mode
+        self._exit_tasks = set()
+        position_book.on_close(self._on_position_closed)
+        position_book.on_open(portfolio_risk.on_open)
+        position_book.on_close(portfolio_risk.on_close)
+
+    def _on_position_closed(self, position: Position):
+        """Settle an exit decided by the position book."""
+        if position.mode == "PAPER":
+            opposite = "SELL" if position.direction == "BUY" else "BUY"
+            balance_manager.paper.fill(position.symbol, opposite, position.quantity, position.exit_price)
+        elif position.mode == "LIVE":
+            # The book decided on the tick; the (blocking) exchange call runs off the event loop
+            task = asyncio.create_task(self._send_exit_order(position))
+            self._exit_tasks.add(task)
+            task.add_done_callback(self._exit_tasks.discard)
+
+    async def _send_exit_order(self, position: Position):
+        side = "sell" if position.direction == "BUY" else "buy"
+        try:
+            contracts = await asyncio.to_thread(delta_client.to_contracts, position.symbol, position.quantity)
+            response = await asyncio.to_thread(
+                delta_client.place_order,
+                symbol=position.symbol,
+                side=side,
+                order_type="market_order",
+                quantity=contracts
+            )
+            logger.warning(f"🚨 LIVE EXIT ({position.exit_reason}) EXECUTED: {response}")
+        except Exception as e:
+            logger.error(f"❌ Live Exit Failed for {position.symbol}: {e}")
+
+    def apply_config(self, snapshot, old=None):
+        """Runtime config subscriber: track the current trading mode."""
+        if old is not None and snapshot.trading_mode != self.mode:
+            logger.warning(f"Executor switching {self.mode} -> {snapshot.trading_mode}")
+        self.mode = snapshot.trading_mode
+
+    async def execute_order(self, symbol, action, confidence, current_price, atr, mode=None, timestamp=None):
         """
-        Executes order based on Mode:
+        Executes order based on Mode (defaults to the runtime config's current mode):
         - BACKTEST: Log to DB with historical timestamp.
         - PAPER: Log to DB with current timestamp (No API).
         - LIVE: Call Delta API + Log to DB.
         """
-        quantity = 100 # Simplification for example
-        entry_time = timestamp if timestamp else datetime.now()
+        mode = mode or self.mode
+        entry_time = timestamp if timestamp else datetime.now(timezone.utc)
+
+        # One position per (mode, symbol): hold on a repeat signal, flip on an opposite one
+        existing = position_book.get(mode, symbol)
+        if existing is not None:
+            if existing.direction == action:
+                return
+            position_book.close(existing, current_price, entry_time, "REVERSED")
+
+        # Backtests have no wallet: they size against the mode's running capital.
+        # A live order is never sized against a guess.
+        if mode == "BACKTEST":
+            equity = portfolio_risk.portfolio(mode).capital
+        else:
+            equity = balance_manager.get_balance(mode)
+            if equity is None:
+                logger.error(f"❌ {mode} {action} {symbol} blocked: wallet balance unavailable")
+                return
+
+        # Risk budget first (risk_per_trade of equity lost at the stop), then the
+        # portfolio limits (exposure, concentration, VaR, daily loss) may shrink or block it.
+        stop_loss = risk_manager.get_stop_loss_price(current_price, action, atr, symbol)
+        quantity = risk_manager.calculate_position_size(equity, current_price, stop_loss)
+        if quantity <= 0:
+            return
+        decision = portfolio_risk.check_order(symbol, action, quantity, current_price, mode, equity, entry_time)
+        if not decision.approved:
+            return
+        quantity = decision.quantity
+
+        # The exchange trades whole contracts: round the risked size down to what is
+        # actually sent, and book that size everywhere.
+        contracts = None
+        if mode == "LIVE":
+            try:
+                contract_value = await asyncio.to_thread(delta_client.contract_value, symbol)
+                contracts = await asyncio.to_thread(delta_client.to_contracts, symbol, quantity)
+            except Exception as e:
+                logger.error(f"❌ Live Trade Failed: no contract value for {symbol}: {e}")
+                return
+            if contracts <= 0:
+                logger.warning(f"⚠️ LIVE {action} {symbol} skipped: {quantity} is below one contract ({contract_value})")
+                return
+            quantity = contracts * contract_value
 
         trade_record = {
             "symbol": symbol,
@@ -26,18 +114,20 @@ class ExecutionEngine:
             "quantity": quantity,
             "entry_time": entry_time,
             "status": "OPEN",
-            "profit_loss": 0.0
+            "profit_loss": 0.0,
+            "atr": atr
         }
 
         if mode == "LIVE":
             # REAL MONEY DANGER ZONE
             try:
                 side = "buy" if action == "BUY" else "sell"
-                response = delta_client.place_order(
-                    symbol=symbol, 
-                    side=side, 
-                    order_type="market_order", 
-                    quantity=quantity
+                response = await asyncio.to_thread(
+                    delta_client.place_order,
+                    symbol=symbol,
+                    side=side,
+                    order_type="market_order",
+                    quantity=contracts
                 )
                 logger.warning(f"🚨 LIVE TRADE EXECUTED: {response}")
             except Exception as e:
@@ -51,7 +141,11 @@ class ExecutionEngine:
             # Silent logging for speed
             pass
 
-        # Save to Database (The Source of Truth for UI)
-        await db_manager.store_trade(trade_record)
+        # Save to Database (The Source of Truth for UI), then track it until an exit fires
+        trade_id = await db_manager.store_trade(trade_record)
+        position_book.open(symbol, action, current_price, quantity, atr, mode, entry_time, trade_id=trade_id)
+        if mode == "PAPER":
+            balance_manager.paper.fill(symbol, action, quantity, current_price)
 
 executor = ExecutionEngine()
+runtime_config.subscribe(executor.apply_config)
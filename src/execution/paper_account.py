@@ -0,0 +1,231 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class PaperAccount:
+    """
+    In-memory paper wallet: cash balance, positions and realized PnL.
+
+    Every change is an event that is applied to memory and appended to a
+    JSON-lines journal (write-ahead). The journal is fsynced in groups, at
+    most every `fsync_interval` seconds or `batch_size` events, so a crash
+    loses at most that window. Every `compact_every` events the state is
+    snapshotted (tmp file + os.replace) and the journal truncated. On startup
+    the snapshot is loaded and the journal replayed on top of it; a torn last
+    line from a crash mid-write is cut off.
+
+    Reads (`balance`, `positions`, `realized_pnl`) are plain attribute reads.
+    """
+    def __init__(self,
+                 journal_path: str = "data/paper_journal.jsonl",
+                 snapshot_path: str = "data/paper_account.json",
+                 starting_balance: float = 10000.0,
+                 fsync_interval: float = 0.05,
+                 batch_size: int = 1000,
+                 compact_every: int = 50_000):
+        self.journal_path = journal_path
+        self.snapshot_path = snapshot_path
+        self.starting_balance = starting_balance
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+        self.compact_every = compact_every
+
+        self.balance = starting_balance
+        self.realized_pnl = 0.0
+        self.positions: Dict[str, Dict[str, float]] = {}  # symbol -> {"quantity": signed, "avg_price": float}
+        self.seq = 0
+
+        self._lock = threading.Lock()
+        self._pending = []
+        self._last_sync = time.monotonic()
+        self._since_snapshot = 0
+        self._journal = None
+        self._task: Optional[asyncio.Task] = None
+
+        for path in (journal_path, snapshot_path):
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._recover()
+        self._journal = open(self.journal_path, "a")
+
+    # --- State transitions (shared by live updates and replay) ---
+
+    def _apply(self, event: Dict[str, Any]):
+        op = event["op"]
+        if op == "cash":
+            self.balance += event["amount"]
+        elif op == "fill":
+            self._apply_fill(event["symbol"], event["quantity"], event["price"], event.get("fee", 0.0))
+        self.seq = event["seq"]
+
+    def _apply_fill(self, symbol: str, quantity: float, price: float, fee: float):
+        """quantity is signed: + buys, - sells. Closing (part of) a position realizes PnL into the balance."""
+        pos = self.positions.get(symbol)
+        held = pos["quantity"] if pos else 0.0
+        realized = 0.0
+
+        if held and (held > 0) != (quantity > 0):
+            closed = min(abs(quantity), abs(held))
+            direction = 1.0 if held > 0 else -1.0
+            realized = (price - pos["avg_price"]) * closed * direction
+            remaining = held + quantity
+            if abs(remaining) < 1e-12:
+                del self.positions[symbol]
+            elif (remaining > 0) == (held > 0):
+                pos["quantity"] = remaining
+            else:
+                # Flipped: the leftover opens a new position at this price
+                self.positions[symbol] = {"quantity": remaining, "avg_price": price}
+        elif pos:
+            total = held + quantity
+            pos["avg_price"] = (pos["avg_price"] * held + price * quantity) / total
+            pos["quantity"] = total
+        else:
+            self.positions[symbol] = {"quantity": quantity, "avg_price": price}
+
+        self.realized_pnl += realized
+        self.balance += realized - fee
+
+    # --- Public API ---
+
+    def adjust(self, amount: float, reason: str = "") -> float:
+        """Add (or subtract) cash. Returns the new balance."""
+        self._record({"op": "cash", "amount": float(amount), "reason": reason})
+        return self.balance
+
+    def fill(self, symbol: str, side: str, quantity: float, price: float, fee: float = 0.0) -> float:
+        """Record a paper fill. Returns the PnL it realized."""
+        signed = abs(float(quantity)) if side.upper() in ("BUY", "LONG") else -abs(float(quantity))
+        before = self.realized_pnl
+        self._record({"op": "fill", "symbol": symbol, "quantity": signed, "price": float(price), "fee": float(fee)})
+        return self.realized_pnl - before
+
+    def position(self, symbol: str) -> Optional[Dict[str, float]]:
+        return self.positions.get(symbol)
+
+    def unrealized_pnl(self, prices: Dict[str, float]) -> float:
+        return sum(
+            (prices[s] - p["avg_price"]) * p["quantity"]
+            for s, p in self.positions.items() if s in prices
+        )
+
+    def _record(self, event: Dict[str, Any]):
+        with self._lock:
+            event["seq"] = self.seq + 1
+            event["ts"] = time.time()
+            self._apply(event)
+            self._pending.append(json.dumps(event, separators=(",", ":")))
+            self._since_snapshot += 1
+            if len(self._pending) >= self.batch_size or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+            if self._since_snapshot >= self.compact_every:
+                self._snapshot()
+
+    # --- Durability ---
+
+    def _sync(self):
+        if self._pending:
+            self._journal.write("\n".join(self._pending) + "\n")
+            self._pending.clear()
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+        self._last_sync = time.monotonic()
+
+    def flush(self):
+        """Force buffered events to disk (call on shutdown or from a periodic task)."""
+        with self._lock:
+            self._sync()
+
+    async def start(self):
+        """Background group commit, so a lone event isn't left in memory until the next one."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.fsync_interval)
+            if self._pending:
+                self.flush()
+
+    def _snapshot(self):
+        self._sync()
+        state = {
+            "seq": self.seq,
+            "balance": self.balance,
+            "realized_pnl": self.realized_pnl,
+            "positions": self.positions,
+        }
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        # Everything up to `seq` lives in the snapshot now
+        self._journal.truncate(0)
+        self._journal.seek(0)
+        self._since_snapshot = 0
+
+    def compact(self):
+        """Snapshot the current state and truncate the journal."""
+        with self._lock:
+            self._snapshot()
+
+    def close(self):
+        if self._journal is not None:
+            self.flush()
+            self._journal.close()
+            self._journal = None
+
+    def _recover(self):
+        try:
+            with open(self.snapshot_path, "r") as f:
+                state = json.load(f)
+            self.seq = state["seq"]
+            self.balance = state["balance"]
+            self.realized_pnl = state["realized_pnl"]
+            self.positions = state["positions"]
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError) as e:
+            logger.error(f"Paper account snapshot unreadable, replaying journal only: {e}")
+
+        replayed = 0
+        try:
+            with open(self.journal_path, "rb+") as f:
+                good = 0
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated line")
+                        event = json.loads(line)
+                    except ValueError:
+                        # Cut the torn tail so new entries don't land behind it
+                        logger.warning("Dropping torn paper journal entry (crash mid-write).")
+                        f.truncate(good)
+                        break
+                    good += len(line)
+                    if event["seq"] > self.seq:
+                        self._apply(event)
+                        replayed += 1
+        except FileNotFoundError:
+            pass
+        self._since_snapshot = replayed
+        if self.seq:
+            logger.info(f"📒 Paper account restored at seq {self.seq} ({replayed} journal events): balance {self.balance:.2f}")
@@ -0,0 +1,289 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from src.data.db_manager import db_manager
+from src.risk.risk_manager import risk_manager
+
+logger = logging.getLogger(__name__)
+
+class Position:
+    __slots__ = ("trade_id", "mode", "symbol", "direction", "entry_price", "quantity", "entry_time",
+                 "stop_loss", "take_profit", "trail_distance", "best_price", "last_price",
+                 "exit_price", "exit_time", "exit_reason", "profit_loss")
+
+    def __init__(self, trade_id, mode, symbol, direction, entry_price, quantity, entry_time,
+                 stop_loss, take_profit, trail_distance):
+        self.trade_id = trade_id
+        self.mode = mode
+        self.symbol = symbol
+        self.direction = direction          # 'BUY' (long) / 'SELL' (short)
+        self.entry_price = entry_price
+        self.quantity = quantity
+        self.entry_time = entry_time
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.trail_distance = trail_distance  # 0 = fixed stop
+        self.best_price = entry_price
+        self.last_price = entry_price
+        self.exit_price = None
+        self.exit_time = None
+        self.exit_reason = None
+        self.profit_loss = 0.0
+
+    @property
+    def side(self) -> float:
+        return 1.0 if self.direction == "BUY" else -1.0
+
+    def pnl_at(self, price: float) -> float:
+        return (price - self.entry_price) * self.quantity * self.side
+
+    @property
+    def unrealized(self) -> float:
+        return self.pnl_at(self.last_price)
+
+class PositionBook:
+    """
+    Open positions per (mode, symbol), marked to market on every price update.
+
+    `on_price` only touches the positions of that symbol, so each tick costs
+    O(open positions). It trails the stop, checks stop-loss / take-profit and
+    closes in the same call. Closes are queued and written to `trades` in
+    batches from a background task. `on_open` / `on_close` listeners (e.g. the
+    executor, for exit orders and the paper wallet, and the portfolio risk
+    engine) are called synchronously.
+    """
+    def __init__(self, take_profit_r: float = 2.0, trailing: bool = True,
+                 flush_interval: float = 1.0, batch_size: int = 500):
+        self.take_profit_r = take_profit_r  # Take profit at this multiple of the initial risk
+        self.trailing = trailing
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.positions: Dict[Tuple[str, str], Position] = {}
+        self._by_symbol: Dict[str, List[Position]] = {}
+        self._pending: List[Position] = []
+        self._listeners: List[Callable[[Position], None]] = []
+        self._open_listeners: List[Callable[[Position], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self.closed = 0
+        self.realized_pnl = 0.0
+
+    def __len__(self):
+        return len(self.positions)
+
+    def get(self, mode: str, symbol: str) -> Optional[Position]:
+        return self.positions.get((mode, symbol))
+
+    def symbols(self) -> set:
+        return set(self._by_symbol)
+
+    def on_close(self, callback: Callable[[Position], None]):
+        self._listeners.append(callback)
+        return callback
+
+    def on_open(self, callback: Callable[[Position], None]):
+        self._open_listeners.append(callback)
+        return callback
+
+    def _build(self, symbol: str, direction: str, entry_price: float, quantity: float, atr: float,
+               mode: str, entry_time=None, trade_id: Optional[int] = None) -> Position:
+        stop = risk_manager.get_stop_loss_price(entry_price, direction, atr, symbol)
+        risk = abs(entry_price - stop)
+        side = 1.0 if direction == "BUY" else -1.0
+        return Position(
+            trade_id, mode, symbol, direction, entry_price, quantity,
+            entry_time or datetime.now(timezone.utc),
+            stop_loss=stop,
+            take_profit=entry_price + side * risk * self.take_profit_r,
+            trail_distance=risk if self.trailing else 0.0,
+        )
+
+    def _track(self, position: Position):
+        self.positions[(position.mode, position.symbol)] = position
+        self._by_symbol.setdefault(position.symbol, []).append(position)
+
+    def open(self, symbol: str, direction: str, entry_price: float, quantity: float, atr: float,
+             mode: str, entry_time=None, trade_id: Optional[int] = None) -> Position:
+        position = self._build(symbol, direction, entry_price, quantity, atr, mode, entry_time, trade_id)
+        previous = self.positions.get((mode, symbol))
+        if previous is not None:
+            self.close(previous, entry_price, position.entry_time, "REPLACED")
+        self._track(position)
+        self._notify(self._open_listeners, position, "open")
+        return position
+
+    async def restore(self, modes=("PAPER", "LIVE")) -> List[Position]:
+        """
+        Reopen the trades still OPEN in the database (after a restart), with
+        stops and targets recomputed from the entry and its ATR. Trades stored
+        before the ATR was recorded get the scanner's rough 2% guess.
+
+        Only the newest row per (mode, symbol) is kept; older ones were
+        superseded long ago and are closed in the database at their entry
+        (PnL 0) without sending orders. No listeners are notified: nothing
+        was opened or closed on the exchange, so callers register the
+        returned positions with whatever tracks exposure.
+        """
+        latest: Dict[Tuple[str, str], dict] = {}
+        stale = []
+        for row in await db_manager.get_open_trades(list(modes)):  # Oldest first
+            previous = latest.get((row["mode"], row["symbol"]))
+            if previous is not None:
+                stale.append(previous)
+            latest[(row["mode"], row["symbol"])] = row
+
+        if stale:
+            now = datetime.now(timezone.utc)
+            await db_manager.close_trades([(row["id"], float(row["entry_price"]), now, 0.0) for row in stale])
+            logger.warning(f"🧹 Closed {len(stale)} stale OPEN trades superseded by newer entries")
+
+        restored = []
+        for row in latest.values():
+            entry_price = float(row["entry_price"])
+            atr = row.get("atr") or entry_price * 0.02
+            position = self._build(row["symbol"], row["direction"], entry_price, float(row["quantity"]),
+                                   float(atr), row["mode"], row["entry_time"], trade_id=row["id"])
+            self._track(position)
+            restored.append(position)
+        if restored:
+            logger.info(f"📂 Restored {len(restored)} open positions: {sorted(p.symbol for p in restored)}")
+        return restored
+
+    def on_price(self, symbol: str, price: float, timestamp=None,
+                 high: Optional[float] = None, low: Optional[float] = None) -> List[Position]:
+        """
+        Mark `symbol` to `price`; high/low let a candle test the levels it traded through.
+        If a candle touches both stop and target, the stop is assumed to have hit first.
+        Returns the positions this update closed.
+        """
+        positions = self._by_symbol.get(symbol)
+        if not positions:
+            return []
+        high = price if high is None else high
+        low = price if low is None else low
+
+        is_tick = high == low
+        closed = []
+        for p in list(positions):
+            p.last_price = price
+            if p.direction == "BUY":
+                if low <= p.stop_loss:
+                    # A tick fills where it printed (gaps included); a candle fills at the level
+                    exit_price, reason = (min(p.stop_loss, price) if is_tick else p.stop_loss), "STOP_LOSS"
+                elif high >= p.take_profit:
+                    exit_price, reason = p.take_profit, "TAKE_PROFIT"
+                else:
+                    if p.trail_distance and high > p.best_price:
+                        p.best_price = high
+                        p.stop_loss = max(p.stop_loss, high - p.trail_distance)
+                    continue
+            else:
+                if high >= p.stop_loss:
+                    exit_price, reason = (max(p.stop_loss, price) if is_tick else p.stop_loss), "STOP_LOSS"
+                elif low <= p.take_profit:
+                    exit_price, reason = p.take_profit, "TAKE_PROFIT"
+                else:
+                    if p.trail_distance and low < p.best_price:
+                        p.best_price = low
+                        p.stop_loss = min(p.stop_loss, low + p.trail_distance)
+                    continue
+            if reason == "STOP_LOSS" and p.pnl_at(exit_price) > 0:
+                reason = "TRAILING_STOP"
+            closed.append(self.close(p, exit_price, timestamp, reason))
+        return closed
+
+    async def on_ticker(self, data: dict):
+        """WebSocket `v2/ticker` callback."""
+        price = data.get("mark_price") or data.get("close")
+        symbol = data.get("symbol")
+        if symbol and price is not None:
+            self.on_price(symbol, float(price), datetime.now(timezone.utc))
+
+    def close(self, position: Position, price: float, timestamp=None, reason: str = "MANUAL") -> Position:
+        position.exit_price = price
+        position.exit_time = timestamp or datetime.now(timezone.utc)
+        position.exit_reason = reason
+        position.last_price = price
+        position.profit_loss = position.pnl_at(price)
+
+        self.positions.pop((position.mode, position.symbol), None)
+        siblings = self._by_symbol.get(position.symbol, [])
+        if position in siblings:
+            siblings.remove(position)
+        if not siblings:
+            self._by_symbol.pop(position.symbol, None)
+
+        self.closed += 1
+        self.realized_pnl += position.profit_loss
+        if position.trade_id is not None:
+            self._pending.append(position)
+        logger.info(f"🔒 {position.mode} {position.symbol} {position.direction} closed ({reason}) "
+                    f"@ {price:.4f} | PnL {position.profit_loss:+.2f}")
+        self._notify(self._listeners, position, "close")
+        return position
+
+    @staticmethod
+    def _notify(listeners: List[Callable[[Position], None]], position: Position, event: str):
+        for callback in listeners:
+            try:
+                callback(position)
+            except Exception as e:
+                logger.error(f"Position {event} listener failed: {e}")
+
+    def close_all(self, prices: Dict[str, float], timestamp=None, reason: str = "END_OF_DATA") -> List[Position]:
+        return [
+            self.close(p, prices[p.symbol], timestamp, reason)
+            for p in list(self.positions.values()) if p.symbol in prices
+        ]
+
+    def unrealized_pnl(self) -> float:
+        return sum(p.unrealized for p in self.positions.values())
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._pending:
+            if not await self.flush():
+                break
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            while self._pending:
+                if not await self.flush():
+                    break
+
+    async def flush(self) -> int:
+        """Persist up to `batch_size` closes. Returns the number written."""
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+        records = [(p.trade_id, p.exit_price, p.exit_time, p.profit_loss) for p in batch]
+        try:
+            await db_manager.close_trades(records)
+        except Exception as e:
+            # Put them back; they are retried on the next flush
+            self._pending[:0] = batch
+            logger.error(f"Persisting {len(records)} closed trades failed: {e}")
+            return 0
+        return len(records)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "open": len(self.positions),
+            "closed": self.closed,
+            "pending_writes": len(self._pending),
+            "realized_pnl": round(self.realized_pnl, 2),
+            "unrealized_pnl": round(self.unrealized_pnl(), 2),
+        }
+
+position_book = PositionBook()
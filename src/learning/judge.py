@@ -1,73 +1,98 @@
 import json
 import logging
 import asyncio
-from typing import Dict
-from datetime import datetime, timedelta
+import numpy as np
+from typing import Dict, List
 from src.data.db_manager import db_manager
 import os
 
 logger = logging.getLogger("Judge")
 
 class TheJudge:
-    def __init__(self, weights_path="src/config/agent_weights.json"):
+    def __init__(self, weights_path="src/config/agent_weights.json", state_path="src/config/judge_state.json"):
         self.weights_path = weights_path
+        self.state_path = state_path
         self.default_weight = 1.0
         self.learning_rate = 0.1  # How fast we adapt (0.1 = 10% change per review)
+        self.batch_size = 500     # Trades pulled per query
+        self.excluded_agents = {"MainBrain"}  # The decision itself is not a juror
         os.makedirs(os.path.dirname(self.weights_path), exist_ok=True)
 
-    async def review_performance(self):
+    async def review_performance(self) -> int:
         """
-        The 'Nightly Review':
-        1. Fetch all trades closed in the last 24h.
-        2. Fetch what each agent 'voted' for those specific timestamps.
-        3. Reward the agents who voted correctly.
-        4. Punish the agents who voted incorrectly.
+        The incremental review:
+        1. Pull only trades closed since the last reviewed one (watermark: the
+           trades.closed_seq close order, since backtests close at historical times).
+        2. Get each trade's agent votes in the same query (trades JOIN agent_signals).
+        3. Reward / punish every agent in one array update.
+        Returns the number of newly reviewed trades.
         """
         logger.info("👨‍⚖️ The Judge is entering the courtroom...")
-        
-        # 1. Get recent closed trades
-        trades = await db_manager.get_recent_trades(limit=50)
-        if not trades:
-            logger.info("No trades to review. Court adjourned.")
-            return
-
-        # Load current weights
-        current_weights = self.load_weights()
-
-        for trade in trades:
-            outcome = trade['profit_loss']  # Positive or Negative
-            entry_time = trade['entry_time']
-            
-            # 2. Get the specific "Brain Scan" at the moment of entry
-            agent_votes = await db_manager.get_agent_signals_at_time(entry_time)
-            
-            for agent_name, signal in agent_votes.items():
-                if agent_name not in current_weights:
-                    current_weights[agent_name] = self.default_weight
-
-                # Logic: Did the agent agree with the winning trade?
-                
-                # CASE A: Trade WON
-                if outcome > 0:
-                    if signal == trade['direction']: # Agent said BUY and we WON
-                        current_weights[agent_name] += self.learning_rate
-                    elif signal != "NEUTRAL": # Agent said SELL but we WON (Wrong!)
-                        current_weights[agent_name] -= self.learning_rate
-
-                # CASE B: Trade LOST
-                elif outcome < 0:
-                    if signal == trade['direction']: # Agent said BUY and we LOST (Wrong!)
-                        current_weights[agent_name] -= self.learning_rate
-                    elif signal != "NEUTRAL": # Agent said SELL (saved us, technically)
-                        current_weights[agent_name] += (self.learning_rate * 0.5)
-
-        # Normalize weights (keep them between 0.1 and 2.0)
-        for agent in current_weights:
-            current_weights[agent] = max(0.1, min(current_weights[agent], 2.0))
-
-        # 3. Save the new "Brain Configuration"
+
+        last_seq = self.load_state()
+        reviewed = 0
+        current_weights = None
+
+        while True:
+            rows = await db_manager.get_closed_trade_votes(last_seq, limit=self.batch_size)
+            if not rows:
+                break
+
+            if current_weights is None:
+                current_weights = self.load_weights()
+            current_weights = self.apply_verdicts(current_weights, rows)
+
+            trade_ids = {r['id'] for r in rows}
+            reviewed += len(trade_ids)
+            last_seq = rows[-1]['closed_seq']
+            if len(trade_ids) < self.batch_size:
+                break
+
+        if not reviewed:
+            logger.info("No new trades to review. Court adjourned.")
+            return 0
+
+        # 3. Save the new "Brain Configuration" and move the watermark
         self.save_weights(current_weights)
-        logger.info("⚖️ Verdict delivered. Agent weights updated.")
+        self.save_state(last_seq)
+        logger.info(f"⚖️ Verdict delivered on {reviewed} trades. Agent weights updated.")
+        return reviewed
+
+    def apply_verdicts(self, weights: Dict[str, float], rows: List[dict]) -> Dict[str, float]:
+        """
+        Vectorized weight update over (trade, agent, vote) rows.
+        - Trade WON:  agreeing agents +lr, opposing agents -lr
+        - Trade LOST: agreeing agents -lr, opposing agents +lr/2 (they saved us, technically)
+        NEUTRAL (or non-directional) votes are left alone. Weights stay within [0.1, 2.0].
+        """
+        rows = [r for r in rows if r.get('agent_name') and r['agent_name'] not in self.excluded_agents]
+        if not rows:
+            return weights
+
+        names = np.array([r['agent_name'] for r in rows])
+        votes = np.array([r['signal'] for r in rows])
+        direction = np.array([r['direction'] for r in rows])
+        outcome = np.sign(np.array([r['profit_loss'] or 0.0 for r in rows], dtype=float))
+
+        agree = votes == direction
+        opposed = ~agree & np.isin(votes, ["BUY", "SELL"])
+        won, lost = outcome > 0, outcome < 0
+
+        lr = self.learning_rate
+        delta = np.select(
+            [won & agree, won & opposed, lost & agree, lost & opposed],
+            [lr, -lr, -lr, lr * 0.5],
+            default=0.0
+        )
+
+        agents, index = np.unique(names, return_inverse=True)
+        totals = np.bincount(index, weights=delta, minlength=len(agents))
+        current = np.array([weights.get(a, self.default_weight) for a in agents])
+        updated = np.clip(current + totals, 0.1, 2.0)
+
+        new_weights = dict(weights)
+        new_weights.update(zip(agents.tolist(), updated.tolist()))
+        return new_weights
 
     def load_weights(self) -> Dict[str, float]:
         try:
@@ -80,6 +105,18 @@ class TheJudge:
         with open(self.weights_path, 'w') as f:
             json.dump(weights, f, indent=4)
 
+    def load_state(self) -> int:
+        """The closed_seq of the last reviewed trade (0 = nothing reviewed yet)."""
+        try:
+            with open(self.state_path, 'r') as f:
+                return int(json.load(f)['last_closed_seq'])
+        except (FileNotFoundError, KeyError, TypeError, ValueError):
+            return 0
+
+    def save_state(self, last_seq: int):
+        with open(self.state_path, 'w') as f:
+            json.dump({"last_closed_seq": last_seq}, f, indent=4)
+
 # Usage
 if __name__ == "__main__":
     judge = TheJudge()
@@ -7,8 +7,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import asyncio
 import logging
 import pandas as pd
-import pkgutil
-import importlib
+import numpy as np
 import time
 from datetime import datetime, timezone, timedelta
 from typing import List
@@ -22,36 +21,112 @@ logging.basicConfig(
 logger = logging.getLogger("JarvisCore")
 
 from src.data.delta_client import delta_client
-from src.agents.base_agent import Signal
+from src.data.groq_client import groq_client, LLMPriority
+from src.agents.base_agent import CompactSignal, SignalMatrix
 from src.agents.main_brain import MainBrain
+from src.agents.registry import agent_registry
+from src.data.panel import MarketPanel, candles_frame
+from src.risk.stop_optimizer import rolling_atr
+from src.risk.portfolio_risk import portfolio_risk
+from src.data.correlation import correlation_service
 from src.execution.executor import executor
+from src.execution.position_book import position_book
+from src.execution.balance_manager import balance_manager
+from src.data.websocket_client import ws_client
 from src.learning.judge import TheJudge
 from src.data.db_manager import db_manager
+from src.data.signal_writer import signal_writer
+from src.data.news_feed import news_feed
+from src.config.runtime import runtime_config
 from src.config.settings import settings
+from src.monitoring.live_state import live_state, StateServer
+from src.monitoring.metrics import metrics, AGENT_ERRORS, AGENT_SECONDS, CYCLE_SECONDS, QUEUE_DEPTH
 
 class JarvisEngine:
     def __init__(self):
         self.running = False
         self.main_brain = MainBrain()
         self.judge = TheJudge()
-        self.agents = self.load_all_agents()
-        self.mode = settings.TRADING_MODE.upper() # BACKTEST, PAPER, LIVE
-
-    def load_all_agents(self):
-        agents = []
-        package_path = "src/agents"
-        for _, name, _ in pkgutil.iter_modules([package_path]):
-            if name in ["base_agent", "main_brain"]: continue
+        self.registry = agent_registry
+        self.last_backtest_signals = None
+        self.stops_fitted_at = 0.0
+        self.candles_stored_until = {}  # symbol -> open time (epoch s) of the last stored closed candle
+        self.main_brain.gate.update_weights(self.judge.load_weights())
+        self.mode = None # BACKTEST, PAPER, LIVE (from the runtime config)
+        self._decision_deadline = self.main_brain.decision_deadline
+        runtime_config.subscribe(self.apply_config)
+        # Live view for the dashboard: positions are pushed as they open and close
+        self.state_server = StateServer(live_state, settings.STATE_STREAM_HOST, settings.STATE_STREAM_PORT) \
+            if settings.STATE_STREAM_PORT else None
+        position_book.on_open(live_state.record_position)
+        position_book.on_close(live_state.record_position)
+        if self.state_server:
+            self.state_server.route("/metrics", metrics.handle)
+        # Queue depths are read when metrics are collected, not on every change
+        QUEUE_DEPTH["signal_writer"].set_function(lambda: len(signal_writer))
+        QUEUE_DEPTH["llm"].set_function(groq_client.pool.waiting)
+        QUEUE_DEPTH["state_stream"].set_function(lambda: live_state.stats()["subscribers"])
+
+    def apply_config(self, snapshot, old=None):
+        """
+        Runtime config subscriber. PAPER <-> LIVE switches take effect on the next
+        scan; switching into or out of BACKTEST needs a restart (different loop).
+        """
+        mode = snapshot.trading_mode
+        if self.running and mode != self.mode and "BACKTEST" in (mode, self.mode):
+            logger.warning(f"⚠️ Mode change {self.mode} -> {mode} needs a restart. Staying in {self.mode}.")
+            return
+        if self.mode is not None and mode != self.mode:
+            logger.warning(f"🔁 Engine switching {self.mode} -> {mode}")
+        self.mode = mode
+        # Live decisions jump the Groq queue; backtests wait behind everything else
+        self.main_brain.priority = LLMPriority.for_mode(mode)
+        self.main_brain.decision_deadline = None if mode == "BACKTEST" else self._decision_deadline
+
+    # Data the loops hand to agents; agents that need anything else are skipped
+    AVAILABLE_DATA = ("ohlc", "news")
+
+    @property
+    def agents(self):
+        """Enabled agents, imported on first use (placeholders stay unloaded); the list is cached by the registry."""
+        return self.registry.active(self.AVAILABLE_DATA)
+
+    @property
+    def stop_optimizer(self):
+        return next((a for a in self.agents if a.name == "StopLossOptimizerAgent"), None)
+
+    async def store_closed_candles(self, frames):
+        """
+        Persist the scanner's closed candles (the last row is still forming) that
+        are newer than the ones already stored; the stop optimizer fits on them.
+        """
+        cols = list(MarketPanel.FIELDS)
+        for symbol, df in frames.items():
+            if 'time' not in df.columns or len(df) < 2:
+                continue
+            closed = df.iloc[:-1]
+            closed = closed[closed['time'] > self.candles_stored_until.get(symbol, -1)]
+            if closed.empty:
+                continue
+            candles = closed.assign(timestamp=pd.to_datetime(closed['time'], unit='s', utc=True))
             try:
-                module = importlib.import_module(f"src.agents.{name}")
-                for attr_name in dir(module):
-                    attr = getattr(module, attr_name)
-                    if isinstance(attr, type) and attr_name.endswith("Agent") and attr_name != "BaseAgent":
-                        agents.append(attr())
-                        logger.info(f"✅ Loaded Agent: {attr_name}")
+                await db_manager.store_ohlc(symbol, candles[['timestamp', *cols]].to_dict('records'))
             except Exception as e:
-                logger.error(f"❌ Failed to load {name}: {e}")
-        return agents
+                logger.warning(f"Storing {symbol} candles failed: {e}")  # Retried with the next scan
+                continue
+            self.candles_stored_until[symbol] = int(closed['time'].iloc[-1])
+
+    @staticmethod
+    async def _timed(agent, symbol: str, coro):
+        """Await one agent call, recording its latency (symbol '*' for a whole-universe batch)."""
+        if not metrics.enabled:
+            return await coro
+        with AGENT_SECONDS.time(agent.name, symbol):
+            try:
+                return await coro
+            except Exception:
+                AGENT_ERRORS.labels(agent.name).inc()
+                raise
 
     async def run_backtest(self, symbol="BTCUSD", days=30):
         """Mode 1: Paper Trade on Historical Data"""
@@ -66,11 +141,16 @@ class JarvisEngine:
             logger.error("No historical data found.")
             return
 
-        df = pd.DataFrame(response['result'])
-        cols = ['open', 'high', 'low', 'close', 'volume']
-        for c in cols: df[c] = pd.to_numeric(df[c])
-        df['time'] = pd.to_datetime(df['time'], unit='s')
-        df = df.sort_values('time')
+        df = candles_frame(response['result'])
+        cols = list(MarketPanel.FIELDS)
+        df['time'] = pd.to_datetime(df['time'], unit='s', utc=True)
+        # Keep the candles: the stop optimizer fits on stored OHLC
+        await db_manager.store_ohlc(symbol, df.assign(timestamp=df['time'])[['timestamp', *cols]].to_dict('records'))
+        atr = rolling_atr(df['high'].to_numpy(float), df['low'].to_numpy(float), df['close'].to_numpy(float))
+
+        # Every agent's vote per candle, kept as compact arrays (agent x candle)
+        agents = self.agents
+        matrix = SignalMatrix([agent.name for agent in agents], len(df), symbol=symbol)
 
         # 2. Simulate Candle by Candle
         for i in range(50, len(df)):
@@ -81,13 +161,22 @@ class JarvisEngine:
             timestamp = current_candle['time']
 
             logger.info(f"⏳ Replaying {timestamp} | Price: {current_price}")
+            live_state.set_status(phase="backtest", symbol=symbol, progress=f"{i + 1}/{len(df)}", candle=timestamp)
+
+            # Mark open positions against this candle's range (stops / targets / trailing)
+            position_book.on_price(symbol, current_price, timestamp,
+                                   high=float(current_candle['high']), low=float(current_candle['low']))
 
             # Run Agents
-            agent_tasks = [agent.analyze(symbol, current_window) for agent in self.agents]
+            agent_tasks = [self._timed(agent, symbol, agent.analyze(symbol, current_window)) for agent in agents]
             signals = await asyncio.gather(*agent_tasks)
+            matrix.record(i, signals, timestamp)
 
             # Brain Decision
             decision = await self.main_brain.analyze(symbol, signals)
+            signal_writer.record([*signals, decision], timestamp)
+            live_state.record_signals(symbol, signals)
+            live_state.record_decision(decision, timestamp)
 
             # Execute (In Backtest Mode, Executor just logs DB)
             if decision.confidence > 0.75 and decision.action in ["BUY", "SELL"]:
@@ -96,42 +185,90 @@ class JarvisEngine:
                     action=decision.action,
                     confidence=decision.confidence,
                     current_price=current_price,
-                    atr=current_price * 0.02,
+                    atr=float(atr[i]),
                     mode="BACKTEST",
                     timestamp=timestamp
                 )
 
+        # Flatten whatever is still open so every backtest trade has a result
+        last = df.iloc[-1]
+        position_book.close_all({symbol: float(last['close'])}, last['time'])
+
+        self.last_backtest_signals = matrix
+        for agent_name, counts in matrix.action_counts().items():
+            logger.info(f"📊 {agent_name}: {counts}")
         logger.info("🏁 Backtest Complete. Check Dashboard for Results.")
 
     async def run_live_scanner(self):
         """Mode 2 & 3: Paper/Live Trading on Real Data"""
         logger.info(f"📡 STARTING {self.mode} SCANNER...")
-        
+
+        # Ticks drive the position book's exits between scans
+        ws_client.on_message("v2/ticker", position_book.on_ticker)
+        await ws_client.connect()
+        ticker_symbols = set()
+
         while self.running:
             try:
                 # 1. Get Active Ocean (Top Volume coins)
                 # Note: We filter for 'perpetual_futures' to ensure liquidity
+                cycle_start = time.perf_counter()
+                live_state.set_status(phase="fetching", mode=self.mode)
                 products = delta_client.get_products().get('result', [])
                 opportunities = [p['symbol'] for p in products if p['contract_type'] == 'perpetual_futures'][:10] # Scan Top 10 for speed
                 
                 logger.info(f"🌊 Scanning Ocean: {len(opportunities)} Assets")
 
+                # Fetch Live Data
+                frames = {}
                 for symbol in opportunities:
-                    # Fetch Live Data
                     history = delta_client.get_history(symbol, "1h", limit=50)
                     if not history or 'result' not in history: continue
-                    
-                    df = pd.DataFrame(history['result'])
-                    cols = ['open', 'high', 'low', 'close', 'volume']
-                    for c in cols: df[c] = pd.to_numeric(df[c])
-                    
-                    current_price = float(df['close'].iloc[-1])
-
-                    # Analyze
-                    agent_tasks = [agent.analyze(symbol, df) for agent in self.agents]
-                    signals = await asyncio.gather(*agent_tasks)
-                    
-                    decision = await self.main_brain.analyze(symbol, signals)
+
+                    frames[symbol] = candles_frame(history['result'])
+
+                if not frames:
+                    await asyncio.sleep(5)
+                    continue
+                await self.store_closed_candles(frames)
+
+                # Analyze: every agent sees the whole universe in one call
+                timings = {"fetch": time.perf_counter() - cycle_start}
+                live_state.set_status(phase="analyzing", symbols=len(frames))
+                cycle_time = datetime.now(timezone.utc)
+                panel = MarketPanel.from_frames(frames)
+                symbols = panel.symbols
+                news_feed.watch(symbols)
+                correlation_service.update_panel(panel)  # New closed bars only; agents and risk read from it
+                agents = self.agents
+                agent_tasks = [self._timed(agent, "*", agent.analyze_batch(symbols, panel)) for agent in agents]
+                batches = await asyncio.gather(*agent_tasks, return_exceptions=True)
+                for j, batch in enumerate(batches):
+                    if isinstance(batch, Exception):
+                        logger.error(f"❌ {agents[j].name} batch failed: {batch}")
+                        batches[j] = [CompactSignal(agent_name=agents[j].name, symbol=s, action="NEUTRAL", confidence=0.0) for s in symbols]
+
+                timings["agents"] = time.perf_counter() - cycle_start - sum(timings.values())
+                atrs = panel.atr()
+                # Refresh the portfolio risk model (marks, vols, correlations) once per scan
+                portfolio_risk.mark_many(symbols, panel.close[:, -1])
+                portfolio_risk.set_risk_model(symbols, *correlation_service.risk_model(symbols))
+
+                # Decide: consensus first, then one LLM prompt per chunk of conflicting symbols
+                universe = {symbol: [batch[i] for batch in batches] for i, symbol in enumerate(symbols)}
+                live_state.set_status(phase="deciding")
+                decisions = await self.main_brain.analyze_many(universe)
+                timings["decide"] = time.perf_counter() - cycle_start - sum(timings.values())
+
+                for i, symbol in enumerate(symbols):
+                    signals = universe[symbol]
+                    current_price = float(panel.close[i, -1])
+                    position_book.on_price(symbol, current_price, cycle_time)  # Fallback if ticks are missing
+
+                    decision = decisions[symbol]
+                    signal_writer.record([*signals, decision], cycle_time)
+                    live_state.record_signals(symbol, signals)
+                    live_state.record_decision(decision, cycle_time)
 
                     # Execute
                     if decision.confidence > 0.8 and decision.action in ["BUY", "SELL"]:
@@ -141,15 +278,43 @@ class JarvisEngine:
                             action=decision.action,
                             confidence=decision.confidence,
                             current_price=current_price,
-                            atr=current_price * 0.02,
-                            mode=self.mode
+                            atr=float(atrs[i]) if np.isfinite(atrs[i]) else current_price * 0.02,  # Too little history: rough guess
+                            mode=self.mode,
+                            timestamp=cycle_time
                         )
-                    
-                    # Rate Limit Protection
-                    await asyncio.sleep(1) 
+
+                timings["execute"] = time.perf_counter() - cycle_start - sum(timings.values())
+                timings["total"] = time.perf_counter() - cycle_start
+                live_state.record_timings(timings)
+                for phase, seconds in timings.items():
+                    CYCLE_SECONDS.labels(phase).observe(seconds)
+                for position in list(position_book.positions.values()):
+                    live_state.record_position(position)  # Trailed stops and marks
+                live_state.set_status(phase="maintenance", cycle=live_state.state["status"]["cycle"] + 1)
+
+                logger.info(f"🧮 Consensus Gate: {self.main_brain.gate.stats()}")
+                logger.info(f"🧠 LLM Usage: {self.main_brain.usage_stats()} | Latency: {groq_client.latency_stats()}")
+                logger.info(f"⏳ LLM Queue Wait: {groq_client.queue_stats()}")
+                logger.info(f"🔀 LLM Models: {groq_client.model_stats()}")
+                logger.info(f"📰 News Feed: {news_feed.stats()}")
+                logger.info(f"📒 Positions: {position_book.stats()}")
+                logger.info(f"🛡️ Portfolio Risk: {portfolio_risk.stats(self.mode)}")
+                logger.info(f"🔗 Correlation: {correlation_service.stats()}")
+
+                # Stream ticks for newly opened positions
+                new_symbols = position_book.symbols() - ticker_symbols
+                if new_symbols and ws_client.running:
+                    await ws_client.subscribe("v2/ticker", sorted(new_symbols))
+                    ticker_symbols |= new_symbols
 
                 # Run The Judge (Self-Improvement)
-                await self.judge.review_performance()
+                if await self.judge.review_performance():
+                    self.main_brain.gate.update_weights(self.judge.load_weights())
+
+                # Re-fit the stop table once a day
+                if self.stop_optimizer and time.time() - self.stops_fitted_at > 86400:
+                    self.stops_fitted_at = time.time()
+                    await self.stop_optimizer.optimize(symbols)
                 
             except Exception as e:
                 logger.error(f"Scanner Loop Error: {e}")
@@ -158,11 +323,39 @@ class JarvisEngine:
     async def start(self):
         self.running = True
         await db_manager.connect()
-        
-        if self.mode == "BACKTEST":
-            await self.run_backtest()
-        else:
-            await self.run_live_scanner()
+        await signal_writer.start()
+        await runtime_config.start()
+        await position_book.start()
+        if self.state_server:
+            await self.state_server.start()
+        live_state.set_status(mode=self.mode, phase="starting")
+        self.registry.active(self.AVAILABLE_DATA)  # Import the enabled agents once, up front
+        self.registry.report()
+        await metrics.start()
+
+        try:
+            if self.mode == "BACKTEST":
+                await self.run_backtest()
+            else:
+                await news_feed.start()
+                await balance_manager.paper.start()
+                # Before the loops: exits of open trades keep firing, and their exposure counts
+                for position in await position_book.restore():
+                    portfolio_risk.on_open(position)
+                await self.run_live_scanner()
+        finally:
+            await runtime_config.stop()
+            await news_feed.stop()
+            await ws_client.disconnect()
+            await position_book.stop()
+            if self.mode != "BACKTEST":
+                await balance_manager.paper.stop()
+            await signal_writer.stop()
+            live_state.set_status(phase="stopped")
+            await metrics.stop()
+            metrics.log_summary()
+            if self.state_server:
+                await self.state_server.stop()
 
 if __name__ == "__main__":
     # Auto-launch UI
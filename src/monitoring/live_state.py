@@ -0,0 +1,271 @@
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def _json_safe(value: Any) -> Any:
+    """NaN/Infinity aren't JSON; numpy scalars and timestamps become plain values."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {str(k): _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    if hasattr(value, "item"):  # numpy scalar
+        return _json_safe(value.item())
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+def apply_patch(state: Dict[str, Any], patch: Dict[str, Any]):
+    """
+    Apply one state change. Shared by the engine (to update its state) and by
+    stream clients (to mirror it), so both sides agree on what a patch means.
+    patch: {"section", "op": set | delete | append | replace, "key"?, "value"?, "limit"?}
+    """
+    section, op = patch["section"], patch.get("op", "set")
+    if op == "replace":
+        state[section] = patch["value"]
+    elif op == "append":
+        items = state.setdefault(section, [])
+        items.append(patch["value"])
+        del items[:-patch.get("limit", 100)]
+    elif op == "delete":
+        state.setdefault(section, {}).pop(patch["key"], None)
+    else:
+        state.setdefault(section, {})[patch["key"]] = patch["value"]
+
+class _Subscriber:
+    __slots__ = ("queue", "wakeup", "overflow")
+
+    def __init__(self, max_queue: int):
+        self.queue = deque(maxlen=max_queue)
+        self.wakeup = asyncio.Event()
+        self.overflow = False
+
+class LiveState:
+    """
+    What the engine is doing right now, kept in memory for the dashboard:
+    scanner status, latest signals per symbol, decisions, open positions and
+    cycle timings.
+
+    Every change is a small patch that is applied to `state` and pushed to the
+    subscribers (SSE clients) without blocking. Each subscriber has a bounded
+    queue; one that falls behind is sent a full snapshot instead of the
+    backlog. Nothing here touches the database.
+    """
+    def __init__(self, max_decisions: int = 100, max_queue: int = 1000):
+        self.max_decisions = max_decisions
+        self.max_queue = max_queue
+        self.state: Dict[str, Any] = {
+            "status": {"phase": "idle", "mode": None, "cycle": 0, "updated_at": time.time()},
+            "signals": {},
+            "decisions": {},
+            "recent_decisions": [],
+            "positions": {},
+            "timings": {},
+        }
+        self.version = 0
+        self._subscribers = set()
+        self._snapshot: Tuple[int, bytes] = (-1, b"")
+
+    # --- Publishing ---
+
+    def publish(self, patch: Dict[str, Any]):
+        patch = _json_safe(patch)
+        apply_patch(self.state, patch)
+        self.version += 1
+        for sub in self._subscribers:
+            if len(sub.queue) == sub.queue.maxlen:
+                sub.overflow = True
+            sub.queue.append(patch)
+            sub.wakeup.set()
+
+    def set_status(self, **fields):
+        status = {**self.state["status"], **fields, "updated_at": time.time()}
+        self.publish({"section": "status", "op": "replace", "value": status})
+
+    def record_signals(self, symbol: str, signals: Iterable[Any]):
+        """Latest vote of every agent for `symbol`, as {agent: [action, confidence]}."""
+        votes = {
+            s.agent_name: [s.action if isinstance(s.action, str) else s.action.name, round(float(s.confidence), 3)]
+            for s in signals
+        }
+        self.publish({"section": "signals", "key": symbol, "value": votes})
+
+    def record_decision(self, decision: Any, timestamp=None):
+        metadata = decision.metadata or {}
+        value = {
+            "symbol": decision.symbol,
+            "action": decision.action,
+            "confidence": round(float(decision.confidence), 3),
+            "reasoning": str(metadata.get("reasoning", ""))[:280],
+            "model": metadata.get("model"),
+            "timestamp": timestamp or time.time(),
+        }
+        self.publish({"section": "decisions", "key": decision.symbol, "value": value})
+        self.publish({"section": "recent_decisions", "op": "append", "value": value, "limit": self.max_decisions})
+
+    def record_position(self, position: Any):
+        """PositionBook open/close listener."""
+        key = f"{position.mode}:{position.symbol}"
+        if position.exit_time is not None:
+            self.publish({"section": "positions", "op": "delete", "key": key})
+            return
+        self.publish({"section": "positions", "key": key, "value": {
+            "mode": position.mode,
+            "symbol": position.symbol,
+            "direction": position.direction,
+            "quantity": position.quantity,
+            "entry_price": position.entry_price,
+            "last_price": position.last_price,
+            "stop_loss": position.stop_loss,
+            "take_profit": position.take_profit,
+            "unrealized": position.unrealized,
+        }})
+
+    def record_timings(self, timings: Dict[str, float]):
+        """Seconds spent in each phase of the last cycle."""
+        self.publish({"section": "timings", "op": "replace", "value": {k: round(v, 4) for k, v in timings.items()}})
+
+    # --- Reading ---
+
+    def snapshot_json(self) -> bytes:
+        """The whole state, serialized once per version however many clients ask."""
+        version, body = self._snapshot
+        if version != self.version:
+            body = json.dumps(self.state, separators=(",", ":")).encode()
+            self._snapshot = (self.version, body)
+        return body
+
+    def subscribe(self) -> _Subscriber:
+        sub = _Subscriber(self.max_queue)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: _Subscriber):
+        self._subscribers.discard(sub)
+
+    def stats(self) -> Dict[str, int]:
+        return {"version": self.version, "subscribers": len(self._subscribers)}
+
+Handler = Callable[[], Awaitable[Tuple[int, str, bytes]]]
+
+class StateServer:
+    """
+    Minimal HTTP server on asyncio streams (no web framework):
+    - GET /state   the full state as JSON
+    - GET /events  Server-Sent Events: a `state` event with the snapshot, then
+                   one `patch` event per change (apply with `apply_patch`)
+    - GET /health
+    More plain routes can be added with `route()`. Binds to localhost by default.
+    """
+    def __init__(self, state: LiveState, host: str = "127.0.0.1", port: int = 8765, keepalive: float = 15.0):
+        self.state = state
+        self.host = host
+        self.port = port
+        self.keepalive = keepalive
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._streams = set()
+        self._routes: Dict[str, Handler] = {
+            "/state": self._state,
+            "/health": self._health,
+        }
+
+    def route(self, path: str, handler: Handler):
+        self._routes[path] = handler
+
+    async def start(self):
+        if self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"📡 Live state stream on http://{self.host}:{self.port}/events")
+
+    async def stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        for task in list(self._streams):
+            task.cancel()
+        await asyncio.gather(*self._streams, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _state(self):
+        return 200, "application/json", self.state.snapshot_json()
+
+    async def _health(self):
+        return 200, "application/json", json.dumps(self.state.stats()).encode()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # Headers are not needed
+            parts = request.decode("latin-1").split()
+            method, path = (parts[0], parts[1].split("?", 1)[0]) if len(parts) >= 2 else ("", "")
+            if method != "GET":
+                await self._respond(writer, 405, "text/plain", b"Method Not Allowed")
+            elif path == "/events":
+                task = asyncio.current_task()
+                self._streams.add(task)
+                try:
+                    await self._stream(writer)
+                finally:
+                    self._streams.discard(task)
+            elif path in self._routes:
+                await self._respond(writer, *await self._routes[path]())
+            else:
+                await self._respond(writer, 404, "text/plain", b"Not Found")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            logger.error(f"State server request failed: {e}")
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, content_type: str, body: bytes):
+        reason = {200: "OK", 404: "Not Found", 405: "Method Not Allowed"}.get(status, "")
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nAccess-Control-Allow-Origin: *\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    async def _stream(self, writer: asyncio.StreamWriter):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                     b"Access-Control-Allow-Origin: *\r\nConnection: keep-alive\r\n\r\n")
+        sub = self.state.subscribe()
+        try:
+            writer.write(b"event: state\ndata: " + self.state.snapshot_json() + b"\n\n")
+            await writer.drain()
+            while True:
+                try:
+                    await asyncio.wait_for(sub.wakeup.wait(), self.keepalive)
+                except asyncio.TimeoutError:
+                    writer.write(b": keepalive\n\n")
+                    await writer.drain()
+                    continue
+                sub.wakeup.clear()
+                if sub.overflow:
+                    # Too far behind: resync with one snapshot instead of the backlog
+                    sub.queue.clear()
+                    sub.overflow = False
+                    writer.write(b"event: state\ndata: " + self.state.snapshot_json() + b"\n\n")
+                else:
+                    while sub.queue:
+                        patch = sub.queue.popleft()
+                        writer.write(b"event: patch\ndata: " + json.dumps(patch, separators=(",", ":")).encode() + b"\n\n")
+                await writer.drain()
+        finally:
+            self.state.unsubscribe(sub)
+
+live_state = LiveState()
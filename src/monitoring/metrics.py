@@ -0,0 +1,329 @@
+import asyncio
+import bisect
+import logging
+import math
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds: from a vectorized agent pass (~100us) up to a slow LLM call
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class _Noop:
+    """Stands in for every metric child while metrics are off: all calls do nothing."""
+    __slots__ = ()
+
+    def inc(self, value: float = 1.0):
+        pass
+
+    def set(self, value: float):
+        pass
+
+    def observe(self, value: float):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NOOP = _Noop()
+
+class _Timer:
+    __slots__ = ("child", "start")
+
+    def __init__(self, child: "_HistogramChild"):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.start)
+        return False
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, value: float = 1.0):
+        self.value += value
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float):
+        self.value = float(value)
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot: above the largest bound
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated from the buckets (linear within a bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lo = self.bounds[i - 1] if i > 0 else 0.0
+                hi = self.bounds[i] if i < len(self.bounds) else lo
+                return lo + (hi - lo) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+class _Metric:
+    kind = ""
+    child_type = _CounterChild
+
+    def __init__(self, registry: "Metrics", name: str, help: str, labels: Sequence[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.children: Dict[Tuple[str, ...], object] = {}
+
+    def _new_child(self):
+        return self.child_type()
+
+    def labels(self, *values):
+        """The child for these label values (a no-op while metrics are disabled)."""
+        if not self.registry.enabled:
+            return _NOOP
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+            child = self.children[values] = self._new_child()
+        return child
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [(self.name, _format_labels(self.label_names, k), c.value) for k, c in self.children.items()]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, value: float = 1.0):
+        self.labels().inc(value)
+
+class Gauge(_Metric):
+    kind = "gauge"
+    child_type = _GaugeChild
+
+    def __init__(self, registry: "Metrics", name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(registry, name, help, labels)
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value when metrics are collected (queue depths: no cost on the hot path)."""
+        self._function = function
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        if self._function is not None:
+            try:
+                return [(self.name, "", float(self._function()))]
+            except Exception as e:
+                logger.debug(f"Gauge {self.name} failed: {e}")
+                return []
+        return super().samples()
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, registry: "Metrics", name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(registry, name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self, *values):
+        """`with histogram.time(*labels):` observes the elapsed seconds."""
+        child = self.labels(*values)
+        return _NOOP if child is _NOOP else _Timer(child)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        out = []
+        for key, child in self.children.items():
+            cumulative = 0
+            for bound, n in zip((*self.buckets, math.inf), child.counts):
+                cumulative += n
+                out.append((f"{self.name}_bucket", _format_labels(self.label_names, key, f'le="{_number(bound)}"'), cumulative))
+            labels = _format_labels(self.label_names, key)
+            out.append((f"{self.name}_sum", labels, child.sum))
+            out.append((f"{self.name}_count", labels, child.count))
+        return out
+
+class Metrics:
+    """
+    In-process counters, gauges and histograms, rendered in the Prometheus
+    text format (served at /metrics by the state server) and summarized in the
+    log every `log_interval` seconds.
+
+    When disabled, `labels()` hands back a shared no-op object, so an
+    instrumented call costs one attribute check.
+    """
+    def __init__(self, enabled: bool = True, log_interval: float = 300.0):
+        self.enabled = enabled
+        self.log_interval = log_interval
+        self._metrics: Dict[str, _Metric] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self, name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, help, labels, buckets))
+
+    def reset(self):
+        """Forget every recorded value (the metric definitions stay)."""
+        for metric in self._metrics.values():
+            metric.children.clear()
+
+    # --- Output ---
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            samples = metric.samples() if self.enabled else []
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {_number(value)}" for name, labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+    async def handle(self):
+        """StateServer route handler for GET /metrics."""
+        return 200, "text/plain; version=0.0.4; charset=utf-8", self.render().encode()
+
+    def summary(self, top: int = 5) -> Dict[str, Dict[str, object]]:
+        """Per metric: histograms as count/mean/p50/p95 of the `top` slowest series, counters and gauges as values."""
+        out = {}
+        for metric in self._metrics.values():
+            if isinstance(metric, Histogram):
+                series = sorted(metric.children.items(), key=lambda kv: kv[1].sum, reverse=True)[:top]
+                entries = {
+                    "/".join(key) or "all": {
+                        "n": child.count,
+                        "mean": round(child.sum / child.count, 4) if child.count else None,
+                        "p50": round(child.quantile(0.5), 4) if child.count else None,
+                        "p95": round(child.quantile(0.95), 4) if child.count else None,
+                    }
+                    for key, child in series
+                }
+            else:
+                entries = {labels or "all": round(value, 4) for _, labels, value in metric.samples()}
+            if entries:
+                out[metric.name] = entries
+        return out
+
+    def log_summary(self):
+        for name, entries in self.summary().items():
+            logger.info(f"📈 {name}: {entries}")
+
+    # --- Background summary log ---
+
+    async def start(self):
+        if not self.enabled or not self.log_interval:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.log_interval)
+            try:
+                self.log_summary()
+            except Exception as e:
+                logger.error(f"Metrics summary failed: {e}")
+
+metrics = Metrics(enabled=settings.METRICS_ENABLED, log_interval=settings.METRICS_LOG_SECONDS)
+
+# --- Engine metrics (defined once here so every module records into the same series) ---
+
+AGENT_SECONDS = metrics.histogram(
+    "jarvis_agent_seconds", "Agent analysis latency (symbol '*' = one batch over the whole universe)", ("agent", "symbol"))
+AGENT_ERRORS = metrics.counter("jarvis_agent_errors_total", "Agent analyses that raised", ("agent",))
+HTTP_SECONDS = metrics.histogram("jarvis_http_seconds", "Delta Exchange REST latency", ("method", "endpoint"))
+HTTP_ERRORS = metrics.counter("jarvis_http_errors_total", "Delta Exchange REST failures", ("endpoint", "status"))
+LLM_SECONDS = metrics.histogram("jarvis_llm_seconds", "Groq request latency", ("key", "model"))
+LLM_TOKENS = metrics.counter("jarvis_llm_tokens_total", "Groq tokens used", ("key", "kind"))
+LLM_ERRORS = metrics.counter("jarvis_llm_errors_total", "Groq request failures", ("key", "kind"))
+DB_WRITE_SECONDS = metrics.histogram("jarvis_db_write_seconds", "Database write latency", ("operation",))
+DB_ROWS = metrics.counter("jarvis_db_rows_total", "Rows handed to bulk database writes", ("operation",))
+CYCLE_SECONDS = metrics.histogram(
+    "jarvis_cycle_seconds", "Scanner cycle time per phase", ("phase",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0))
+QUEUE_DEPTH = {
+    name: metrics.gauge(f"jarvis_{name}_queue_depth", help)
+    for name, help in (
+        ("signal_writer", "Signals buffered for the database"),
+        ("llm", "Requests waiting for a Groq key"),
+        ("state_stream", "Live state subscribers"),
+    )
+}
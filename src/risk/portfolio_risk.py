@@ -0,0 +1,263 @@
+import logging
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, NamedTuple, Optional, Sequence
+from src.risk.risk_manager import risk_manager
+
+logger = logging.getLogger(__name__)
+
+Z_SCORES = {0.95: 1.645, 0.99: 2.326}
+
+class RiskDecision(NamedTuple):
+    approved: bool
+    quantity: float   # Approved quantity (may be smaller than requested)
+    reason: str       # The binding limit, "OK" when the order fits untouched
+
+class Portfolio:
+    """One mode's open exposure, as arrays indexed by the engine's symbol slots."""
+    def __init__(self, capacity: int, capital: float):
+        self.quantity = np.zeros(capacity)   # Signed: + long, - short
+        self.entry = np.zeros(capacity)
+        self.capital = capital               # Running equity when no wallet balance is passed
+        self.day = None
+        self.realized_today = 0.0
+
+    def grow(self, capacity: int):
+        for name in ("quantity", "entry"):
+            old = getattr(self, name)
+            new = np.zeros(capacity)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def roll(self, timestamp):
+        """Start a new daily PnL window when `timestamp` falls on a new (UTC) day."""
+        if timestamp is None:
+            return
+        day = timestamp.date() if hasattr(timestamp, "date") else timestamp
+        if day != self.day:
+            self.day = day
+            self.realized_today = 0.0
+
+class PortfolioRisk:
+    """
+    Pre-trade checks over the whole book, not just the order in hand.
+
+    Open positions live in flat arrays (one slot per symbol, one row set per
+    mode) next to the last marked price, per-symbol daily volatility and a
+    correlation matrix. A check evaluates, for the order's notional n:
+    - gross exposure:   sum|e| + n          <= max_gross * equity
+    - net exposure:     side * (net + n)    <= max_net * equity
+    - concentration:    |e_i + side * n|    <= max_concentration * equity
+    - VaR:              z * sqrt(e' S e)    <= max_var * equity (S = covariance)
+    - daily PnL:        today's realized + open PnL above -max_daily_loss (RiskManager)
+    Every limit is linear or quadratic in n, so instead of a yes/no the check
+    solves for the largest notional that fits and resizes the order; it is
+    rejected only when less than `min_fill` of it would remain. The cost is one
+    N x N mat-vec over the tracked symbols, microseconds for a scanner universe.
+
+    Symbols without a fitted risk model use `default_vol` and `default_corr`
+    (crypto moves together, so the default is deliberately high).
+    """
+    def __init__(self,
+                 max_gross: float = 3.0,
+                 max_net: float = 1.5,
+                 max_concentration: float = 0.5,
+                 max_var: float = 0.05,
+                 confidence: float = 0.99,
+                 default_vol: float = 0.05,
+                 default_corr: float = 0.7,
+                 min_fill: float = 0.05,
+                 capital: float = 10000.0,
+                 capacity: int = 16):
+        self.max_gross = max_gross
+        self.max_net = max_net
+        self.max_concentration = max_concentration
+        self.max_var = max_var
+        self.z = Z_SCORES.get(confidence, 2.326)
+        self.default_vol = default_vol
+        self.default_corr = default_corr
+        self.min_fill = min_fill
+        self.capital = capital
+
+        self._index: Dict[str, int] = {}
+        self.price = np.zeros(capacity)
+        self.vol = np.full(capacity, default_vol)
+        self.corr = self._default_corr(capacity)
+        self.cov = self._covariance()
+        self.portfolios: Dict[str, Portfolio] = {}
+        self.checks = 0
+        self.resized = 0
+        self.rejected = 0
+
+    # --- Symbol slots and risk model ---
+
+    def _default_corr(self, n: int) -> np.ndarray:
+        corr = np.full((n, n), self.default_corr)
+        np.fill_diagonal(corr, 1.0)
+        return corr
+
+    def _covariance(self) -> np.ndarray:
+        return self.vol[:, None] * self.corr * self.vol[None, :]
+
+    def slot(self, symbol: str) -> int:
+        i = self._index.get(symbol)
+        if i is None:
+            i = len(self._index)
+            if i >= len(self.price):
+                self._grow(2 * len(self.price))
+            self._index[symbol] = i
+        return i
+
+    def _grow(self, capacity: int):
+        n = len(self.price)
+        price, vol, corr = np.zeros(capacity), np.full(capacity, self.default_vol), self._default_corr(capacity)
+        price[:n], vol[:n], corr[:n, :n] = self.price, self.vol, self.corr
+        self.price, self.vol, self.corr = price, vol, corr
+        self.cov = self._covariance()
+        for portfolio in self.portfolios.values():
+            portfolio.grow(capacity)
+
+    def portfolio(self, mode: str) -> Portfolio:
+        portfolio = self.portfolios.get(mode)
+        if portfolio is None:
+            portfolio = self.portfolios[mode] = Portfolio(len(self.price), self.capital)
+        return portfolio
+
+    def mark(self, symbol: str, price: float):
+        self.price[self.slot(symbol)] = price
+
+    def mark_many(self, symbols: Sequence[str], prices: np.ndarray):
+        slots = np.fromiter((self.slot(s) for s in symbols), dtype=np.int64, count=len(symbols))
+        prices = np.asarray(prices, dtype=float)
+        ok = np.isfinite(prices) & (prices > 0)
+        self.price[slots[ok]] = prices[ok]
+
+    def set_risk_model(self, symbols: Sequence[str], vol: np.ndarray, corr: np.ndarray):
+        """
+        Daily volatility per symbol and their correlation matrix (same order as
+        `symbols`). NaN entries keep the defaults.
+        """
+        slots = np.fromiter((self.slot(s) for s in symbols), dtype=np.int64, count=len(symbols))
+        vol = np.asarray(vol, dtype=float)
+        corr = np.asarray(corr, dtype=float)
+        self.vol[slots] = np.where(np.isfinite(vol) & (vol > 0), vol, self.default_vol)
+        block = np.where(np.isfinite(corr), np.clip(corr, -1.0, 1.0), self.default_corr)
+        np.fill_diagonal(block, 1.0)
+        self.corr[np.ix_(slots, slots)] = block
+        self.cov = self._covariance()
+
+    def update_from_returns(self, symbols: Sequence[str], returns: np.ndarray,
+                            bars_per_day: float = 24.0, min_periods: int = 20):
+        """Fit the risk model from per-bar returns (symbols x bars, NaN padded)."""
+        frame = pd.DataFrame(np.asarray(returns, dtype=float).T)
+        vol = frame.std().where(frame.count() >= min_periods).to_numpy() * math.sqrt(bars_per_day)
+        corr = frame.corr(min_periods=min_periods).to_numpy()
+        self.set_risk_model(symbols, vol, corr)
+
+    # --- Position events (PositionBook listeners) ---
+
+    def on_open(self, position):
+        i = self.slot(position.symbol)
+        portfolio = self.portfolio(position.mode)
+        portfolio.quantity[i] = position.quantity * position.side
+        portfolio.entry[i] = position.entry_price
+        self.price[i] = position.entry_price
+
+    def on_close(self, position):
+        i = self.slot(position.symbol)
+        portfolio = self.portfolio(position.mode)
+        portfolio.roll(position.exit_time)
+        portfolio.quantity[i] = 0.0
+        portfolio.entry[i] = 0.0
+        portfolio.realized_today += position.profit_loss
+        portfolio.capital += position.profit_loss
+        self.price[i] = position.exit_price
+
+    # --- Metrics and checks ---
+
+    def exposures(self, mode: str) -> np.ndarray:
+        """Signed notional per slot."""
+        return self.portfolio(mode).quantity * self.price
+
+    def daily_pnl(self, mode: str) -> float:
+        """Today's realized PnL plus the open PnL of everything still held."""
+        portfolio = self.portfolio(mode)
+        held = portfolio.quantity != 0
+        unrealized = float(portfolio.quantity[held] @ (self.price[held] - portfolio.entry[held]))
+        return portfolio.realized_today + unrealized
+
+    def value_at_risk(self, mode: str) -> float:
+        e = self.exposures(mode)
+        return self.z * math.sqrt(max(float(e @ self.cov @ e), 0.0))
+
+    def check_order(self, symbol: str, direction: str, quantity: float, price: float,
+                    mode: str, equity: Optional[float] = None, timestamp=None) -> RiskDecision:
+        """
+        Largest part of the order that keeps every portfolio limit.
+        equity: account value the limits scale with; defaults to the mode's running capital.
+        """
+        self.checks += 1
+        i = self.slot(symbol)  # Before the lookup: a new slot may grow the arrays
+        portfolio = self.portfolio(mode)
+        portfolio.roll(timestamp)
+        self.price[i] = price
+        equity = portfolio.capital if equity is None else equity
+
+        if equity <= 0 or price <= 0 or quantity <= 0:
+            return self._reject(symbol, "NO_EQUITY" if equity <= 0 else "INVALID_ORDER")
+
+        daily_loss = max(-self.daily_pnl(mode), 0.0) / equity
+        risk_manager.daily_loss = daily_loss
+        if not risk_manager.check_safety(daily_loss):
+            return self._reject(symbol, "DAILY_LOSS")
+
+        side = 1.0 if direction == "BUY" else -1.0
+        e = portfolio.quantity * self.price
+        s = self.cov @ e                       # Marginal variance contributions
+        variance = float(e @ s)
+        var_cap = (self.max_var * equity / self.z) ** 2
+
+        # Quadratic in n: cov_ii n^2 + 2 side s_i n + (variance - cap) <= 0
+        a, b, c = self.cov[i, i], 2.0 * side * s[i], variance - var_cap
+        disc = b * b - 4.0 * a * c
+        var_room = (-b + math.sqrt(disc)) / (2.0 * a) if disc >= 0 and a > 0 else 0.0
+
+        room = {
+            "GROSS": self.max_gross * equity - float(np.abs(e).sum()),
+            "NET": self.max_net * equity - side * float(e.sum()),
+            "CONCENTRATION": self.max_concentration * equity - side * float(e[i]),
+            "VAR": var_room,
+        }
+        binding = min(room, key=room.get)
+        notional = quantity * price
+        if room[binding] >= notional:
+            return RiskDecision(True, quantity, "OK")
+        allowed = max(room[binding], 0.0) / price
+        if allowed < quantity * self.min_fill:
+            return self._reject(symbol, binding)
+        self.resized += 1
+        logger.info(f"🛡️ {symbol} {direction} resized {quantity} -> {allowed:.6f} ({binding} limit)")
+        return RiskDecision(True, round(allowed, 6), binding)
+
+    def _reject(self, symbol: str, reason: str) -> RiskDecision:
+        self.rejected += 1
+        logger.warning(f"🛡️ {symbol} order blocked by portfolio risk ({reason})")
+        return RiskDecision(False, 0.0, reason)
+
+    def stats(self, mode: str) -> Dict[str, float]:
+        e = self.exposures(mode)
+        equity = self.portfolio(mode).capital
+        return {
+            "gross": round(float(np.abs(e).sum()), 2),
+            "net": round(float(e.sum()), 2),
+            "largest": round(float(np.abs(e).max()) if len(e) else 0.0, 2),
+            "var": round(self.value_at_risk(mode), 2),
+            "daily_pnl": round(self.daily_pnl(mode), 2),
+            "capital": round(equity, 2),
+            "checks": self.checks,
+            "resized": self.resized,
+            "rejected": self.rejected,
+        }
+
+portfolio_risk = PortfolioRisk()
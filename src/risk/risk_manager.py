@@ -1,14 +1,30 @@
 import logging
 from typing import Dict, Optional
+from src.config.runtime import runtime_config
+from src.risk.stop_optimizer import StopTable
 
 logger = logging.getLogger(__name__)
 
 class RiskManager:
-    def __init__(self):
+    def __init__(self, stop_table_path: str = "src/config/stop_multipliers.json"):
         self.risk_per_trade = 0.01  # 1% risk per trade
         self.max_daily_loss = 0.05  # 5% max daily loss
         self.max_leverage = 1.0     # 1x leverage (Conservative)
         self.daily_loss = 0.0       # Tracked daily loss
+        self._defaults = (self.risk_per_trade, self.max_daily_loss, self.max_leverage)
+        self.stop_table_path = stop_table_path
+        self.stop_table = StopTable.load(stop_table_path)  # ATR multipliers per (symbol, regime)
+
+    def set_stop_table(self, table: StopTable):
+        """Publish a freshly optimized table (single attribute swap)."""
+        self.stop_table = table
+
+    def apply_config(self, snapshot, old=None):
+        """Runtime config subscriber: take overrides from the snapshot, else the defaults."""
+        risk, daily, leverage = self._defaults
+        self.risk_per_trade = snapshot.risk_per_trade if snapshot.risk_per_trade is not None else risk
+        self.max_daily_loss = snapshot.max_daily_loss if snapshot.max_daily_loss is not None else daily
+        self.max_leverage = snapshot.max_leverage if snapshot.max_leverage is not None else leverage
 
     def calculate_position_size(self, 
                                 account_balance: float, 
@@ -56,11 +72,13 @@ class RiskManager:
             return False
         return True
 
-    def get_stop_loss_price(self, entry_price: float, action: str, atr: float) -> float:
+    def get_stop_loss_price(self, entry_price: float, action: str, atr: float, symbol: str = None) -> float:
         """
         Calculate Stop Loss price based on ATR.
+        The multiplier comes from the optimized stop table (per symbol and volatility
+        regime), 2.0 for symbols it doesn't cover.
         """
-        multiplier = 2.0
+        multiplier = self.stop_table.multiplier(symbol, atr, entry_price)
         if action == "BUY":
             return entry_price - (atr * multiplier)
         elif action == "SELL":
@@ -68,3 +86,4 @@ class RiskManager:
         return 0.0
 
 risk_manager = RiskManager()
+runtime_config.subscribe(risk_manager.apply_config)
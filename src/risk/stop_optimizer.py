@@ -0,0 +1,161 @@
+import json
+import logging
+import numpy as np
+from typing import Dict, Optional, Sequence
+from src.data.panel import true_range
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MULTIPLIERS = np.round(np.arange(1.0, 4.01, 0.25), 2)
+REGIMES = ("LOW_VOL", "HIGH_VOL")
+
+def rolling_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """ATR for every bar (NaN until `window` bars exist), same as TR.rolling(window).mean()."""
+    tr = true_range(high, low, close)
+    atr = np.full(len(tr), np.nan)
+    if len(tr) >= window:
+        csum = np.cumsum(tr)
+        atr[window - 1:] = (csum[window - 1:] - np.concatenate(([0.0], csum[:-window]))) / window
+    return atr
+
+def excursions(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+               entries: np.ndarray, directions: np.ndarray, horizon: int):
+    """
+    Adverse / favourable excursion paths for every entry in one pass.
+    entries: bar index of each entry (filled at that bar's close); directions: +1 long, -1 short.
+    Returns (adverse, favourable, final, valid):
+    - adverse / favourable: running max excursion over the next `horizon` bars, shape (k, horizon);
+      the last column is the MAE / MFE
+    - final: price move (in the trade's favour) at the end of the horizon
+    - valid: mask of the entries that had `horizon` bars after them
+    """
+    valid = (entries >= 0) & (entries + horizon < len(close))
+    entries, directions = entries[valid], directions[valid]
+    bars = entries[:, None] + np.arange(1, horizon + 1)
+    entry_price = close[entries][:, None]
+    up = high[bars] - entry_price
+    down = entry_price - low[bars]
+    is_long = directions[:, None] > 0
+    adverse = np.maximum.accumulate(np.where(is_long, down, up), axis=1)
+    favourable = np.maximum.accumulate(np.where(is_long, up, down), axis=1)
+    final = (close[entries + horizon] - close[entries]) * directions
+    return adverse, favourable, final, valid
+
+def stop_returns(adverse: np.ndarray, favourable: np.ndarray, final: np.ndarray, atr: np.ndarray,
+                 entry_price: np.ndarray, multipliers: np.ndarray, reward_r: float = 2.0) -> np.ndarray:
+    """
+    Return of every trade under every stop multiplier, shape (multipliers, trades).
+    Stop at m * ATR, target at reward_r * m * ATR; whichever is touched first wins
+    (the stop, if both on the same bar), otherwise the trade exits at the horizon.
+    """
+    horizon = adverse.shape[1]
+    risk = multipliers[:, None] * atr[None, :]
+    stop_hit = adverse[None] >= risk[..., None]
+    target_hit = favourable[None] >= (reward_r * risk)[..., None]
+    first_stop = np.where(stop_hit.any(-1), stop_hit.argmax(-1), horizon)
+    first_target = np.where(target_hit.any(-1), target_hit.argmax(-1), horizon)
+    pnl = np.where(
+        (first_stop < horizon) & (first_stop <= first_target), -risk,
+        np.where(first_target < horizon, reward_r * risk, final[None, :])
+    )
+    return pnl / entry_price[None, :]
+
+class StopTable:
+    """
+    Published stop multipliers: {symbol: {vol_threshold, multipliers: {regime: m}}}.
+    `multiplier()` is two dict lookups and a compare, cheap enough for order time.
+    """
+    def __init__(self, symbols: Optional[Dict[str, dict]] = None, default: float = 2.0):
+        self.symbols = symbols or {}
+        self.default = default
+
+    def regime(self, symbol: str, atr: float, price: float) -> Optional[str]:
+        entry = self.symbols.get(symbol)
+        if entry is None or not price:
+            return None
+        return "HIGH_VOL" if atr / price > entry["vol_threshold"] else "LOW_VOL"
+
+    def multiplier(self, symbol: Optional[str], atr: float, price: float) -> float:
+        entry = self.symbols.get(symbol) if symbol else None
+        if entry is None:
+            return self.default
+        multipliers = entry["multipliers"]
+        return multipliers.get(self.regime(symbol, atr, price), multipliers.get("ALL", self.default))
+
+    @classmethod
+    def load(cls, path: str) -> "StopTable":
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            return cls(data.get("symbols", {}), data.get("default", 2.0))
+        except FileNotFoundError:
+            return cls()
+        except ValueError as e:
+            logger.error(f"Stop table {path} unreadable, using default multiplier: {e}")
+            return cls()
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"default": self.default, "symbols": self.symbols}, f, indent=4)
+
+class StopOptimizer:
+    """
+    Picks the ATR stop multiplier with the best expectancy per (symbol, volatility regime).
+
+    For every historical entry, the MAE/MFE paths over the next `horizon` bars come
+    from one vectorized pass over the OHLC arrays; every candidate multiplier is then
+    scored on all trades at once. Regimes split on the symbol's median ATR% so live
+    orders can be classified with the same threshold. Groups with fewer than
+    `min_samples` trades fall back to the symbol-wide ("ALL") choice.
+    """
+    def __init__(self, horizon: int = 24, multipliers: Sequence[float] = DEFAULT_MULTIPLIERS,
+                 reward_r: float = 2.0, atr_window: int = 14, min_samples: int = 20):
+        self.horizon = horizon
+        self.multipliers = np.asarray(multipliers, dtype=float)
+        self.reward_r = reward_r  # Keep in line with PositionBook.take_profit_r
+        self.atr_window = atr_window
+        self.min_samples = min_samples
+
+    def optimize_symbol(self, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                        entries: np.ndarray, directions: np.ndarray) -> Optional[dict]:
+        """One symbol's table entry, or None without enough usable entries."""
+        high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+        entries = np.asarray(entries, dtype=np.int64)
+        directions = np.asarray(directions, dtype=float)
+
+        atr = rolling_atr(high, low, close, self.atr_window)
+        atr_pct = atr / close
+        vol_threshold = float(np.nanmedian(atr_pct)) if np.isfinite(atr_pct).any() else 0.0
+
+        usable = (entries >= 0) & (entries < len(close))
+        usable[usable] = np.isfinite(atr[entries[usable]])
+        entries, directions = entries[usable], directions[usable]
+        adverse, favourable, final, valid = excursions(high, low, close, entries, directions, self.horizon)
+        entries = entries[valid]
+        if len(entries) < self.min_samples:
+            return None
+
+        returns = stop_returns(adverse, favourable, final, atr[entries], close[entries], self.multipliers, self.reward_r)
+        regimes = np.where(atr_pct[entries] > vol_threshold, "HIGH_VOL", "LOW_VOL")
+
+        multipliers, expectancy, samples = {}, {}, {}
+        for regime, mask in [("ALL", np.ones(len(entries), dtype=bool))] + [(r, regimes == r) for r in REGIMES]:
+            n = int(mask.sum())
+            samples[regime] = n
+            if n < self.min_samples:
+                continue
+            mean = returns[:, mask].mean(axis=1)
+            best = int(np.argmax(mean))
+            multipliers[regime] = float(self.multipliers[best])
+            expectancy[regime] = round(float(mean[best]), 6)
+
+        mae = adverse[:, -1] / close[entries]
+        mfe = favourable[:, -1] / close[entries]
+        return {
+            "vol_threshold": vol_threshold,
+            "multipliers": multipliers,
+            "expectancy": expectancy,
+            "samples": samples,
+            "median_mae_pct": round(float(np.median(mae)), 6),
+            "median_mfe_pct": round(float(np.median(mfe)), 6),
+        }
@@ -0,0 +1,87 @@
+import asyncio
+import pkgutil
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents import main_brain
+from src.agents.registry import MANIFEST, AgentRegistry, AgentSpec
+
+AGENTS_DIR = os.path.join(os.path.dirname(__file__), '..', 'src', 'agents')
+NOT_AGENTS = {"base_agent", "main_brain", "consensus", "prompt_builder", "registry"}
+
+
+def test_manifest_covers_every_agent_module():
+    modules = {name for _, name, _ in pkgutil.iter_modules([AGENTS_DIR])} - NOT_AGENTS
+    assert {spec.module.rsplit(".", 1)[1] for spec in MANIFEST} == modules
+    # Placeholders are listed but off
+    assert not AgentRegistry().is_enabled("SpreadAgent")
+
+
+def test_agents_are_imported_on_first_use_and_timed():
+    sys.modules.pop("src.agents.spread_agent", None)
+    registry = AgentRegistry([
+        AgentSpec("WhaleMovementAgent", "src.agents.whale_movement_agent", "WhaleMovementAgent", cost="medium"),
+        AgentSpec("VolatilityAgent", "src.agents.volatility_agent", "VolatilityAgent"),
+        AgentSpec("SpreadAgent", "src.agents.spread_agent", "SpreadAgent", enabled=False),
+        AgentSpec("FundingRateAgent", "src.agents.funding_rate_agent", "FundingRateAgent", requires=("funding",)),
+    ])
+    assert registry.stats()["loaded"] == 0
+
+    agents = registry.active(available=("ohlc",))
+    assert [a.name for a in agents] == ["VolatilityAgent", "WhaleMovementAgent"]  # Cheapest first
+    assert "src.agents.spread_agent" not in sys.modules  # Disabled: never imported
+    assert not registry.loaded("FundingRateAgent")  # No funding data: skipped
+    assert set(registry.import_times) == {"VolatilityAgent", "WhaleMovementAgent"}
+
+    # Later calls reuse the same list (no re-filtering per access) until overrides change
+    assert registry.active(available=["ohlc"]) is agents
+    registry.set_enabled("SpreadAgent", True)
+    assert [a.name for a in registry.active(available=("ohlc",))] == ["VolatilityAgent", "SpreadAgent", "WhaleMovementAgent"]
+
+
+def test_overrides_and_failed_imports():
+    registry = AgentRegistry([
+        AgentSpec("SpreadAgent", "src.agents.spread_agent", "SpreadAgent", enabled=False),
+        AgentSpec("GhostAgent", "src.agents.no_such_module", "GhostAgent"),
+    ], enable=["SpreadAgent"])
+    assert [a.name for a in registry.active()] == ["SpreadAgent"]
+    assert registry.get("GhostAgent") is None
+    assert "GhostAgent" in registry.stats()["failed"]
+
+    registry.set_enabled("SpreadAgent", False)
+    assert registry.active() == []
+
+
+def test_embedding_model_is_loaded_once(monkeypatch):
+    loads = []
+
+    class FakeModel:
+        def __init__(self, name):
+            loads.append(name)
+
+        def encode(self, text):
+            import numpy as np
+            return np.zeros(3)
+
+    stored = []
+
+    async def store_thought(**kwargs):
+        stored.append(kwargs)
+
+    fake = type(sys)("sentence_transformers")
+    fake.SentenceTransformer = FakeModel
+    monkeypatch.setitem(sys.modules, "sentence_transformers", fake)
+    monkeypatch.setattr(main_brain, "_EMBEDDER", None)
+    from src.data.db_manager import db_manager
+    monkeypatch.setattr(db_manager, "store_thought", store_thought)
+
+    brain = main_brain.MainBrain()
+
+    async def scenario():
+        await asyncio.gather(*[brain._remember("BTCUSD", "summary", "BUY") for _ in range(3)])
+    asyncio.run(scenario())
+    assert loads == ["all-MiniLM-L6-v2"]
+    assert [s["vector"] for s in stored] == [[0.0, 0.0, 0.0]] * 3
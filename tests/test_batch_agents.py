@@ -0,0 +1,57 @@
+import asyncio
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from src.data.panel import MarketPanel
+from src.agents.volume_agent import VolumeAnalysisAgent
+from src.agents.whale_movement_agent import WhaleMovementAgent
+from src.agents.risk_management_agent import RiskManagementAgent
+from src.agents.volatility_agent import VolatilityAgent
+
+
+def make_frame(seed: int, length: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, length)))
+    open_ = close * (1 + rng.normal(0, 0.005, length))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.03, length))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.03, length))
+    volume = rng.uniform(100, 1000, length)
+    volume[-1] *= 1 + 4 * (seed % 2)  # every other symbol gets a volume spike
+    return pd.DataFrame({
+        "time": np.arange(length) * 3600,
+        "open": open_, "high": high, "low": low, "close": close, "volume": volume,
+    })
+
+
+def test_panel_right_aligns_frames():
+    frames = {"BTCUSD": make_frame(1, 50), "ETHUSD": make_frame(2, 35)}
+    panel = MarketPanel.from_frames(frames)
+
+    assert panel.close.shape == (2, 50)
+    assert list(panel.lengths) == [50, 35]
+    assert np.isnan(panel.close[1, 0])
+    pd.testing.assert_frame_equal(panel.frame("ETHUSD"), frames["ETHUSD"].reset_index(drop=True), check_dtype=False)
+
+
+def test_vectorized_batch_matches_per_symbol_analyze():
+    frames = {f"SYM{i}": make_frame(i, 50 - i) for i in range(8)}
+    panel = MarketPanel.from_frames(frames)
+
+    for agent in [VolumeAnalysisAgent(), WhaleMovementAgent(), RiskManagementAgent(), VolatilityAgent()]:
+        batch = asyncio.run(agent.analyze_batch(panel.symbols, panel))
+        for symbol, signal in zip(panel.symbols, batch):
+            single = asyncio.run(agent.analyze(symbol, frames[symbol]))
+            assert signal.action == single.action, (agent.name, symbol)
+            assert signal.confidence == single.confidence
+            for key, value in single.metadata.items():
+                if isinstance(value, float):
+                    assert np.isclose(signal.metadata[key], value), (agent.name, key)
+                else:
+                    assert signal.metadata[key] == value
+
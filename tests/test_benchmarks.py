@@ -0,0 +1,59 @@
+import json
+import sys
+import os
+
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks import baseline, suite, synthetic
+from src.data.panel import candles_frame
+
+
+def test_synthetic_candles_are_seeded_and_consistent():
+    a, b = synthetic.ohlc_frame(300, seed=7), synthetic.ohlc_frame(300, seed=7)
+    assert a.equals(b)
+    assert not a.equals(synthetic.ohlc_frame(300, seed=8))
+    assert (a["high"] >= a[["open", "close"]].max(axis=1)).all()
+    assert (a["low"] <= a[["open", "close"]].min(axis=1)).all()
+    assert (np.diff(a["time"]) == 3600).all()
+
+    # API-shaped rows come newest first; the parser puts them back in order
+    frame = candles_frame(synthetic.candle_rows(50, seed=7))
+    assert frame["time"].is_monotonic_increasing
+    assert np.allclose(frame["close"], synthetic.ohlc_frame(50, seed=7)["close"])
+
+    ticks = [json.loads(m) for m in synthetic.ticker_messages(20, ["A", "B"], seed=1)]
+    assert [t["symbol"] for t in ticks[:4]] == ["A", "B", "A", "B"]
+
+
+def test_compare_respects_direction_and_threshold():
+    base = {
+        "latency": baseline.result(10.0, "ms"),
+        "throughput": baseline.result(100.0, "rows/s", higher_is_better=True),
+        "gone": baseline.result(1.0, "ms"),
+    }
+    current = {
+        "latency": baseline.result(13.0, "ms"),  # 30% slower
+        "throughput": baseline.result(130.0, "rows/s", higher_is_better=True),  # 30% faster
+        "added": baseline.result(1.0, "ms"),
+    }
+    rows = {r.name: r for r in baseline.compare(base, current, threshold=0.15)}
+    assert rows["latency"].status == "regressed" and abs(rows["latency"].change + 0.3) < 1e-9
+    assert rows["throughput"].status == "improved"
+    assert (rows["gone"].status, rows["added"].status) == ("missing", "new")
+    assert "regressed" in baseline.format_table(list(rows.values()))
+
+
+def test_quick_run_and_baseline_round_trip(tmp_path):
+    cfg = suite.Config.quick(seed=3)
+    results = suite.run(cfg, ["frames", "websocket", "db"])  # db is skipped without a DSN
+    assert set(results) == {"frames.candles_frame.rows100", "frames.panel.s5x60", "websocket.dispatch.msgs_per_sec"}
+    assert all(r["value"] > 0 for r in results.values())
+
+    path = tmp_path / "baseline.json"
+    baseline.save(results, str(path), cfg.seed)
+    saved = baseline.load(str(path))
+    assert saved["seed"] == 3 and saved["results"] == results
+    assert all(r.status == "ok" for r in baseline.compare(saved["results"], results))
@@ -0,0 +1,36 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.base_agent import Signal
+from src.agents.consensus import ConsensusGate
+
+
+def votes(*pairs):
+    return [Signal(agent_name=f"Agent{i}", symbol="BTCUSD", action=a, confidence=c) for i, (a, c) in enumerate(pairs)]
+
+
+def test_all_neutral_short_circuits():
+    gate = ConsensusGate()
+    result = gate.evaluate(votes(("NEUTRAL", 0.0), ("NEUTRAL", 0.5), ("ANALYSIS", 1.0)))
+    assert result.action == "NEUTRAL"
+    assert gate.avoided_ratio == 1.0
+
+
+def test_one_sided_evidence_is_decided_without_llm():
+    gate = ConsensusGate()
+    result = gate.evaluate(votes(("BUY", 0.9), ("BUY", 0.8), ("BUY", 0.95), ("NEUTRAL", 0.1)))
+    assert result.action == "BUY"
+    assert 0.8 < result.confidence <= 1.0
+
+
+def test_conflict_escalates_and_weights_matter():
+    gate = ConsensusGate()
+    signals = votes(("BUY", 0.8), ("SELL", 0.8), ("BUY", 0.8), ("BUY", 0.8))
+    assert gate.evaluate(signals).escalate
+
+    gate.update_weights({"Agent1": 0.1})  # the Judge has lost faith in the lone seller
+    assert gate.evaluate(signals).action == "BUY"
+    assert gate.stats()["escalated"] == 1
@@ -0,0 +1,86 @@
+import asyncio
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.correlation_agent import CorrelationAgent
+from src.data.correlation import CorrelationService
+from src.data.panel import MarketPanel
+
+
+def make_returns(n_bars=300, seed=1):
+    rng = np.random.default_rng(seed)
+    btc = rng.normal(0, 0.01, n_bars)
+    eth = 1.5 * btc + rng.normal(0, 0.004, n_bars)   # beta 1.5, tightly linked
+    xrp = rng.normal(0, 0.01, n_bars)                # independent
+    return ["BTCUSD", "ETHUSD", "XRPUSD"], np.vstack([btc, eth, xrp])
+
+
+def test_incremental_window_matches_full_recompute():
+    symbols, returns = make_returns()
+    returns[2, 100:130] = np.nan  # Gap in one series: pairs only use common bars
+    service = CorrelationService(windows=(50, 120), capacity=2)  # Forces slot growth too
+    for t in range(returns.shape[1]):
+        service.push(symbols, returns[:, t])
+
+    for window in (50, 120):
+        frame = pd.DataFrame(returns[:, -window:].T)
+        assert np.allclose(service.corr(symbols, window), frame.corr().to_numpy(), atol=1e-9)
+        assert np.allclose(service.cov(symbols, window), frame.cov().to_numpy(), atol=1e-12)
+
+
+def test_beta_clusters_and_lookup():
+    symbols, returns = make_returns()
+    service = CorrelationService(windows=(200,), halflife=50)
+    for t in range(returns.shape[1]):
+        service.push(symbols, returns[:, t])
+
+    beta = service.beta(symbols)
+    assert abs(beta[0] - 1.0) < 1e-9 and abs(beta[1] - 1.5) < 0.1
+    labels = service.clusters(symbols)
+    assert labels[0] == labels[1] != labels[2]
+
+    info = service.lookup("ETHUSD")
+    assert info["corr_benchmark"] > 0.9 and sorted(info["cluster_members"]) == ["BTCUSD", "ETHUSD"]
+    # EWMA agrees on the structure
+    ewma = service.corr(symbols, "ewma")
+    assert ewma[0, 1] > 0.9 and abs(ewma[0, 2]) < 0.4
+
+
+def make_panel(symbols, returns, start=1_700_000_000):
+    close = 100.0 * np.exp(np.cumsum(returns, axis=1))
+    close = np.hstack([np.full((len(symbols), 1), 100.0), close])
+    width = close.shape[1]
+    time = np.tile(start + 3600 * np.arange(width), (len(symbols), 1))
+    return MarketPanel(symbols, close, close, close, close, np.ones_like(close), time=time)
+
+
+def test_update_panel_skips_seen_and_forming_bars():
+    symbols, returns = make_returns(60)
+    service = CorrelationService(windows=(24,))
+    panel = make_panel(symbols, returns)
+    assert service.update_panel(panel) == 59  # Everything but the forming candle
+    assert service.update_panel(panel) == 0
+
+    longer = make_panel(*make_returns(62))
+    assert service.update_panel(longer) == 2
+    assert service.bars == 61
+
+
+def test_agent_follows_benchmark_for_correlated_symbols():
+    symbols, returns = make_returns(80)
+    returns[:, -7:-1] = np.abs(returns[:, -7:-1]) + 0.01  # Strong BTC rally over the last closed bars
+    service = CorrelationService(windows=(48,))
+    agent = CorrelationAgent(service=service)
+    signals = asyncio.run(agent.analyze_batch(symbols, make_panel(symbols, returns)))
+
+    by_symbol = {s.symbol: s for s in signals}
+    assert by_symbol["BTCUSD"].action == "NEUTRAL"
+    assert by_symbol["ETHUSD"].action == "BUY" and by_symbol["ETHUSD"].confidence > 0
+    assert by_symbol["XRPUSD"].action == "NEUTRAL"
+    assert by_symbol["ETHUSD"].metadata["cluster_size"] == 2
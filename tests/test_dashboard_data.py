@@ -0,0 +1,182 @@
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+
+from src.dashboard.data import DashboardData, TRADE_COLUMNS, equity_curve
+
+T0 = datetime(2024, 1, 1)
+
+
+class FakeTrades:
+    """Just enough of the trades table for the dashboard's queries."""
+    def __init__(self):
+        self.rows = []
+        self.sql = []
+
+    def add(self, mode, entry_time, status="OPEN", pnl=None):
+        row = {c: None for c in TRADE_COLUMNS}
+        row.update(id=len(self.rows) + 1, symbol="BTCUSD", mode=mode, entry_time=entry_time, status=status, profit_loss=pnl,
+                   exit_time=entry_time + timedelta(hours=1) if status == "CLOSED" else None)
+        self.rows.append(row)
+        return row
+
+    def run(self, sql, params):
+        self.sql.append(sql)
+        mode = params[0]
+        rows = [r for r in self.rows if r["mode"] == mode]
+        if "trade_daily_summary" in sql:
+            days = {}
+            for r in rows:
+                if r["status"] == "CLOSED":
+                    d = days.setdefault(r["exit_time"].date(), [0, 0, 0.0, 0.0, 0.0])
+                    pnl = r["profit_loss"]
+                    d[0] += 1; d[1] += pnl > 0; d[2] += pnl; d[3] += max(pnl, 0); d[4] += min(pnl, 0)
+            return ["day", "trades", "wins", "pnl", "gross_profit", "gross_loss"], \
+                [(day, *d) for day, d in sorted(days.items())]
+        if "COUNT(*)" in sql:
+            return ["n"], [(sum(r["status"] == "OPEN" for r in rows),)]
+        if "MAX(id)" in sql:
+            return ["id"], [(max((r["id"] for r in rows), default=0),)]
+        if "ANY" in sql:
+            rows = [r for r in self.rows if r["id"] in params[0]]
+        elif "id > %s" in sql:
+            rows = sorted((r for r in rows if r["id"] > params[1]), key=lambda r: r["id"])[:params[2]]
+        else:
+            rows = sorted((r for r in rows if r["id"] <= params[1]), key=lambda r: (r["entry_time"], r["id"]), reverse=True)[:params[2]]
+        return TRADE_COLUMNS, [tuple(r[c] for c in TRADE_COLUMNS) for r in rows]
+
+
+class FakeCursor:
+    def __init__(self, table):
+        self.table = table
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        columns, self.rows = self.table.run(sql, params)
+        self.description = [(c,) for c in columns]
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakePool:
+    def __init__(self, table):
+        self.conn = SimpleNamespace(cursor=lambda: FakeCursor(table), commit=lambda: None, rollback=lambda: None)
+
+    def getconn(self):
+        return self.conn
+
+    def putconn(self, conn):
+        pass
+
+
+class FakeListener:
+    def __init__(self):
+        self.notifies = []
+
+    def poll(self):
+        pass
+
+    def notify(self, mode):
+        self.notifies.append(SimpleNamespace(payload=mode))
+
+
+def make_data(table, tail=5, listener=None):
+    data = DashboardData(pool=FakePool(table), tail=tail)
+    if listener is None:
+        data._listen_failed = True
+    else:
+        data._listener = listener
+    return data
+
+
+def test_incremental_fetch_refreshes_open_rows_and_keeps_tail():
+    table = FakeTrades()
+    for i in range(8):
+        table.add("BACKTEST", T0 + timedelta(hours=i))
+    data = make_data(table)
+
+    first = data.trades("BACKTEST")
+    assert first["id"].tolist() == [4, 5, 6, 7, 8]  # Newest `tail` by entry_time, oldest first
+
+    table.rows[7].update(status="CLOSED", profit_loss=5.0)
+    table.add("BACKTEST", T0 + timedelta(hours=20))
+    table.add("PAPER", T0 + timedelta(hours=21))
+    table.sql.clear()
+    second = data.trades("BACKTEST")
+    assert second["id"].tolist() == [5, 6, 7, 8, 9]
+    assert second.set_index("id").loc[8, "status"] == "CLOSED"
+    # Only new ids and the cached OPEN rows were fetched
+    assert any("id > %s" in q for q in table.sql) and any("ANY" in q for q in table.sql)
+    assert not any("MAX(id)" in q for q in table.sql)
+
+
+def test_backtest_rows_with_old_entry_times_are_not_missed():
+    table = FakeTrades()
+    table.add("BACKTEST", T0 + timedelta(days=10))
+    data = make_data(table, tail=10)
+    data.trades("BACKTEST")
+
+    table.add("BACKTEST", T0)  # A new backtest run replays older candles
+    assert data.trades("BACKTEST")["id"].tolist() == [2, 1]
+
+
+def test_notifications_gate_queries():
+    table = FakeTrades()
+    table.add("PAPER", T0, status="CLOSED", pnl=10.0)
+    table.add("PAPER", T0 + timedelta(hours=1), status="CLOSED", pnl=-4.0)
+    listener = FakeListener()
+    data = make_data(table, listener=listener)
+
+    stats = data.stats("PAPER")
+    assert (stats["total_trades"], stats["win_rate"], stats["total_pnl"]) == (2, 0.5, 6.0)
+    data.trades("PAPER")
+    queries = data.queries
+
+    # Reruns without a notification never touch the database
+    data.trades("PAPER")
+    data.stats("PAPER")
+    assert data.queries == queries
+
+    # A change in another mode doesn't invalidate this one
+    listener.notify("LIVE")
+    data.trades("PAPER")
+    assert data.queries == queries
+
+    table.add("PAPER", T0 + timedelta(hours=2), status="CLOSED", pnl=1.0)
+    listener.notify("PAPER")
+    assert data.stats("PAPER")["total_trades"] == 3
+    assert len(data.trades("PAPER")) == 3
+
+
+def test_daily_equity_curve_and_drawdown():
+    table = FakeTrades()
+    for day, pnl in enumerate([100.0, -300.0, 50.0, 400.0]):
+        table.add("PAPER", T0 + timedelta(days=day), status="CLOSED", pnl=pnl)
+    table.add("PAPER", T0 + timedelta(days=5))  # Still open
+    data = make_data(table)
+
+    daily = data.daily("PAPER")
+    assert daily["equity"].tolist() == [10100.0, 9800.0, 9850.0, 10250.0]
+    assert daily["drawdown"].tolist() == [0.0, -300.0, -250.0, 0.0]
+    stats = data.stats("PAPER")
+    assert (stats["total_trades"], stats["open_trades"], stats["closed_trades"]) == (5, 1, 4)
+    assert stats["max_drawdown"] == -300.0 and abs(stats["max_drawdown_pct"] + 300 / 10100) < 1e-12
+    assert stats["profit_factor"] == 550.0 / 300.0
+
+
+def test_equity_curve_drawdown_starts_from_starting_equity():
+    curve = equity_curve(pd.DataFrame({"pnl": [-50.0, 20.0]}), 1000.0)
+    assert curve["drawdown"].tolist() == [-50.0, -30.0]
+    assert curve["drawdown_pct"].tolist() == [-0.05, -0.03]
@@ -0,0 +1,91 @@
+import asyncio
+import sys
+import os
+from datetime import datetime
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.execution import executor as executor_module
+from src.execution.position_book import PositionBook
+from src.risk.portfolio_risk import PortfolioRisk
+
+
+def make_executor(monkeypatch, wallet=None, contract_values=None):
+    contract_values = contract_values or {"BTCUSD": 0.001, "ETHUSD": 0.01}
+    stored, orders = [], []
+
+    async def fake_store_trade(record):
+        stored.append(record)
+        return len(stored)
+
+    def fake_place_order(**order):
+        orders.append(order)
+        return {"result": order}
+
+    def fake_wallet():
+        if wallet is None:
+            raise ConnectionError("exchange down")
+        return wallet
+
+    monkeypatch.setattr(executor_module, "position_book", PositionBook(trailing=False))
+    monkeypatch.setattr(executor_module, "portfolio_risk", PortfolioRisk(capital=10000.0))
+    monkeypatch.setattr(executor_module.db_manager, "store_trade", fake_store_trade)
+    monkeypatch.setattr(executor_module.delta_client, "place_order", fake_place_order)
+    monkeypatch.setattr(executor_module.delta_client, "get_wallet_balance", fake_wallet)
+    monkeypatch.setattr(executor_module.delta_client, "_contract_values", dict(contract_values))
+    return executor_module.ExecutionEngine(), stored, orders
+
+
+def test_backtest_orders_are_sized_from_the_risk_budget(monkeypatch):
+    engine, stored, _ = make_executor(monkeypatch)
+    when = datetime(2024, 1, 1)
+
+    async def scenario():
+        await engine.execute_order("BTCUSD", "BUY", 0.9, 60000.0, 600.0, mode="BACKTEST", timestamp=when)
+        await engine.execute_order("ETHUSD", "SELL", 0.9, 3000.0, 30.0, mode="BACKTEST", timestamp=when)
+    asyncio.run(scenario())
+
+    assert [t["symbol"] for t in stored] == ["BTCUSD", "ETHUSD"]
+    for trade in stored:
+        # Never more than the 1x leverage cap, and well above a dust fill
+        notional = trade["quantity"] * trade["entry_price"]
+        assert 1000.0 < notional <= 10000.0
+    book = executor_module.position_book
+    assert book.get("BACKTEST", "BTCUSD").quantity == stored[0]["quantity"]
+
+
+def test_live_order_blocked_without_a_wallet_balance(monkeypatch):
+    engine, stored, orders = make_executor(monkeypatch, wallet=None)
+    asyncio.run(engine.execute_order("BTCUSD", "BUY", 0.9, 60000.0, 600.0, mode="LIVE"))
+    assert stored == [] and orders == []
+
+
+def test_live_order_sized_against_the_wallet(monkeypatch):
+    engine, stored, orders = make_executor(monkeypatch, wallet=2000.0)
+    asyncio.run(engine.execute_order("ETHUSD", "BUY", 0.9, 3000.0, 30.0, mode="LIVE"))
+    # The exchange gets whole contracts; the book records exactly what was sent
+    assert len(orders) == 1 and isinstance(orders[0]["quantity"], int) and orders[0]["quantity"] > 0
+    assert abs(stored[0]["quantity"] - orders[0]["quantity"] * 0.01) < 1e-9
+    assert stored[0]["quantity"] * 3000.0 <= 2000.0
+    assert executor_module.position_book.get("LIVE", "ETHUSD").quantity == stored[0]["quantity"]
+    assert stored[0]["entry_time"].tzinfo is not None
+
+
+def test_live_order_below_one_contract_is_skipped(monkeypatch):
+    engine, stored, orders = make_executor(monkeypatch, wallet=2000.0, contract_values={"ETHUSD": 1.0})
+    asyncio.run(engine.execute_order("ETHUSD", "BUY", 0.9, 3000.0, 30.0, mode="LIVE"))
+    assert stored == [] and orders == []
+
+
+def test_live_exit_sends_contracts(monkeypatch):
+    engine, stored, orders = make_executor(monkeypatch, wallet=2000.0)
+
+    async def scenario():
+        await engine.execute_order("ETHUSD", "BUY", 0.9, 3000.0, 30.0, mode="LIVE")
+        await engine.execute_order("ETHUSD", "SELL", 0.9, 3000.0, 30.0, mode="LIVE")
+        await asyncio.gather(*engine._exit_tasks)
+    asyncio.run(scenario())
+
+    exits = [o for o in orders if o["side"] == "sell"]
+    assert exits[0]["quantity"] == orders[0]["quantity"]
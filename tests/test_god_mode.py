@@ -43,6 +43,7 @@ async def test_god_mode_agents():
     # 4. Test News Agent (Requires Internet)
     logger.info("🤖 Testing NewsSentimentAgent (may take a few seconds)...")
     news_agent = NewsSentimentAgent()
+    await news_agent.feed.refresh(symbol)  # Normally done by the background ingestion
     signal = await news_agent.analyze(symbol, None)
     logger.info(f"   Signal: {signal}")
 
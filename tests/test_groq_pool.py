@@ -0,0 +1,203 @@
+import asyncio
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from types import SimpleNamespace
+
+from src.data.groq_client import GroqClient, LLMPriority, LLMShedError, LLMDeadlineError, parse_duration
+
+
+class FakeRaw:
+    def __init__(self, headers, content):
+        self.headers = headers
+        self._content = content
+
+    async def parse(self):
+        message = SimpleNamespace(content=self._content)
+        usage = SimpleNamespace(prompt_tokens=12, completion_tokens=3)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+class FakeGroq:
+    """Mimics AsyncGroq.chat.completions.with_raw_response.create."""
+    def __init__(self, name, delay=0.05, remaining=100):
+        self.name = name
+        self.delay = delay
+        self.remaining = remaining
+        self.active = 0
+        self.peak = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=SimpleNamespace(create=self.create)))
+
+    async def create(self, **params):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        self.remaining -= 1
+        headers = {
+            "x-ratelimit-remaining-requests": str(self.remaining),
+            "x-ratelimit-reset-requests": "1m0s",
+            "x-ratelimit-remaining-tokens": "5000",
+            "x-ratelimit-reset-tokens": "2.5s",
+        }
+        return FakeRaw(headers, self.name)
+
+
+def make_client(fakes, max_in_flight=2, **kwargs):
+    return GroqClient(max_in_flight_per_key=max_in_flight, clients=fakes, **kwargs)
+
+
+def test_parse_duration():
+    assert parse_duration("2m59.56s") == 179.56
+    assert parse_duration("250ms") == 0.25
+    assert parse_duration("7") == 7.0
+
+
+def test_concurrent_requests_spread_across_keys():
+    fakes = [FakeGroq("k0"), FakeGroq("k1"), FakeGroq("k2")]
+    client = make_client(fakes, max_in_flight=2)
+
+    async def run():
+        return await asyncio.gather(*[client.complete([{"role": "user", "content": "hi"}]) for _ in range(12)])
+
+    results = asyncio.run(run())
+    assert {r.message.content for r in results} == {"k0", "k1", "k2"}
+    assert all(f.peak <= 2 for f in fakes)
+    assert results[0].prompt_tokens == 12
+    assert client.rate_limits[0]["remaining_tokens"] == 5000
+
+
+def test_exhausted_key_is_skipped_without_blocking():
+    fakes = [FakeGroq("k0", remaining=1), FakeGroq("k1")]
+    client = make_client(fakes, max_in_flight=1)
+
+    async def run():
+        first = await client.complete([{"role": "user", "content": "hi"}])
+        # k0 reported 0 remaining requests for the next minute; everything must go to k1
+        rest = await asyncio.gather(*[client.complete([{"role": "user", "content": "hi"}]) for _ in range(3)])
+        return first, rest
+
+    first, rest = asyncio.run(run())
+    assert fakes[0].remaining == 0
+    assert sum(r.message.content == "k1" for r in [first, *rest]) >= 3
+
+
+def test_hedge_fires_on_slow_primary_and_cancels_loser():
+    slow, fast = FakeGroq("slow", delay=1.0), FakeGroq("fast", delay=0.02)
+    client = make_client([slow, fast], max_in_flight=1, hedge=True, hedge_default_delay=0.05)
+
+    async def run():
+        # Pin the primary to the slow key by occupying the fast one first
+        blocker = client.pool.try_acquire(exclude=[0])
+        task = asyncio.create_task(client.complete([{"role": "user", "content": "hi"}]))
+        await asyncio.sleep(0.01)
+        await client.pool.release(blocker)
+        result = await task
+        await asyncio.sleep(0)
+        return result
+
+    result = asyncio.run(run())
+    assert result.message.content == "fast" and result.hedged
+    assert client.hedges_won == 1
+    assert slow.active == 1  # cancelled mid-flight, never finished
+    assert all(k.in_flight == 0 for k in client.pool.keys)
+    assert client.latency_stats()["hedged"]["n"] == 1
+
+
+def test_cancelled_caller_does_not_orphan_hedged_requests():
+    slow, other = FakeGroq("slow", delay=1.0), FakeGroq("other", delay=1.0)
+    client = make_client([slow, other], max_in_flight=1, hedge=True, hedge_default_delay=0.5)
+
+    async def run():
+        # Cancelled while waiting on the primary (before any hedge), then during the hedge race
+        for timeout in (0.05, 0.6):
+            try:
+                await asyncio.wait_for(client.complete([{"role": "user", "content": "hi"}]), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.sleep(0)
+            assert all(k.in_flight == 0 for k in client.pool.keys)
+
+    asyncio.run(run())
+    assert client.hedges_fired == 1
+
+
+def test_hedge_skipped_when_no_spare_budget():
+    slow, other = FakeGroq("slow", delay=0.2), FakeGroq("other", remaining=2)
+    client = make_client([slow, other], max_in_flight=1, hedge=True, hedge_default_delay=0.05, hedge_reserve=2)
+    client.pool.keys[1].remaining_requests = 2
+
+    async def run():
+        blocker = client.pool.try_acquire(exclude=[0])
+        task = asyncio.create_task(client.complete([{"role": "user", "content": "hi"}]))
+        await asyncio.sleep(0.01)
+        await client.pool.release(blocker)
+        return await task
+
+    assert asyncio.run(run()).message.content == "slow"
+    assert client.hedges_skipped == 1 and client.hedges_fired == 0
+
+
+def test_waiters_served_by_priority():
+    client = make_client([FakeGroq("k0", delay=0.05)], max_in_flight=1)
+    messages = [{"role": "user", "content": "hi"}]
+    order = []
+
+    async def call(priority):
+        await client.complete(messages, priority=priority)
+        order.append(priority)
+
+    async def main():
+        busy = asyncio.create_task(call(LLMPriority.PAPER_DECISION))
+        await asyncio.sleep(0.01)
+        tasks = []
+        for p in (LLMPriority.BACKTEST, LLMPriority.NEWS, LLMPriority.LIVE_DECISION):
+            tasks.append(asyncio.create_task(call(p)))
+            await asyncio.sleep(0)
+        await asyncio.gather(busy, *tasks)
+
+    asyncio.run(main())
+    assert order == [LLMPriority.PAPER_DECISION, LLMPriority.LIVE_DECISION, LLMPriority.NEWS, LLMPriority.BACKTEST]
+    stats = client.queue_stats()
+    assert stats["BACKTEST"]["n"] == 1
+    assert stats["BACKTEST"]["p50_ms"] > stats["LIVE_DECISION"]["p50_ms"]
+
+
+def test_low_headroom_sheds_news_but_serves_live():
+    client = make_client([FakeGroq("k0")])
+    key = client.pool.keys[0]
+    key.limit_requests, key.remaining_requests, key.reset_requests_at = 100, 5, 1e12
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def main():
+        try:
+            await client.complete(messages, priority=LLMPriority.NEWS)
+            assert False, "NEWS should have been shed"
+        except LLMShedError:
+            pass
+        return await client.complete(messages, priority=LLMPriority.LIVE_DECISION)
+
+    assert asyncio.run(main()).message.content == "k0"
+    assert client.queue_stats()["NEWS"]["shed"] == 1
+
+
+def test_deadline_expires_while_queued():
+    client = make_client([FakeGroq("k0", delay=0.3)], max_in_flight=1)
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def main():
+        busy = asyncio.create_task(client.complete(messages))
+        await asyncio.sleep(0.01)
+        try:
+            await client.complete(messages, priority=LLMPriority.LIVE_DECISION, deadline=0.05)
+            assert False, "should not have been admitted"
+        except LLMDeadlineError:
+            pass
+        await busy
+
+    asyncio.run(main())
+    assert client.queue_stats()["LIVE_DECISION"]["expired"] == 1
+    assert client.pool._waiters == []
@@ -0,0 +1,62 @@
+import asyncio
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime, timezone
+
+from src.learning import judge as judge_module
+from src.learning.judge import TheJudge
+
+
+def row(trade_id, agent, signal, direction="BUY", pnl=10.0, exit_time=datetime(2024, 1, 1, tzinfo=timezone.utc), seq=None):
+    return {
+        "id": trade_id, "closed_seq": seq or trade_id, "direction": direction, "profit_loss": pnl,
+        "exit_time": exit_time, "agent_name": agent, "signal": signal,
+    }
+
+
+def test_apply_verdicts_rewards_and_punishes(tmp_path):
+    judge = TheJudge(weights_path=str(tmp_path / "w.json"), state_path=str(tmp_path / "s.json"))
+    rows = [
+        row(1, "Trend", "BUY"),                 # agreed, won  -> +0.1
+        row(1, "Whale", "SELL"),                # opposed, won -> -0.1
+        row(1, "Tech", "ANALYSIS"),             # no view      -> 0
+        row(2, "Trend", "BUY", pnl=-5.0),       # agreed, lost -> -0.1
+        row(2, "Whale", "SELL", pnl=-5.0),      # opposed, lost -> +0.05
+        row(2, "MainBrain", "BUY", pnl=-5.0),   # not a juror
+        row(3, None, None),                     # trade without votes
+    ]
+    weights = judge.apply_verdicts({"Whale": 0.12}, rows)
+
+    assert weights["Trend"] == 1.0
+    assert abs(weights["Whale"] - 0.1) < 1e-9   # clipped at the floor
+    assert weights["Tech"] == 1.0
+    assert "MainBrain" not in weights
+
+
+def test_review_follows_close_order_not_exit_time(tmp_path, monkeypatch):
+    judge = TheJudge(weights_path=str(tmp_path / "w.json"), state_path=str(tmp_path / "s.json"))
+    closes = [
+        row(7, "Trend", "BUY", exit_time=datetime(2024, 6, 1, tzinfo=timezone.utc), seq=1),  # Paper close
+        row(3, "Trend", "BUY", exit_time=datetime(2023, 1, 1, tzinfo=timezone.utc), seq=2),  # Later backtest close
+    ]
+    calls = []
+    visible = 1
+
+    async def fake_votes(after_seq, limit=500):
+        calls.append(after_seq)
+        return [r for r in closes[:visible] if r["closed_seq"] > after_seq]
+
+    monkeypatch.setattr(judge_module.db_manager, "get_closed_trade_votes", fake_votes)
+
+    assert asyncio.run(judge.review_performance()) == 1
+    visible = 2
+    # The backtest trade exited "before" the paper one but closed after it: still reviewed
+    assert asyncio.run(judge.review_performance()) == 1
+    assert asyncio.run(judge.review_performance()) == 0
+    assert calls[-1] == 2
+    assert abs(judge.load_weights()["Trend"] - 1.2) < 1e-9
+
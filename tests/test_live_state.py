@@ -0,0 +1,107 @@
+import asyncio
+import json
+import sys
+import os
+
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.base_agent import Signal
+from src.dashboard.data import LiveStateClient
+from src.execution.position_book import PositionBook
+from src.monitoring.live_state import LiveState, StateServer
+
+
+def sig(agent, symbol, action, confidence, **metadata):
+    return Signal(agent_name=agent, symbol=symbol, action=action, confidence=confidence, metadata=metadata)
+
+
+def test_state_tracks_signals_decisions_and_positions():
+    state = LiveState(max_decisions=2)
+    book = PositionBook()
+    book.on_open(state.record_position)
+    book.on_close(state.record_position)
+
+    state.record_signals("BTCUSD", [sig("TrendAgent", "BTCUSD", "BUY", 0.8), sig("RSIAgent", "BTCUSD", "SELL", np.float64(0.4))])
+    for action in ("BUY", "SELL", "BUY"):
+        state.record_decision(sig("MainBrain", "BTCUSD", action, 0.9, reasoning="x" * 500, model="m"))
+    p = book.open("BTCUSD", "BUY", 100.0, 1.0, atr=float("nan"), mode="PAPER")
+
+    snap = json.loads(state.snapshot_json())
+    assert snap["signals"]["BTCUSD"] == {"TrendAgent": ["BUY", 0.8], "RSIAgent": ["SELL", 0.4]}
+    assert [d["action"] for d in snap["recent_decisions"]] == ["SELL", "BUY"]
+    assert len(snap["decisions"]["BTCUSD"]["reasoning"]) == 280
+    assert snap["positions"]["PAPER:BTCUSD"]["stop_loss"] is None  # NaN stays valid JSON
+
+    # Serialized once per version
+    assert state.snapshot_json() is state.snapshot_json()
+    book.close(p, 101.0)
+    assert json.loads(state.snapshot_json())["positions"] == {}
+
+
+async def _read_events(reader, n):
+    events = []
+    event = None
+    while len(events) < n:
+        line = (await asyncio.wait_for(reader.readline(), 2)).decode().rstrip("\n")
+        if line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            events.append((event, line[5:].strip()))
+    return events
+
+
+def test_server_serves_state_and_streams_patches():
+    async def scenario():
+        state = LiveState()
+        server = StateServer(state, port=0)
+        await server.start()
+        try:
+            state.set_status(phase="analyzing", symbols=3)
+
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(b"GET /state HTTP/1.1\r\nHost: x\r\n\r\n")
+            response = await reader.read()
+            writer.close()
+            assert response.startswith(b"HTTP/1.1 200")
+            assert json.loads(response.split(b"\r\n\r\n", 1)[1])["status"]["phase"] == "analyzing"
+
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(b"GET /events HTTP/1.1\r\nHost: x\r\n\r\n")
+            mirror = LiveStateClient(url="http://unused")
+            (event, data), = await _read_events(reader, 1)
+            mirror.handle(event, data)
+
+            state.record_timings({"fetch": 0.5, "total": 1.25})
+            state.record_decision(sig("MainBrain", "ETHUSD", "SELL", 0.85))
+            for event, data in await _read_events(reader, 3):
+                assert event == "patch"
+                mirror.handle(event, data)
+            writer.close()
+
+            assert mirror.state() == json.loads(state.snapshot_json())
+            assert state.stats()["subscribers"] <= 1
+        finally:
+            await server.stop()
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_is_resynced_with_a_snapshot():
+    async def scenario():
+        state = LiveState(max_queue=2)
+        server = StateServer(state, port=0)
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(b"GET /events HTTP/1.1\r\n\r\n")
+            await _read_events(reader, 1)
+            for i in range(5):  # Published without yielding: the queue overflows
+                state.set_status(cycle=i)
+            (event, data), = await _read_events(reader, 1)
+            assert event == "state" and json.loads(data)["status"]["cycle"] == 4
+            writer.close()
+        finally:
+            await server.stop()
+    asyncio.run(scenario())
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from types import SimpleNamespace
+
+from src.agents import main_brain as brain_module
+from src.agents.base_agent import Signal
+from src.agents.main_brain import MainBrain
+
+
+def conflicting(symbol):
+    return [
+        Signal(agent_name="TrendFollowingAgent", symbol=symbol, action="BUY", confidence=0.8),
+        Signal(agent_name="WhaleMovementAgent", symbol=symbol, action="SELL", confidence=0.9),
+    ]
+
+
+def quiet(symbol):
+    return [Signal(agent_name="SessionAgent", symbol=symbol, action="NEUTRAL", confidence=0.0)]
+
+
+def test_analyze_many_batches_and_falls_back(monkeypatch):
+    prompts = []
+
+    async def fake_complete(messages, **kwargs):
+        prompt = messages[0]["content"]
+        prompts.append(prompt)
+        if "JSON array" in prompt:
+            # Answer for AAA only, and garbage for BBB
+            answer = [{"symbol": "AAA", "action": "BUY", "confidence": 0.9, "reasoning": "trend"},
+                      {"symbol": "BBB", "action": "MOON", "confidence": 2}]
+            content = "```json\n" + json.dumps(answer) + "\n```"
+        else:
+            content = '{"action": "SELL", "confidence": 0.6, "reasoning": "single"}'
+        return SimpleNamespace(message=SimpleNamespace(content=content), model="test-model", prompt_tokens=100, completion_tokens=20)
+
+    monkeypatch.setattr(brain_module.groq_client, "complete", fake_complete)
+
+    brain = MainBrain()
+    decisions = asyncio.run(brain.analyze_many({"AAA": conflicting("AAA"), "BBB": conflicting("BBB"), "CCC": quiet("CCC")}))
+
+    assert decisions["CCC"].metadata["source"] == "consensus"
+    assert (decisions["AAA"].action, decisions["AAA"].metadata["source"]) == ("BUY", "llm_batch")
+    assert (decisions["BBB"].action, decisions["BBB"].metadata["source"]) == ("SELL", "llm")
+    assert len(prompts) == 2
+    assert decisions["BBB"].metadata["usage"]["prompt_tokens"] == 100
+    assert decisions["AAA"].metadata["model"] == decisions["BBB"].metadata["model"] == "test-model"
+    assert brain.usage_stats()["requests"] == 2
+
+
+def test_chunks_respect_token_budget():
+    brain = MainBrain(batch_token_budget=600)
+    escalated = {f"SYM{i}": conflicting(f"SYM{i}") for i in range(20)}
+    chunks = brain._chunk(escalated)
+
+    assert sum(len(c) for c in chunks) == 20
+    assert len(chunks) > 1
+    for chunk in chunks[:-1]:
+        assert len(brain._batch_prompt(chunk)) // 4 + brain.tokens_per_answer * len(chunk) <= 600 + 50
+
+
+def test_prompt_builder_drops_placeholders_and_orders_by_weight():
+    brain = MainBrain()
+    brain.gate.update_weights({"WhaleMovementAgent": 2.0, "TrendFollowingAgent": 0.5})
+    signals = conflicting("BTCUSD") + [
+        Signal(agent_name="SentimentAggregationAgent", symbol="BTCUSD", action="NEUTRAL", confidence=0.5,
+               metadata={"status": "Aggregating Social Sentiment (Pending Twitter API)", "placeholder": True}),
+        Signal(agent_name="TechnicalAnalysisAgent", symbol="BTCUSD", action="ANALYSIS", confidence=1.0,
+               metadata={"rsi": 28.123456789, "atr": float("nan")}),
+        Signal(agent_name="PatternRecognitionAgent", symbol="BTCUSD", action="BUY", confidence=0.6,
+               metadata={"status": "pending breakout, no data gaps"}),  # Real view, whatever the wording
+    ]
+    summary = brain._summarize(signals)
+
+    assert "Social Sentiment" not in summary and "placeholder" not in summary
+    assert "pending breakout" in summary
+    assert "rsi=28.12" in summary and "atr" not in summary
+    assert summary.index("WhaleMovement") < summary.index("TrendFollowing")
+    assert brain._summarize(signals, token_budget=12).count("\n") == 0
@@ -0,0 +1,99 @@
+import asyncio
+import sys
+import os
+
+import pytest
+import requests
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data.delta_client import DeltaClient
+from src.monitoring.live_state import LiveState, StateServer
+from src.monitoring.metrics import HTTP_ERRORS, HTTP_SECONDS, Metrics
+
+
+def test_prometheus_text_format():
+    m = Metrics()
+    requests_total = m.counter("jarvis_requests_total", "Requests", ("endpoint",))
+    latency = m.histogram("jarvis_latency_seconds", "Latency", ("agent",), buckets=(0.1, 1.0))
+    depth = m.gauge("jarvis_depth", "Depth")
+    depth.set_function(lambda: 7)
+
+    requests_total.labels('/v2/"x"').inc()
+    requests_total.labels('/v2/"x"').inc(2)
+    for v in (0.05, 0.1, 0.5, 3.0):
+        latency.labels("Trend").observe(v)
+
+    lines = m.render().splitlines()
+    assert "# TYPE jarvis_requests_total counter" in lines
+    assert 'jarvis_requests_total{endpoint="/v2/\\"x\\""} 3' in lines
+    assert 'jarvis_latency_seconds_bucket{agent="Trend",le="0.1"} 2' in lines
+    assert 'jarvis_latency_seconds_bucket{agent="Trend",le="1"} 3' in lines
+    assert 'jarvis_latency_seconds_bucket{agent="Trend",le="+Inf"} 4' in lines
+    assert 'jarvis_latency_seconds_count{agent="Trend"} 4' in lines
+    assert "jarvis_depth 7" in lines
+
+    summary = m.summary()["jarvis_latency_seconds"]["Trend"]
+    assert summary["n"] == 4 and 0.1 <= summary["p50"] <= 1.0
+
+    with pytest.raises(ValueError):
+        latency.labels("Trend", "extra")
+
+
+def test_nan_values_render_as_nan():
+    m = Metrics()
+    m.gauge("jarvis_ratio", "Ratio").set_function(lambda: float("nan"))
+    m.counter("jarvis_total", "Total").inc()
+    lines = m.render().splitlines()
+    assert "jarvis_ratio NaN" in lines and "jarvis_total 1" in lines
+
+
+def test_disabled_metrics_are_noops():
+    m = Metrics(enabled=False)
+    latency = m.histogram("jarvis_latency_seconds", "Latency", ("agent",))
+    with latency.time("Trend"):
+        pass
+    latency.labels("Trend").observe(1.0)
+    m.counter("jarvis_total", "Total").inc()
+    assert latency.children == {}
+    assert m.render() == "\n"
+
+
+def test_metrics_route_on_state_server():
+    async def scenario():
+        m = Metrics()
+        m.counter("jarvis_cycles_total", "Cycles").inc()
+        server = StateServer(LiveState(), port=0)
+        server.route("/metrics", m.handle)
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(b"GET /metrics HTTP/1.1\r\n\r\n")
+            response = await reader.read()
+            writer.close()
+        finally:
+            await server.stop()
+        head, body = response.split(b"\r\n\r\n", 1)
+        assert b"text/plain; version=0.0.4" in head
+        assert b"jarvis_cycles_total 1" in body.splitlines()
+    asyncio.run(scenario())
+
+
+def test_delta_requests_are_timed_and_errors_counted(monkeypatch):
+    class Response:
+        status_code = 429
+        text = "slow down"
+
+        def raise_for_status(self):
+            raise requests.exceptions.HTTPError("429", response=self)
+
+    client = DeltaClient()
+    monkeypatch.setattr(client.session, "request", lambda *a, **k: Response())
+    timed = HTTP_SECONDS.labels("GET", "/v2/tickers").count
+    errors = HTTP_ERRORS.labels("/v2/tickers", "429").value
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.get_ticker("BTCUSD")
+    assert HTTP_SECONDS.labels("GET", "/v2/tickers").count == timed + 1
+    assert HTTP_ERRORS.labels("/v2/tickers", "429").value == errors + 1
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import sys
+import os
+
+import pytest
+import requests
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.mock_exchange import Faults, MockExchange, MockMarket
+from src.data.delta_client import DeltaClient
+from src.data.panel import candles_frame
+from src.data.websocket_client import WebSocketClient
+
+
+def run_with_exchange(scenario, **kwargs):
+    async def main():
+        exchange = MockExchange(MockMarket.synthetic(n_symbols=5, length=300, seed=1), **kwargs)
+        await exchange.start()
+        try:
+            return await scenario(exchange)
+        finally:
+            await exchange.stop()
+    return asyncio.run(main())
+
+
+def signed_client(exchange, secret="s3cret"):
+    client = DeltaClient(base_url=exchange.base_url)
+    client.api_key, client.api_secret = "key", secret
+    return client
+
+
+def test_rest_endpoints_serve_the_engine():
+    async def scenario(exchange):
+        client = signed_client(exchange)
+        products = (await asyncio.to_thread(client.get_products))["result"]
+        symbol = products[0]["symbol"]
+        ticker = await asyncio.to_thread(client.get_ticker, symbol)
+        history = await asyncio.to_thread(client.get_history, symbol, "1h", limit=50)
+        order = await asyncio.to_thread(client.place_order, symbol, "buy", "market_order", 2)
+        balances = await asyncio.to_thread(client.get_balances)
+
+        assert len(products) == 5 and all(p["contract_type"] == "perpetual_futures" for p in products)
+        assert ticker["close"] == exchange.market.prices[symbol]
+        df = candles_frame(history["result"])
+        assert len(df) == 50 and (df["time"].diff().dropna() == 3600).all()
+        assert df["close"].iloc[-1] == exchange.market.prices[symbol]  # Forming candle tracks the live price
+        assert order["result"]["size"] == 2 and exchange.orders[0]["product_symbol"] == symbol
+        assert balances["result"][0]["balance"] == "10000.00"
+
+        # A wrong secret fails the signature check
+        with pytest.raises(requests.exceptions.HTTPError, match="401"):
+            await asyncio.to_thread(signed_client(exchange, "wrong").get_balances)
+    run_with_exchange(scenario, api_secret="s3cret")
+
+
+def test_injected_errors_rate_limits_and_latency():
+    async def scenario(exchange):
+        client = DeltaClient(base_url=exchange.base_url)
+        symbol = exchange.market.symbols[0]
+        await asyncio.to_thread(client.get_ticker, symbol)
+        with pytest.raises(requests.exceptions.HTTPError, match="429"):
+            await asyncio.to_thread(client.get_ticker, symbol)
+
+        # Faults can be changed while running
+        await asyncio.to_thread(requests.post, f"{exchange.base_url}/_mock/faults",
+                                json={"rate_limit": 0, "error_rate": 1.0, "latency": 0.05})
+        with pytest.raises(requests.exceptions.HTTPError, match="500"):
+            await asyncio.to_thread(client.get_ticker, symbol)
+        stats = (await asyncio.to_thread(requests.get, f"{exchange.base_url}/_mock/stats")).json()
+        assert stats["requests"]["rate_limited"] == 1 and stats["requests"]["errors_injected"] == 1
+        assert stats["latency_injected"] >= 0.05
+    run_with_exchange(scenario, faults=Faults(rate_limit=0.01, burst=1, seed=0))
+
+
+def test_websocket_feed_reaches_subscribers():
+    async def scenario(exchange):
+        client = WebSocketClient(url=exchange.ws_url)
+        ticks = []
+
+        async def on_tick(data):
+            ticks.append(data)
+
+        client.on_message("v2/ticker", on_tick)
+        await client.connect()
+        symbols = exchange.market.symbols[:2]
+        await client.subscribe("v2/ticker", symbols)
+        for _ in range(100):
+            if len(ticks) >= 20:
+                break
+            await asyncio.sleep(0.02)
+        await client.disconnect()
+
+        assert len(ticks) >= 20
+        assert {t["symbol"] for t in ticks} == set(symbols)
+        assert exchange.ws_sent >= len(ticks)
+    run_with_exchange(scenario, message_rate=1000.0)
+
+
+def test_market_recording_round_trip(tmp_path):
+    market = MockMarket.synthetic(n_symbols=2, length=30, seed=4)
+    path = tmp_path / "market.json"
+    market.dump(str(path))
+    loaded = MockMarket.load(str(path))
+    assert loaded.symbols == market.symbols
+    symbol = market.symbols[0]
+    assert [c["close"] for c in loaded.history(symbol, "1h", None, None, 10)] == \
+        [c["close"] for c in market.history(symbol, "1h", None, None, 10)]
+    assert json.loads(path.read_text())["resolution"] == 3600
@@ -0,0 +1,86 @@
+import asyncio
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data.model_router import ModelRouter, ModelSpec
+
+MODELS = [
+    ModelSpec("big", 120, 8000, 3.0),
+    ModelSpec("medium", 70, 8000, 1.5),
+    ModelSpec("small", 8, 8000, 0.4),
+]
+
+
+def test_picks_largest_model_within_latency_budget():
+    router = ModelRouter(MODELS)
+    assert router.select() == "big"
+    assert router.select(latency_budget=2.0) == "medium"
+    assert router.select(latency_budget=0.1) == "small"  # Nothing fits -> smallest
+
+    # The big model turns out faster than its prior
+    for _ in range(20):
+        router.record("big", latency=1.0, tokens=10)
+    assert router.select(latency_budget=2.0) == "big"
+
+
+def test_degrades_on_errors_quota_and_low_headroom():
+    router = ModelRouter(MODELS)
+    for _ in range(5):
+        router.record("big", error=True)
+    assert router.select() == "medium"
+
+    router.record("medium", latency=1.0, tokens=7500)
+    assert router.select(est_tokens=500) == "small"
+    assert router.select(est_tokens=500, n_keys=2) == "medium"  # Two keys double the budget
+
+    fresh = ModelRouter(MODELS)
+    assert fresh.select(headroom=0.05) == "medium"
+    assert fresh.snapshot()["medium"]["picks"] == 1
+
+
+def test_groq_client_routes_and_reports_model():
+    from tests.test_groq_pool import FakeGroq, make_client
+
+    client = make_client([FakeGroq("k0")], router=ModelRouter(MODELS))
+    completion = asyncio.run(client.complete([{"role": "user", "content": "hi"}], latency_budget=2.0))
+
+    assert completion.model == "medium"
+    assert client.model_stats()["medium"]["calls"] == 1
+    assert client.model_stats()["medium"]["tokens_1m"] == 15
+
+
+def test_error_rate_decays_so_a_skipped_model_is_retried():
+    router = ModelRouter(MODELS, error_half_life=30.0)
+    router.record("big", error=True)
+    router.record("big", error=True)
+    assert router.select() == "medium"
+
+    # Nothing calls the big model while it is skipped; time alone brings it back
+    router.stats["big"].error_time -= 60.0
+    assert router.select() == "big"
+    assert router.snapshot()["big"]["error_rate"] < 0.3
+
+
+def test_key_rate_limits_do_not_count_against_the_model():
+    import httpx
+    from groq import RateLimitError
+    from tests.test_groq_pool import FakeGroq, make_client
+
+    class LimitedOnce(FakeGroq):
+        async def create(self, **params):
+            if not self.remaining_limits:
+                return await super().create(**params)
+            self.remaining_limits -= 1
+            response = httpx.Response(429, headers={"retry-after": "1"}, request=httpx.Request("POST", "http://groq"))
+            raise RateLimitError("rate limited", response=response, body=None)
+
+    limited = LimitedOnce("k0")
+    limited.remaining_limits = 1
+    client = make_client([limited, FakeGroq("k1")], router=ModelRouter(MODELS))
+    completion = asyncio.run(client.complete([{"role": "user", "content": "hi"}]))
+
+    assert completion.model == "big" and completion.key_index == 1
+    assert client.model_stats()["big"]["error_rate"] == 0.0
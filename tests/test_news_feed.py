@@ -0,0 +1,70 @@
+import asyncio
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.news_agent import NewsSentimentAgent
+from src.data.news_feed import FileNewsSource, NewsIngestor, StaticNewsSource, TTLCache
+
+
+class CountingIngestor(NewsIngestor):
+    def __init__(self, source, verdicts):
+        super().__init__(source)
+        self.verdicts = verdicts
+        self.scored_batches = []
+
+    async def score(self, symbol, headlines):
+        self.scored_batches.append(list(headlines))
+        sentiment, confidence = self.verdicts.pop(0)
+        return {"sentiment": sentiment, "confidence": confidence, "summary": "s", "headlines": headlines}
+
+
+def test_only_new_headlines_are_scored_and_blended():
+    source = StaticNewsSource({"BTCUSD": ["ETF approved: flows surge", "Exchange hacked"]})
+    feed = CountingIngestor(source, [("BULLISH", 0.8), ("BEARISH", 0.8)])
+
+    async def main():
+        first = await feed.refresh("BTCUSD")
+        # Same headlines (modulo case/whitespace) -> no LLM call
+        source.headlines["BTCUSD"] = ["etf approved:  flows surge", "Exchange hacked"]
+        again = await feed.refresh("BTCUSD")
+        source.headlines["BTCUSD"].append("Miners capitulate")
+        third = await feed.refresh("BTCUSD")
+        return first, again, third
+
+    first, again, third = asyncio.run(main())
+    assert feed.scored_batches == [["ETF approved: flows surge", "Exchange hacked"], ["Miners capitulate"]]
+    assert feed.duplicates == 4
+    assert (first["action"], first["confidence"]) == ("BUY", 0.8)
+    assert again is first
+    # Previous weight 2 * 0.5 = 1 against one new bearish headline -> flat
+    assert third["action"] == "NEUTRAL" and third["headline_count"] == 3
+
+
+def test_agent_is_a_cache_lookup():
+    feed = CountingIngestor(StaticNewsSource({"ETHUSD": ["Upgrade ships"]}), [("BEARISH", 0.6)])
+    agent = NewsSentimentAgent(feed=feed)
+
+    async def main():
+        before = await agent.analyze("ETHUSD")
+        await feed.refresh_all()
+        return before, await agent.analyze("ETHUSD")
+
+    before, after = asyncio.run(main())
+    assert before.action == "NEUTRAL" and before.confidence == 0.0
+    assert "ETHUSD" in feed.symbols
+    assert (after.action, after.confidence) == ("SELL", 0.6)
+
+
+def test_ttl_cache_expiry_and_file_source(tmp_path):
+    cache = TTLCache(ttl=-1)
+    cache.set("A", 1)
+    assert cache.get("A") is None
+
+    path = tmp_path / "news.jsonl"
+    path.write_text(json.dumps({"symbol": "btcusd", "title": "Halving", "description": "supply cut"}) + "\n\nnot json\n")
+    headlines = asyncio.run(FileNewsSource(str(path)).fetch("BTCUSD"))
+    assert headlines == ["Halving: supply cut"]
@@ -0,0 +1,87 @@
+import sys
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.execution.position_book import PositionBook
+from src.risk.portfolio_risk import PortfolioRisk
+
+
+def make_engine(**kwargs):
+    risk = PortfolioRisk(capital=10000.0, **kwargs)
+    book = PositionBook(trailing=False)
+    book.on_open(risk.on_open)
+    book.on_close(risk.on_close)
+    return risk, book
+
+
+def test_small_order_passes_untouched():
+    risk, _ = make_engine()
+    decision = risk.check_order("BTCUSD", "BUY", 0.01, 100000.0, mode="PAPER")
+    assert decision.approved and decision.quantity == 0.01 and decision.reason == "OK"
+
+
+def test_concentration_resizes_order():
+    risk, _ = make_engine(max_var=1.0)
+    # 50% of 10k equity -> at most 5000 notional in one symbol
+    decision = risk.check_order("BTCUSD", "BUY", 1.0, 10000.0, mode="PAPER")
+    assert decision.approved and decision.reason == "CONCENTRATION"
+    assert decision.quantity == 0.5
+
+
+def test_gross_exposure_counts_open_positions():
+    risk, book = make_engine(max_var=10.0, max_net=10.0)
+    for symbol in ("A", "B", "C", "D", "E"):
+        book.open(symbol, "BUY", 100.0, 50.0, atr=1.0, mode="PAPER")  # 5000 notional each
+    # 25k gross of the 30k allowed: only 5k more fits
+    decision = risk.check_order("F", "SELL", 100.0, 100.0, mode="PAPER")
+    assert decision.reason == "GROSS" and decision.quantity == 50.0
+    # Other modes keep their own book
+    assert risk.check_order("F", "SELL", 10.0, 100.0, mode="LIVE").reason == "OK"
+
+
+def test_correlated_positions_tighten_var_and_hedges_free_it():
+    risk, book = make_engine(max_gross=100.0, max_net=100.0, max_concentration=100.0)
+    risk.set_risk_model(["BTCUSD", "ETHUSD"], np.array([0.05, 0.05]), np.array([[1.0, 0.9], [0.9, 1.0]]))
+    book.open("BTCUSD", "BUY", 100.0, 30.0, atr=1.0, mode="PAPER")   # 3000 long
+
+    same_way = risk.check_order("ETHUSD", "BUY", 100.0, 100.0, mode="PAPER")
+    hedge = risk.check_order("ETHUSD", "SELL", 100.0, 100.0, mode="PAPER")
+    assert same_way.reason == "VAR" and hedge.quantity > same_way.quantity
+
+    # The approved size sits exactly on the VaR limit (5% of equity)
+    e = np.zeros(len(risk.price))
+    e[risk.slot("BTCUSD")] = 3000.0
+    e[risk.slot("ETHUSD")] = same_way.quantity * 100.0
+    assert abs(risk.z * np.sqrt(e @ risk.cov @ e) - 500.0) < 1e-2
+
+
+def test_daily_loss_blocks_until_next_day():
+    risk, book = make_engine()
+    day = datetime(2024, 1, 1, 12)
+    p = book.open("BTCUSD", "BUY", 100.0, 10.0, atr=1.0, mode="BACKTEST", entry_time=day)
+    book.close(p, 40.0, day)  # -600, 6% of the starting 10k
+    assert risk.daily_pnl("BACKTEST") == -600.0
+
+    assert not risk.check_order("ETHUSD", "BUY", 1.0, 100.0, mode="BACKTEST", timestamp=day).approved
+    next_day = risk.check_order("ETHUSD", "BUY", 1.0, 100.0, mode="BACKTEST", timestamp=day + timedelta(days=1))
+    assert next_day.approved
+    assert risk.portfolio("BACKTEST").capital == 9400.0
+
+
+def test_risk_model_from_returns_and_slot_growth():
+    risk = PortfolioRisk(capacity=2)
+    rng = np.random.default_rng(0)
+    base = rng.normal(0, 0.01, 200)
+    returns = np.vstack([base, base + rng.normal(0, 0.001, 200), rng.normal(0, 0.01, 200)])
+    symbols = ["BTCUSD", "ETHUSD", "XRPUSD"]
+    risk.update_from_returns(symbols, returns)
+
+    i, j, k = (risk.slot(s) for s in symbols)
+    assert len(risk.price) >= 3
+    assert risk.corr[i, j] > 0.95 and abs(risk.corr[i, k]) < 0.3
+    assert abs(risk.vol[i] - base.std(ddof=1) * np.sqrt(24)) < 1e-9
@@ -0,0 +1,127 @@
+import asyncio
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.execution import position_book as book_module
+from src.execution.position_book import PositionBook
+
+
+def test_long_stop_and_trailing_exit():
+    book = PositionBook(take_profit_r=3.0)
+    # ATR 5 -> stop 10 below (2x ATR), target 30 above
+    p = book.open("BTCUSD", "BUY", 100.0, 2.0, atr=5.0, mode="PAPER", trade_id=1)
+    assert (p.stop_loss, p.take_profit) == (90.0, 130.0)
+
+    assert book.on_price("BTCUSD", 95.0) == []
+    assert book.on_price("BTCUSD", 115.0) == []
+    assert p.stop_loss == 105.0  # Trailed up
+
+    closed = book.on_price("BTCUSD", 104.0)
+    assert closed == [p]
+    assert (p.exit_reason, p.exit_price, p.profit_loss) == ("TRAILING_STOP", 104.0, 8.0)
+    assert book.get("PAPER", "BTCUSD") is None and book.symbols() == set()
+
+
+def test_short_take_profit_on_candle_and_other_mode_untouched():
+    book = PositionBook(take_profit_r=1.0, trailing=False)
+    short = book.open("ETHUSD", "SELL", 50.0, 1.0, atr=1.0, mode="BACKTEST")
+    other = book.open("SOLUSD", "BUY", 10.0, 1.0, atr=1.0, mode="BACKTEST")
+
+    closed = book.on_price("ETHUSD", 49.0, high=50.5, low=47.5)
+    assert closed == [short]
+    assert (short.exit_reason, short.exit_price, short.profit_loss) == ("TAKE_PROFIT", 48.0, 2.0)
+    assert book.get("BACKTEST", "SOLUSD") is other
+
+
+def test_closes_are_persisted_in_batches(monkeypatch):
+    written = []
+
+    async def fake_close_trades(records):
+        written.append(list(records))
+
+    monkeypatch.setattr(book_module.db_manager, "close_trades", fake_close_trades)
+    book = PositionBook(batch_size=2)
+    seen = []
+    book.on_close(seen.append)
+    for i, symbol in enumerate(["A", "B", "C"]):
+        book.open(symbol, "BUY", 100.0, 1.0, atr=1.0, mode="PAPER", trade_id=i + 1)
+        book.on_price(symbol, 50.0)
+
+    asyncio.run(book.stop())
+    assert [[r[0] for r in batch] for batch in written] == [[1, 2], [3]]
+    assert len(seen) == 3 and book.stats()["pending_writes"] == 0
+
+
+def test_ticker_callback_exits_immediately():
+    book = PositionBook()
+    p = book.open("BTCUSD", "SELL", 100.0, 1.0, atr=1.0, mode="LIVE")
+    asyncio.run(book.on_ticker({"type": "v2/ticker", "symbol": "BTCUSD", "mark_price": "103.5"}))
+    # Gap through the stop on a tick fills at the printed price
+    assert (p.exit_reason, p.exit_price) == ("STOP_LOSS", 103.5)
+
+
+def test_open_trades_are_restored_with_their_stops(monkeypatch):
+    from datetime import datetime, timezone
+    entered = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        {"id": 7, "symbol": "BTCUSD", "direction": "BUY", "mode": "PAPER", "entry_price": 100.0,
+         "quantity": 2.0, "entry_time": entered, "atr": 5.0},
+        {"id": 8, "symbol": "ETHUSD", "direction": "SELL", "mode": "LIVE", "entry_price": 50.0,
+         "quantity": 1.0, "entry_time": entered, "atr": None},  # Stored before ATRs were recorded
+    ]
+    requested, closed_in_db = [], []
+
+    async def fake_open_trades(modes):
+        requested.append(modes)
+        return rows
+
+    async def fake_close_trades(records):
+        closed_in_db.extend(records)
+
+    monkeypatch.setattr(book_module.db_manager, "get_open_trades", fake_open_trades)
+    monkeypatch.setattr(book_module.db_manager, "close_trades", fake_close_trades)
+    book = PositionBook(take_profit_r=2.0, trailing=False)
+    opened = []
+    book.on_open(opened.append)
+    restored = asyncio.run(book.restore())
+
+    assert requested == [["PAPER", "LIVE"]] and len(restored) == 2
+    assert opened == [] and closed_in_db == []  # Nothing happened on the exchange
+    btc = book.get("PAPER", "BTCUSD")
+    assert (btc.trade_id, btc.entry_time, btc.stop_loss, btc.take_profit) == (7, entered, 90.0, 120.0)
+    eth = book.get("LIVE", "ETHUSD")
+    assert eth.stop_loss == 52.0  # 2% of the entry as the ATR
+
+    # Exits fire again
+    assert book.on_price("BTCUSD", 89.0) == [btc] and btc.exit_reason == "STOP_LOSS"
+
+
+def test_restore_keeps_the_newest_open_row_per_symbol(monkeypatch):
+    from datetime import datetime, timezone
+    rows = [  # Oldest first, as get_open_trades returns them
+        {"id": i, "symbol": "BTCUSD", "direction": "BUY", "mode": "PAPER", "entry_price": 100.0 + i,
+         "quantity": 1.0, "entry_time": datetime(2024, 1, i, tzinfo=timezone.utc), "atr": 5.0}
+        for i in (1, 2, 3)
+    ]
+    closed_in_db = []
+
+    async def fake_open_trades(modes):
+        return rows
+
+    async def fake_close_trades(records):
+        closed_in_db.extend(records)
+
+    monkeypatch.setattr(book_module.db_manager, "get_open_trades", fake_open_trades)
+    monkeypatch.setattr(book_module.db_manager, "close_trades", fake_close_trades)
+    book = PositionBook(trailing=False)
+    closes = []
+    book.on_close(closes.append)
+    restored = asyncio.run(book.restore())
+
+    assert [p.trade_id for p in restored] == [3] and book.get("PAPER", "BTCUSD").trade_id == 3
+    # The superseded rows are closed at their entry, with no PnL and no listener calls
+    assert [(r[0], r[1], r[3]) for r in closed_in_db] == [(1, 101.0, 0.0), (2, 102.0, 0.0)]
+    assert closes == [] and book.closed == 0
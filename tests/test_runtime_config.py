@@ -0,0 +1,64 @@
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config.runtime import RuntimeConfig
+from src.risk.risk_manager import RiskManager
+
+
+def write(path, values, mtime):
+    path.write_text(json.dumps(values) if isinstance(values, dict) else values)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_snapshot_swaps_only_on_change_and_notifies(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, {"TRADING_MODE": "paper"}, 1_000_000_000)
+    config = RuntimeConfig(str(path))
+    first = config.snapshot
+    assert first.trading_mode == "PAPER"
+
+    seen = []
+    config.subscribe(lambda new, old: seen.append((new.trading_mode, old.trading_mode if old else None)))
+    assert seen == [("PAPER", None)]
+
+    assert config.reload() is False
+    assert config.snapshot is first
+
+    write(path, {"TRADING_MODE": "LIVE", "RISK_PER_TRADE": 0.02}, 2_000_000_000)
+    assert config.reload() is True
+    assert seen[-1] == ("LIVE", "PAPER")
+    assert config.snapshot.risk_per_trade == 0.02
+
+    try:
+        config.snapshot.trading_mode = "PAPER"
+        assert False, "snapshot should be immutable"
+    except AttributeError:
+        pass
+
+
+def test_invalid_file_keeps_last_good_snapshot(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, {"TRADING_MODE": "LIVE"}, 1_000_000_000)
+    config = RuntimeConfig(str(path))
+    good = config.snapshot
+
+    write(path, '{"TRADING_MODE": "PAP', 2_000_000_000)
+    assert config.reload() is False
+    assert config.snapshot is good
+
+
+def test_risk_manager_follows_overrides(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, {"MAX_LEVERAGE": 3}, 1_000_000_000)
+    config = RuntimeConfig(str(path))
+    risk = RiskManager()
+    config.subscribe(risk.apply_config)
+    assert risk.max_leverage == 3.0
+
+    write(path, {}, 2_000_000_000)
+    config.reload()
+    assert (risk.max_leverage, risk.risk_per_trade) == (1.0, 0.01)
@@ -0,0 +1,35 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.agents.base_agent import Action, CompactSignal, Signal, SignalMatrix
+
+
+def test_compact_signal_reads_like_a_signal():
+    compact = CompactSignal(agent_name="TrendFollowingAgent", symbol="BTCUSD", action="BUY", confidence=0.7, metadata={"adx": 31.0})
+
+    assert compact.code is Action.BUY and compact.action == "BUY"
+    assert not hasattr(compact, "__dict__")
+    assert compact.to_signal() == Signal(agent_name="TrendFollowingAgent", symbol="BTCUSD", action="BUY",
+                                         confidence=0.7, metadata={"adx": 31.0})
+
+
+def test_signal_matrix_records_and_materializes():
+    matrix = SignalMatrix(["A", "B"], n_candles=3, symbol="ETHUSD")
+    matrix.record(1, [
+        Signal(agent_name="B", symbol="ETHUSD", action="SELL", confidence=0.8, metadata={"atr": 12.5, "status": "text"}),
+        CompactSignal(agent_name="A", symbol="ETHUSD", action="ANALYSIS", confidence=1.0, metadata={"rsi": 28.0}),
+    ], timestamp="2024-01-01T01:00:00")
+
+    assert matrix.actions.dtype == np.int8
+    assert list(matrix.actions[:, 1]) == [Action.ANALYSIS, Action.SELL]
+    assert matrix.timestamps[1] == np.datetime64("2024-01-01T01:00:00")
+
+    a, b = matrix.to_signals(1)
+    assert (a.action, a.metadata) == ("ANALYSIS", {"rsi": 28.0})
+    assert (b.action, b.confidence, b.metadata) == ("SELL", np.float32(0.8), {"atr": 12.5})
+    assert matrix.action_counts()["B"] == {"SELL": 1, "NEUTRAL": 2, "BUY": 0, "ANALYSIS": 0}
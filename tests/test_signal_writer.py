@@ -0,0 +1,143 @@
+import asyncio
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.base_agent import Signal
+from src.data import signal_writer as writer_module
+from src.data.db_manager import DatabaseManager
+from src.data.signal_writer import SignalWriter
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def signals(n, symbol="BTCUSD"):
+    return [Signal(agent_name=f"Agent{i}", symbol=symbol, action="BUY", confidence=0.5, metadata={"rsi": float("nan")})
+            for i in range(n)]
+
+
+def stub_store(monkeypatch, failures=()):
+    """db_manager.store_agent_signals that raises the given errors first, then records batches."""
+    batches, failures = [], list(failures)
+
+    async def store(records):
+        if failures:
+            raise failures.pop(0)
+        batches.append(list(records))
+
+    monkeypatch.setattr(writer_module.db_manager, "store_agent_signals", store)
+    return batches
+
+
+def test_record_buffers_and_flushes_in_batches(monkeypatch):
+    batches = stub_store(monkeypatch)
+    writer = SignalWriter(batch_size=4)
+    writer.record(signals(10), datetime(2024, 1, 1))  # Naive timestamps are taken as UTC
+    assert len(writer) == 10 and batches == []
+
+    async def scenario():
+        await writer.start()
+        await asyncio.sleep(0.05)  # A full batch wakes the writer up early
+        await writer.stop()
+    asyncio.run(scenario())
+
+    assert [len(b) for b in batches] == [4, 4, 2]
+    ts, agent, symbol, action, confidence, meta = batches[0][0]
+    assert (ts, agent, symbol, action, confidence, meta) == (T0, "Agent0", "BTCUSD", "BUY", 0.5, '{"rsi": null}')
+    assert (writer.written, writer.dropped, writer.failed, len(writer)) == (10, 0, 0, 0)
+
+
+def test_full_buffer_drops_oldest(monkeypatch):
+    batches = stub_store(monkeypatch)
+    writer = SignalWriter(max_buffer=5, batch_size=10)
+    writer.record(signals(8), T0)
+    assert (len(writer), writer.dropped) == (5, 3)
+
+    asyncio.run(writer.flush())
+    assert [r[1] for r in batches[0]] == ["Agent3", "Agent4", "Agent5", "Agent6", "Agent7"]
+
+
+def test_transient_failure_requeues_the_batch(monkeypatch):
+    batches = stub_store(monkeypatch, failures=[ConnectionRefusedError("db down")])
+    writer = SignalWriter(max_buffer=6, batch_size=4)
+    writer.record(signals(4), T0)
+
+    assert asyncio.run(writer.flush()) == 0
+    assert len(writer) == 4 and writer.failed == 0
+
+    # New rows arrive while the database is down; the buffer limit still holds
+    writer.record(signals(3, symbol="ETHUSD"), T0)
+    assert (len(writer), writer.dropped) == (6, 1)
+
+    assert asyncio.run(writer.flush()) == 4
+    assert [(r[1], r[2]) for r in batches[0]] == [("Agent1", "BTCUSD"), ("Agent2", "BTCUSD"),
+                                                   ("Agent3", "BTCUSD"), ("Agent0", "ETHUSD")]
+
+
+def test_bad_batch_is_dropped_not_retried(monkeypatch):
+    stub_store(monkeypatch, failures=[ValueError("invalid input syntax")])
+    writer = SignalWriter(batch_size=4)
+    writer.record(signals(3), T0)
+    assert asyncio.run(writer.flush()) == 0
+    assert (len(writer), writer.failed) == (0, 3)
+
+
+def test_stop_drains_the_buffer(monkeypatch):
+    batches = stub_store(monkeypatch)
+    writer = SignalWriter(batch_size=2, flush_interval=60.0)
+
+    async def scenario():
+        await writer.start()
+        writer.record(signals(1), T0)  # Below the batch size: waits for the interval
+        await asyncio.sleep(0)
+        await writer.stop()
+    asyncio.run(scenario())
+    assert sum(len(b) for b in batches) == 1 and len(writer) == 0
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    async def fetch(self, query, *args):
+        self.calls.append((query, args))
+        return self.rows
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def acquire(self):
+        pool = self
+
+        class Acquire:
+            async def __aenter__(self):
+                return pool.conn
+
+            async def __aexit__(self, *exc):
+                return False
+        return Acquire()
+
+
+def test_agent_signal_queries():
+    rows = [{"timestamp": T0, "agent_name": "Trend", "symbol": "BTCUSD", "signal": "BUY", "confidence": 0.7, "metadata": None}]
+    conn = FakeConnection(rows)
+    db = DatabaseManager()
+    db.pool = FakePool(conn)
+
+    votes = asyncio.run(db.get_agent_signals_at_time("BTCUSD", T0))
+    assert votes == {"Trend": "BUY"}
+    assert conn.calls[-1][1] == ("BTCUSD", T0, timedelta(minutes=5))
+
+    history = asyncio.run(db.get_agent_signals_range("BTCUSD", T0 - timedelta(hours=1), T0))
+    assert history == rows and history[0] is not rows[0]  # Plain dicts, not records
+    assert conn.calls[-1][1] == ("BTCUSD", T0 - timedelta(hours=1), T0)
+
+    db.pool = None
+    assert asyncio.run(db.get_agent_signals_at_time("BTCUSD", T0)) == {}
+    assert asyncio.run(db.get_agent_signals_range("BTCUSD", T0, T0)) == []
@@ -0,0 +1,117 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.risk.risk_manager import RiskManager
+from src.risk.stop_optimizer import StopOptimizer, StopTable, excursions, rolling_atr, stop_returns
+
+
+def synthetic_ohlc(n=600, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    spread = np.abs(rng.normal(0, 0.006, n)) * close
+    return close + spread, close - spread, close
+
+
+def brute_force_return(high, low, close, i, direction, atr, m, reward_r, horizon):
+    """Bar-by-bar walk of one trade; the stop wins ties."""
+    entry, risk = close[i], m * atr
+    for j in range(i + 1, i + horizon + 1):
+        adverse = entry - low[j] if direction > 0 else high[j] - entry
+        favourable = high[j] - entry if direction > 0 else entry - low[j]
+        if adverse >= risk:
+            return -risk / entry
+        if favourable >= reward_r * risk:
+            return reward_r * risk / entry
+    return (close[i + horizon] - entry) * direction / entry
+
+
+def test_rolling_atr_matches_pandas():
+    high, low, close = synthetic_ohlc(100)
+    df = pd.DataFrame({"high": high, "low": low, "close": close})
+    ranges = pd.concat([df.high - df.low, (df.high - df.close.shift()).abs(), (df.low - df.close.shift()).abs()], axis=1)
+    expected = ranges.max(axis=1).rolling(14).mean().to_numpy()
+    np.testing.assert_allclose(rolling_atr(high, low, close), expected, equal_nan=True)
+
+
+def test_vectorized_outcomes_match_bar_by_bar_walk():
+    high, low, close = synthetic_ohlc()
+    atr = rolling_atr(high, low, close)
+    rng = np.random.default_rng(1)
+    entries = np.sort(rng.choice(np.arange(20, 590), 80, replace=False))
+    directions = rng.choice([-1.0, 1.0], 80)
+    multipliers = np.array([1.0, 2.0, 3.0])
+
+    adverse, favourable, final, valid = excursions(high, low, close, entries, directions, 12)
+    returns = stop_returns(adverse, favourable, final, atr[entries[valid]], close[entries[valid]], multipliers)
+
+    for k, (i, d) in enumerate(zip(entries[valid], directions[valid])):
+        if d > 0:
+            assert np.isclose(adverse[k, -1], close[i] - low[i + 1:i + 13].min())  # MAE
+            assert np.isclose(favourable[k, -1], high[i + 1:i + 13].max() - close[i])  # MFE
+        for m_i, m in enumerate(multipliers):
+            assert np.isclose(returns[m_i, k], brute_force_return(high, low, close, i, d, atr[i], m, 2.0, 12))
+
+
+def test_optimizer_publishes_table_used_by_risk_manager(tmp_path):
+    high, low, close = synthetic_ohlc(2000)
+    entries = np.arange(20, 1950, 7)
+    directions = np.where(np.arange(len(entries)) % 2 == 0, 1.0, -1.0)
+
+    result = StopOptimizer(min_samples=20).optimize_symbol(high, low, close, entries, directions)
+    assert set(result["multipliers"]) == {"ALL", "LOW_VOL", "HIGH_VOL"}
+    assert sum(result["samples"][r] for r in ("LOW_VOL", "HIGH_VOL")) == result["samples"]["ALL"]
+
+    path = tmp_path / "stops.json"
+    StopTable({"BTCUSD": result}).save(str(path))
+    risk = RiskManager(stop_table_path=str(path))
+    threshold = result["vol_threshold"]
+    calm_atr, wild_atr = 100 * threshold * 0.5, 100 * threshold * 2
+
+    m = result["multipliers"]["HIGH_VOL"]
+    assert risk.get_stop_loss_price(100.0, "BUY", wild_atr, "BTCUSD") == 100.0 - m * wild_atr
+    m = result["multipliers"]["LOW_VOL"]
+    assert risk.get_stop_loss_price(100.0, "SELL", calm_atr, "BTCUSD") == 100.0 + m * calm_atr
+    # Unfitted symbols keep the 2x ATR default
+    assert risk.get_stop_loss_price(100.0, "BUY", 1.0, "ETHUSD") == 98.0
+
+
+def test_entries_never_start_inside_a_forming_bar():
+    from src.agents.stop_loss_optimizer import entry_bars
+    times = np.array([0.0, 3600.0, 7200.0, 10800.0])
+    # On a bar's open (backtests) -> that bar; mid-bar (live scans) -> the next one
+    assert list(entry_bars(times, np.array([3600.0, 3700.0, 7199.0]))) == [1, 2, 2]
+
+
+def test_agent_fits_only_entries_above_the_execution_threshold(tmp_path, monkeypatch):
+    import asyncio
+    from datetime import datetime, timedelta, timezone
+    from src.agents import stop_loss_optimizer as agent_module
+    from src.agents.stop_loss_optimizer import StopLossOptimizerAgent
+
+    high, low, close = synthetic_ohlc(600)
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    candles = [{"timestamp": t0 + timedelta(hours=i), "high": h, "low": l, "close": c}
+               for i, (h, l, c) in enumerate(zip(high, low, close))]
+    calls = []
+
+    async def fake_ohlc(symbol, start, end):
+        return candles
+
+    async def fake_entries(symbol, start, end, min_confidence=0.0):
+        calls.append(min_confidence)
+        return [{"timestamp": t0 + timedelta(hours=i), "signal": "BUY" if i % 2 else "SELL", "confidence": 0.9}
+                for i in range(20, 550, 5)]
+
+    monkeypatch.setattr(agent_module.db_manager, "get_ohlc", fake_ohlc)
+    monkeypatch.setattr(agent_module.db_manager, "get_entry_signals", fake_entries)
+    monkeypatch.setattr(agent_module.risk_manager, "stop_table_path", str(tmp_path / "stops.json"))
+    monkeypatch.setattr(agent_module.risk_manager, "stop_table", StopTable())
+
+    agent = StopLossOptimizerAgent(optimizer=StopOptimizer(min_samples=20))
+    table = asyncio.run(agent.optimize(["BTCUSD"], end=t0 + timedelta(days=30)))
+    assert calls == [0.8] and "BTCUSD" in table.symbols